@@ -1,12 +1,17 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from textblob import TextBlob
-import re
 from datetime import datetime
 import numpy as np
-import base64
+
+from sentiment_engine import analyze_hinglish_genz_sentiment, lexicon_version
+from sentiment_engine.history import HistoryStore
+from sentiment_engine.incremental import IncrementalAnalyzer
+
+# Most recent analyses kept in the sidebar history and trend chart
+HISTORY_CAPACITY = 1000
+# Inputs whose results / figures stay cached across sessions
+RESULT_CACHE_SIZE = 1000
+FIGURE_CACHE_SIZE = 256
 
 # Page configuration
 st.set_page_config(
@@ -144,211 +149,46 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'history' not in st.session_state:
-    st.session_state.history = []
+if not isinstance(st.session_state.get('history'), HistoryStore):
+    st.session_state.history = HistoryStore(HISTORY_CAPACITY)
 if 'sample_review' not in st.session_state:
     st.session_state.sample_review = ""
-
-# --- Dictionaries ---
-HINGLISH_POSITIVE = {
-    'mast': 1.0, 'badhiya': 1.0, 'zabardast': 1.0, 'kamaal': 1.0, 'shandar': 1.0,
-    'badiya': 1.0, 'accha': 0.8, 'acha': 0.8, 'achha': 0.8, 'achchha': 0.8,
-    'sahi': 0.7, 'ekdum': 0.8, 'dhansu': 1.0, 'jhakaas': 1.0, 'lajawaab': 1.0, 
-    'top': 0.8, 'best': 1.0, 'maja': 0.8, 'mazaa': 0.8, 'maza': 0.8, 
-    'superb': 1.0, 'badass': 0.9, 'dope': 0.9, 'lit': 0.9, 'fire': 0.9, 
-    'op': 0.8, 'behtreen': 1.0, 'gazab': 0.9, 'ghazab': 0.9, 'tagda': 0.8, 
-    'solid': 0.8, 'perfect': 1.0, 'bindas': 0.8, 'kadak': 0.8, 'fadu': 0.9, 
-    'faadu': 0.9, 'jhakkas': 1.0, 'sunder': 0.8, 'sundar': 0.8, 'pyara': 0.7, 
-    'pyaara': 0.7, 'pasand': 0.7, 'like': 0.7, 'laga': 0.6, 'lagaa': 0.6,
-    'good': 0.8, 'nice': 0.7, 'great': 0.9, 'awesome': 0.9, 'excellent': 1.0
-}
-
-HINGLISH_NEGATIVE = {
-    'bekaar': -0.9, 'bekar': -0.9, 'ganda': -0.8, 'kharab': -0.9, 'bakwas': -1.0,
-    'faltu': -0.8, 'bakwaas': -1.0, 'ghatiya': -1.0, 'wahiyat': -1.0, 'bura': -0.8,
-    'kachra': -1.0, 'waste': -0.9, 'bakkar': -0.9, 'thanda': -0.6, 'boring': -0.7,
-    'chutiya': -1.0, 'chutiyapa': -1.0, 'bekuf': -0.8, 'bevkuf': -0.8,
-    'pagal': -0.5, 'pagalpan': -0.6, 'nautanki': -0.6, 'dramabaazi': -0.6,
-    'dhokha': -0.9, 'fraud': -1.0, 'scam': -1.0, 'locha': -0.7, 'problem': -0.6,
-    'bad': -0.8, 'worst': -1.0, 'horrible': -1.0, 'terrible': -1.0, 'poor': -0.7
-}
-
-GENZ_SLANG_POSITIVE = {
-    'slaps': 1.0, 'slap': 1.0, 'bussin': 1.0, 'fire': 0.9, 'lit': 0.9, 'dope': 0.9,
-    'goat': 1.0, 'slay': 0.9, 'slaying': 0.9, 'iconic': 0.9, 'vibe': 0.7, 'vibes': 0.7,
-    'chef': 0.8, 'chefs': 0.8, 'kiss': 0.8, 'snack': 0.7, 'queen': 0.8, 'king': 0.8,
-    'ate': 0.9, 'no': 0.0, 'cap': 0.8, 'based': 0.8, 'w': 0.9, 'bet': 0.7,
-    'facts': 0.7, 'fr': 0.7, 'frfr': 0.8, 'goated': 1.0, 'hits': 0.8, 'different': 0.8,
-    'built': 0.7, 'valid': 0.8, 'understood': 0.8, 'assignment': 0.9, 'serving': 0.8,
-    'stan': 0.7, 'bop': 0.8, 'banger': 0.9, 'smash': 0.8, 'bussing': 1.0
-}
-
-GENZ_SLANG_NEGATIVE = {
-    'mid': -0.6, 'cringe': -0.8, 'cringy': -0.8, 'cringing': -0.8, 'ick': -0.7,
-    'sus': -0.6, 'sussy': -0.7, 'cap': -0.8, 'capping': -0.8, 'yikes': -0.7,
-    'bruh': -0.4, 'oof': -0.5, 'l': -0.8, 'ratio': -0.7, 'ratiod': -0.8,
-    'trash': -0.9, 'flop': -0.8, 'flopped': -0.8, 'dead': -0.7, 'awkward': -0.6,
-    'weird': -0.5, 'pressed': -0.6, 'salty': -0.6, 'toxic': -0.9, 'cancelled': -0.9,
-    'cringe': -0.8, 'basic': -0.5, 'tryhard': -0.6, 'dry': -0.6, 'boring': -0.7
-}
-
-HINDI_INTENSIFIERS = {
-    'boht': 1.5, 'bohot': 1.5, 'bahut': 1.5, 'bahot': 1.5, 'bht': 1.5,
-    'ekdum': 1.4, 'bilkul': 1.3, 'poora': 1.2, 'pura': 1.2, 'kaafi': 1.3,
-    'full': 1.3, 'very': 1.3, 'so': 1.2, 'too': 1.2, 'super': 1.4,
-    'ultra': 1.5, 'mega': 1.4, 'hella': 1.4, 'mad': 1.3, 'crazy': 1.3
-}
-
-# Emotion Keywords (Heuristics)
-EMOTION_KEYWORDS = {
-    'joy': ['happy', 'love', 'great', 'awesome', 'mast', 'best', 'fun', 'enjoy', 'smile', 'laugh', 'lit', 'fire', 'slay'],
-    'sadness': ['sad', 'bad', 'cry', 'depressed', 'unhappy', 'worst', 'poor', 'bekaar', 'trash', 'dead', 'flop'],
-    'anger': ['angry', 'hate', 'mad', 'furious', 'annoyed', 'irritated', 'bakwas', 'ghatiya', 'cringe', 'toxic'],
-    'excitement': ['excited', 'wow', 'amazing', 'omg', 'hype', 'crazy', 'dhansu', 'jhakaas', 'goat', 'bussin']
-}
+# Live preview while typing: only the edited part of the text is re-scored
+if 'live' not in st.session_state:
+    st.session_state.live = IncrementalAnalyzer()
 
 # --- Functions ---
 
-def clean_text(text):
-    """Clean and preprocess text while preserving Hinglish"""
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'[^\w\s!?.,\-]', '', text, flags=re.UNICODE)
-    return text.strip()
+@st.cache_resource
+def load_engine():
+    """Warm up the engine once per server process; all sessions share it"""
+    # The first review builds the lexicon indexes and loads TextBlob
+    analyze_hinglish_genz_sentiment("warm up")
+    return analyze_hinglish_genz_sentiment
 
-def analyze_emotions(text):
-    """Simple heuristic-based emotion detection"""
-    words = text.lower().split()
-    emotions = {'joy': 0, 'sadness': 0, 'anger': 0, 'excitement': 0}
-    
-    for word in words:
-        for emotion, keywords in EMOTION_KEYWORDS.items():
-            if word in keywords:
-                emotions[emotion] += 1
-                
-    # Normalize
-    total = sum(emotions.values())
-    if total > 0:
-        for k in emotions:
-            emotions[k] /= total
-    return emotions
-
-def analyze_hinglish_genz_sentiment(text):
-    """Enhanced sentiment analysis for Hinglish and Gen Z slang"""
-    cleaned_text = clean_text(text)
-    words = cleaned_text.lower().split()
-    
-    blob = TextBlob(cleaned_text)
-    base_polarity = blob.sentiment.polarity
-    base_subjectivity = blob.sentiment.subjectivity
-    
-    negation_words = ['nahi', 'nai', 'nhi', 'na', 'mat', 'not', 'no', 'never', 'neither', 'nobody', 'nothing', 'nowhere', 'none', 'nahin']
-    
-    custom_score = 0
-    word_count = 0
-    slang_count = 0
-    intensifier_multiplier = 1.0
-    skip_indices = set()
-    
-    for i, word in enumerate(words):
-        if i in skip_indices:
-            continue
-            
-        sentiment_value = None
-        word_type = None
-        
-        if word in HINGLISH_POSITIVE:
-            sentiment_value = HINGLISH_POSITIVE[word]
-            word_type = 'positive'
-            slang_count += 1
-        elif word in HINGLISH_NEGATIVE:
-            sentiment_value = HINGLISH_NEGATIVE[word]
-            word_type = 'negative'
-            slang_count += 1
-        elif word in GENZ_SLANG_POSITIVE:
-            sentiment_value = GENZ_SLANG_POSITIVE[word]
-            word_type = 'positive'
-            slang_count += 1
-        elif word in GENZ_SLANG_NEGATIVE:
-            sentiment_value = GENZ_SLANG_NEGATIVE[word]
-            word_type = 'negative'
-            slang_count += 1
-        
-        if sentiment_value is not None:
-            is_negated = False
-            for j in range(max(0, i-3), i):
-                if words[j] in negation_words:
-                    is_negated = True
-                    break
-            for j in range(i+1, min(len(words), i+4)):
-                if words[j] in negation_words:
-                    is_negated = True
-                    skip_indices.add(j)
-                    break
-            
-            if i > 0 and words[i-1] in HINDI_INTENSIFIERS:
-                intensifier_multiplier = HINDI_INTENSIFIERS[words[i-1]]
-            
-            score = sentiment_value * intensifier_multiplier
-            if is_negated:
-                score = -abs(score) if word_type == 'positive' else abs(score) * 0.6
-            
-            custom_score += score
-            word_count += 1
-            intensifier_multiplier = 1.0
-        
-        elif word == 'no' and i + 1 < len(words) and words[i + 1] == 'cap':
-            custom_score += 0.8
-            word_count += 1
-            slang_count += 1
-            skip_indices.add(i + 1)
-    
-    if word_count > 0:
-        custom_polarity = custom_score / max(word_count, 1)
-        final_polarity = (custom_polarity * 0.8 + base_polarity * 0.2)
-    else:
-        final_polarity = base_polarity
-    
-    if final_polarity > 0.15:
-        sentiment = "Positive"
-        emoji = "😊"
-        color = "#10b981"
-    elif final_polarity < -0.15:
-        sentiment = "Negative"
-        emoji = "😞"
-        color = "#ef4444"
-    else:
-        sentiment = "Neutral"
-        emoji = "😐"
-        color = "#f59e0b"
-    
-    confidence = min(abs(final_polarity) * 100, 95)
-    if word_count > 0:
-        confidence = min(confidence + 10, 98)
-    
-    emotions = analyze_emotions(cleaned_text)
-    
-    return {
-        'sentiment': sentiment,
-        'emoji': emoji,
-        'color': color,
-        'polarity': final_polarity,
-        'subjectivity': base_subjectivity,
-        'confidence': confidence,
-        'slang_detected': slang_count > 0,
-        'slang_score': min(slang_count * 20, 100),
-        'emotions': emotions
-    }
-
-def create_radar_chart(data):
+@st.cache_data(max_entries=RESULT_CACHE_SIZE, show_spinner=False)
+def analyze_review(text, version):
+    """Analysis result for one input, shared by every session and rerun
+
+    ``version`` is the lexicon version, so lexicon edits miss the cache.
+    """
+    return load_engine()(text)
+
+# Figures are cached with cache_resource: st.plotly_chart only reads them,
+# and unpickling a Figure (what cache_data would do) costs more than
+# building it. Never mutate a figure returned by these functions.
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def create_radar_chart(polarity, subjectivity, confidence, slang_score):
     """Create a radar chart for sentiment profile"""
     categories = ['Polarity', 'Subjectivity', 'Confidence', 'Slang Score']
     
     # Normalize values to 0-100 scale for chart
     values = [
-        (data['polarity'] + 1) * 50,  # Convert -1..1 to 0..100
-        data['subjectivity'] * 100,
-        data['confidence'],
-        data['slang_score']
+        (polarity + 1) * 50,  # Convert -1..1 to 0..100
+        subjectivity * 100,
+        confidence,
+        slang_score
     ]
     
     fig = go.Figure()
@@ -381,16 +221,33 @@ def create_radar_chart(data):
     )
     return fig
 
-def create_trend_chart(history):
-    """Create a trend chart from history"""
-    if not history:
-        return None
-        
-    df = pd.DataFrame(history)
-    df['index'] = range(len(df))
-    
-    fig = px.line(df, x='index', y='polarity', markers=True)
-    fig.update_traces(line_color='#6366f1', line_width=3, marker=dict(size=8, color='#c084fc'))
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def create_gauge_chart(confidence, color):
+    """Create the confidence gauge"""
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = confidence,
+        title = {'text': "Confidence", 'font': {'size': 14, 'color': '#94a3b8'}},
+        gauge = {
+            'axis': {'range': [None, 100], 'tickwidth': 0, 'tickcolor': "darkblue"},
+            'bar': {'color': color},
+            'bgcolor': "rgba(0,0,0,0)",
+            'borderwidth': 0,
+            'steps': [{'range': [0, 100], 'color': 'rgba(255,255,255,0.05)'}],
+        },
+        number = {'font': {'color': 'white'}}
+    ))
+    fig.update_layout(height=180, margin=dict(l=20, r=20, t=30, b=20), paper_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+def create_trend_chart():
+    """Create an empty polarity trend chart"""
+    fig = go.Figure(go.Scatter(
+        x=[], y=[],
+        mode='lines+markers',
+        line=dict(color='#6366f1', width=3),
+        marker=dict(size=8, color='#c084fc')
+    ))
     
     fig.update_layout(
         xaxis=dict(showgrid=False, showticklabels=False, title=None),
@@ -403,15 +260,34 @@ def create_trend_chart(history):
     )
     return fig
 
-def get_csv_download_link(history):
-    """Generate a link to download history as CSV"""
-    if not history:
-        return ""
-    df = pd.DataFrame(history)
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="sentiment_history.csv" class="text-sm text-indigo-400 hover:text-indigo-300 underline decoration-indigo-500/30">Download CSV</a>'
-    return href
+def update_trend_chart(history):
+    """Extend the session trend chart with the entries added since its last refresh"""
+    trend = st.session_state.get('trend')
+    if trend is None:
+        trend = st.session_state.trend = {'fig': create_trend_chart(), 'seq': history.first_seq, 'first': None}
+    if trend['seq'] == history.total and trend['first'] == history.first_seq:
+        return trend['fig']
+    seq, polarity = history.since(trend['seq'])
+    line = trend['fig'].data[0]
+    x = np.concatenate([np.asarray(line.x, dtype=np.int64), seq])
+    y = np.concatenate([np.asarray(line.y, dtype=np.float64), polarity])
+    # Drop points whose entries were evicted from (or cleared out of) the history
+    keep = x >= history.first_seq
+    line.x, line.y = x[keep], y[keep]
+    trend['seq'] = history.total
+    trend['first'] = history.first_seq
+    return trend['fig']
+
+def export_history(history):
+    """Download buttons for the history, built only once an export is requested"""
+    st.download_button("CSV", history.to_csv(), file_name="sentiment_history.csv",
+                       mime="text/csv", key="dl_csv", use_container_width=True)
+    try:
+        parquet = history.to_parquet()
+    except ImportError:
+        return
+    st.download_button("Parquet", parquet, file_name="sentiment_history.parquet",
+                       mime="application/octet-stream", key="dl_parquet", use_container_width=True)
 
 # --- Layout ---
 
@@ -427,16 +303,19 @@ with st.sidebar:
         # Actions
         col_d, col_c = st.columns([1, 1])
         with col_d:
-            st.markdown(get_csv_download_link(st.session_state.history), unsafe_allow_html=True)
+            export = st.button("Export", key="export_hist", type="secondary")
         with col_c:
             if st.button("Clear", key="clear_hist", type="secondary"):
-                st.session_state.history = []
+                st.session_state.history.clear()
                 st.rerun()
+        if export:
+            export_history(st.session_state.history)
         
-        st.markdown('<div class="space-y-3 mt-4">', unsafe_allow_html=True)
-        for item in reversed(st.session_state.history[-5:]):
+        # One element for the whole list instead of one per item
+        items = []
+        for item in reversed(st.session_state.history.tail(5)):
             color_class = "border-green-500" if item['sentiment'] == 'Positive' else "border-red-500" if item['sentiment'] == 'Negative' else "border-yellow-500"
-            st.markdown(f"""
+            items.append(f"""
                 <div class="glass p-3 rounded-xl border-l-4 {color_class} transition hover:bg-white/5">
                     <div class="flex justify-between items-center mb-1">
                         <span class="text-xs text-slate-400">{item['timestamp']}</span>
@@ -444,8 +323,8 @@ with st.sidebar:
                     </div>
                     <p class="text-sm text-slate-300 line-clamp-2">{item['text']}</p>
                 </div>
-            """, unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+            """)
+        st.markdown('<div class="space-y-3 mt-4">' + "".join(items) + '</div>', unsafe_allow_html=True)
     else:
         st.markdown('<p class="text-slate-500 text-sm italic">No analysis yet.</p>', unsafe_allow_html=True)
     
@@ -493,12 +372,16 @@ with col2:
         placeholder="Type something... (e.g. 'Kya mast cheez hai!')",
         label_visibility="collapsed"
     )
+    if review_text:
+        live = st.session_state.live.update(review_text)
+        st.caption(f"Live: {live['emoji']} {live['sentiment']} · polarity {live['polarity']:+.2f} · "
+                   f"slang {live['slang_score']}% (lexicon only)")
     st.markdown('</div>', unsafe_allow_html=True)
     
     if st.button("🚀 Analyze Sentiment", type="primary", use_container_width=True):
         if review_text:
             with st.spinner("Crunching numbers..."):
-                result = analyze_hinglish_genz_sentiment(review_text)
+                result = analyze_review(review_text, lexicon_version())
                 
                 # Update History
                 st.session_state.history.append({
@@ -528,20 +411,7 @@ with col2:
                 # Card 2: Confidence Gauge (Plotly)
                 with st.container():
                     st.markdown('<div class="glass rounded-3xl p-4 h-full glass-hover">', unsafe_allow_html=True)
-                    fig_gauge = go.Figure(go.Indicator(
-                        mode = "gauge+number",
-                        value = result['confidence'],
-                        title = {'text': "Confidence", 'font': {'size': 14, 'color': '#94a3b8'}},
-                        gauge = {
-                            'axis': {'range': [None, 100], 'tickwidth': 0, 'tickcolor': "darkblue"},
-                            'bar': {'color': result['color']},
-                            'bgcolor': "rgba(0,0,0,0)",
-                            'borderwidth': 0,
-                            'steps': [{'range': [0, 100], 'color': 'rgba(255,255,255,0.05)'}],
-                        },
-                        number = {'font': {'color': 'white'}}
-                    ))
-                    fig_gauge.update_layout(height=180, margin=dict(l=20, r=20, t=30, b=20), paper_bgcolor='rgba(0,0,0,0)')
+                    fig_gauge = create_gauge_chart(result['confidence'], result['color'])
                     st.plotly_chart(fig_gauge, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -566,7 +436,8 @@ with col2:
                 with c_left:
                     st.markdown('<div class="glass rounded-3xl p-6 glass-hover h-full">', unsafe_allow_html=True)
                     st.markdown('<h3 class="text-lg font-bold text-white mb-4">📊 Sentiment Profile</h3>', unsafe_allow_html=True)
-                    radar_fig = create_radar_chart(result)
+                    radar_fig = create_radar_chart(result['polarity'], result['subjectivity'],
+                                                   result['confidence'], result['slang_score'])
                     st.plotly_chart(radar_fig, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
                     
@@ -605,7 +476,7 @@ with col2:
                 if len(st.session_state.history) > 1:
                     st.markdown('<div class="glass rounded-3xl p-6 mt-6 glass-hover">', unsafe_allow_html=True)
                     st.markdown('<h3 class="text-lg font-bold text-white mb-4">📈 Session Trend</h3>', unsafe_allow_html=True)
-                    trend_fig = create_trend_chart(st.session_state.history)
+                    trend_fig = update_trend_chart(st.session_state.history)
                     st.plotly_chart(trend_fig, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
 
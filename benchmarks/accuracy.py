@@ -0,0 +1,347 @@
+"""Accuracy-vs-speed regression check for every scoring mode
+
+Every mode scores the labelled golden corpus (benchmarks/golden.jsonl,
+which starts with the app's three sample reviews) and a synthetic
+corpus. Each is compared with the reference, analyze_hinglish_genz_sentiment
+with its defaults, review by review:
+
+- agreement: share of reviews that get the reference's label
+- mean and max |polarity - reference polarity|
+- accuracy and confusion matrix against the golden corpus' human labels
+- reviews/sec on the synthetic corpus, and speedup over the reference
+
+Skipping TextBlob changes scores by design, so those modes are held to
+drift limits. Batching, caching, workers and incremental re-scoring must
+not change anything: each of them must reproduce, review for review, the
+single-text mode with the same options (its twin in TWINS).
+
+The reference itself must still give the outputs recorded in the golden
+corpus; after an intended scoring change, re-record them with
+``--update-golden``. A mode fails when it differs from its twin, breaks
+one of its THRESHOLDS (agreement, mean polarity drift, drop in golden
+accuracy, speedup) or, with ``--baseline``, runs more than
+``--max-slowdown`` slower than in a saved ``--output`` file. Exits with
+status 1 on any failure, so it can gate CI.
+
+Usage: python benchmarks/accuracy.py [--reviews N] [--modes M ...] [--output FILE] [--baseline FILE]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate
+from suite import environment
+from sentiment_engine import (
+    CachedAnalyzer, IncrementalAnalyzer, ParallelScorer, analyze_batch, analyze_hinglish_genz_sentiment
+)
+from sentiment_engine.results import LABELS
+
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden.jsonl')
+REFERENCE = 'single'
+# Recorded golden polarities are rounded to this many digits
+DIGITS = 6
+
+# mode -> (min label agreement with the reference, max mean |polarity delta|,
+#          max drop in golden accuracy, min speedup over the reference)
+THRESHOLDS = {
+    'single':          (1.00, 0.0, 0.0, 0.0),
+    'single_fallback': (0.85, 0.12, 0.05, 3.0),
+    'single_lexicon':  (0.85, 0.12, 0.05, 4.0),
+    'batch':           (1.00, 1e-9, 0.0, 1.5),
+    'batch_fallback':  (0.85, 0.12, 0.05, 8.0),
+    'batch_lexicon':   (0.85, 0.12, 0.05, 8.0),
+    'batch_compact':   (0.85, 0.12, 0.05, 8.0),
+    'fuzzy':           (0.95, 0.02, 0.0, 0.8),
+    'fuzzy_batch':     (0.95, 0.02, 0.0, 1.5),
+    'cached':          (0.85, 0.12, 0.05, 4.0),
+    'cached_blend':    (1.00, 1e-9, 0.0, 1.5),
+    'incremental':     (0.85, 0.12, 0.05, 1.5),
+    'parallel':        (0.85, 0.12, 0.05, 4.0),
+}
+
+# Faster implementations -> the single-text mode with the same options,
+# whose results they must reproduce exactly
+TWINS = {
+    'batch': 'single',
+    'batch_fallback': 'single_fallback',
+    'batch_lexicon': 'single_lexicon',
+    'batch_compact': 'single_lexicon',
+    'fuzzy_batch': 'fuzzy',
+    'cached': 'single_lexicon',
+    'cached_blend': 'single',
+    'incremental': 'single_lexicon',
+    'parallel': 'single_lexicon',
+}
+# Largest |polarity delta| from the twin still counted as the same result
+EXACT = 1e-9
+
+
+def single(**options):
+    return lambda texts: [analyze_hinglish_genz_sentiment(t, **options) for t in texts]
+
+
+def batch(**options):
+    return lambda texts: analyze_batch(texts, **options)
+
+
+def batch_compact(texts):
+    return analyze_batch(texts, 'lexicon', False, compact=True).to_dicts()
+
+
+def variant(text):
+    """The same review with its case and spacing changed"""
+    return "  ".join(text.title().split())
+
+
+def cached(**options):
+    def prepare(texts):
+        # A fresh cache per run, warmed with variants of every review: a
+        # variant may only be reused where it cannot change the result
+        cache = CachedAnalyzer(**options)
+        cache.analyze_batch([variant(t) for t in texts])
+        return cache.analyze_batch
+
+    def score(texts):
+        return prepare(texts)(texts)
+    # Only the lookups after the warm-up are timed
+    score.prepare = prepare
+    return score
+
+
+def incremental(texts):
+    # One analyzer whose whole text is replaced by every review
+    analyzer = IncrementalAnalyzer()
+    return [analyzer.update(t) for t in texts]
+
+
+MODES = {
+    'single': single(),
+    'single_fallback': single(baseline='fallback', subjectivity=False),
+    'single_lexicon': single(baseline='lexicon', subjectivity=False),
+    'batch': batch(),
+    'batch_fallback': batch(baseline='fallback', subjectivity=False),
+    'batch_lexicon': batch(baseline='lexicon', subjectivity=False),
+    'batch_compact': batch_compact,
+    'fuzzy': single(fuzzy=True),
+    'fuzzy_batch': batch(fuzzy=True),
+    'cached': cached(baseline='lexicon', subjectivity=False),
+    'cached_blend': cached(),
+    'incremental': incremental,
+    'parallel': None,       # needs the pool, see main
+}
+
+
+def read_golden(path=GOLDEN):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_golden(records, results, path=GOLDEN):
+    """Record the reference's label and polarity for every golden review"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for record, result in zip(records, results):
+            record = {**record, 'recorded': {'sentiment': result['sentiment'],
+                                             'polarity': round(result['polarity'], DIGITS)}}
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def check_recorded(records, results):
+    """Golden reviews whose reference result moved away from the recorded one"""
+    tolerance = 10 ** -DIGITS
+    changed = []
+    for record, result in zip(records, results):
+        recorded = record.get('recorded')
+        if (recorded is None or recorded['sentiment'] != result['sentiment']
+                or abs(recorded['polarity'] - result['polarity']) > tolerance):
+            changed.append((record['text'], recorded, result['sentiment'], result['polarity']))
+    return changed
+
+
+def confusion(labels, results):
+    """matrix[human label][mode label] counts, in LABELS order"""
+    matrix = [[0] * len(LABELS) for _ in LABELS]
+    for label, result in zip(labels, results):
+        matrix[LABELS.index(label)][LABELS.index(result['sentiment'])] += 1
+    return matrix
+
+
+def drift(results, reference):
+    agree = sum(r['sentiment'] == ref['sentiment'] for r, ref in zip(results, reference))
+    deltas = [abs(r['polarity'] - ref['polarity']) for r, ref in zip(results, reference)]
+    return agree / len(reference), sum(deltas) / len(deltas), max(deltas)
+
+
+def throughput(fn, reviews, repeat):
+    """Best reviews/sec of ``repeat`` runs
+
+    A mode with a ``prepare`` step (the cache warm-up) runs it untimed
+    before every run.
+    """
+    prepare = getattr(fn, 'prepare', None)
+    best = float('inf')
+    for _ in range(repeat):
+        timed = fn if prepare is None else prepare(reviews)
+        gc.collect()
+        start = time.perf_counter()
+        timed(reviews)
+        best = min(best, time.perf_counter() - start)
+    return len(reviews) / best
+
+
+def evaluate(fn, golden, reviews, reference, repeat):
+    """(run summary, results of the golden reviews followed by the synthetic ones)"""
+    golden_results = fn([record['text'] for record in golden])
+    results = golden_results + fn(reviews)
+    matrix = confusion([record['label'] for record in golden], golden_results)
+    agreement, mean_delta, max_delta = drift(results, reference)
+    run = {
+        'agreement': agreement,
+        'mean_delta': mean_delta,
+        'max_delta': max_delta,
+        'accuracy': sum(matrix[i][i] for i in range(len(LABELS))) / len(golden),
+        'confusion': matrix,
+        'reviews_per_sec': throughput(fn, reviews, repeat),
+    }
+    return run, results
+
+
+def mismatches(results, twin):
+    """Reviews whose label or polarity differ from the twin's"""
+    return sum(r['sentiment'] != t['sentiment'] or abs(r['polarity'] - t['polarity']) > EXACT
+               for r, t in zip(results, twin))
+
+
+def failures(name, runs, baseline, max_slowdown):
+    min_agreement, max_mean_delta, max_accuracy_drop, min_speedup = THRESHOLDS[name]
+    run, reference = runs[name], runs[REFERENCE]
+    problems = []
+    if run.get('mismatches'):
+        problems.append(f"{run['mismatches']} results differ from {TWINS[name]}")
+    if run['agreement'] < min_agreement:
+        problems.append(f"agreement {run['agreement']:.1%} < {min_agreement:.1%}")
+    if run['mean_delta'] > max_mean_delta:
+        problems.append(f"mean |delta| {run['mean_delta']:.4f} > {max_mean_delta:g}")
+    if reference['accuracy'] - run['accuracy'] > max_accuracy_drop + EXACT:
+        problems.append(f"accuracy {run['accuracy']:.1%}, reference {reference['accuracy']:.1%}")
+    speedup = run['reviews_per_sec'] / reference['reviews_per_sec']
+    if speedup < min_speedup:
+        problems.append(f"speedup {speedup:.1f}x < {min_speedup:g}x")
+    before = (baseline or {}).get(name)
+    if before and run['reviews_per_sec'] < before['reviews_per_sec'] * (1 - max_slowdown):
+        problems.append(f"{run['reviews_per_sec']:.0f} reviews/s, baseline {before['reviews_per_sec']:.0f}")
+    return problems
+
+
+def report(runs):
+    reference_speed = runs[REFERENCE]['reviews_per_sec']
+    print(f"\n{'mode':16s} {'agree':>7s} {'mean|Δ|':>8s} {'max|Δ|':>8s} {'accuracy':>8s} "
+          f"{'reviews/s':>10s} {'speedup':>8s}  same as")
+    for name, run in runs.items():
+        same = ''
+        if name in TWINS:
+            same = f"{TWINS[name]} ({'exact' if not run['mismatches'] else str(run['mismatches']) + ' differ'})"
+        print(f"{name:16s} {run['agreement']:7.1%} {run['mean_delta']:8.4f} {run['max_delta']:8.4f} "
+              f"{run['accuracy']:8.1%} {run['reviews_per_sec']:10.0f} "
+              f"{run['reviews_per_sec'] / reference_speed:7.1f}x  {same}".rstrip())
+
+    # Confusion matrices side by side, rows are the human labels
+    names = list(runs)
+    short = [label[:3] for label in LABELS]
+    for start in range(0, len(names), 4):
+        group = names[start:start + 4]
+        print()
+        print('     ' + ''.join(f"{name:>18s}" for name in group))
+        print('     ' + ''.join(f"{'':>6s}{' '.join(f'{s:>3s}' for s in short)}" for _ in group))
+        for i, label in enumerate(short):
+            print(f"{label:5s}" + ''.join(f"{'':>6s}{' '.join(f'{n:3d}' for n in runs[name]['confusion'][i])}"
+                                          for name in group))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check label and polarity drift and throughput of every scoring mode.')
+    parser.add_argument('--reviews', type=int, default=5000, help='size of the synthetic corpus')
+    parser.add_argument('--seed', type=int, default=11)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per mode, the best counts')
+    parser.add_argument('--workers', type=int, default=2, help="processes for the 'parallel' mode")
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--baseline', help='results JSON of an earlier --output run to check throughput against')
+    parser.add_argument('--max-slowdown', type=float, default=0.2,
+                        help='largest allowed drop in reviews/sec from --baseline (default 0.2)')
+    parser.add_argument('--update-golden', action='store_true',
+                        help="re-record the reference's outputs in the golden corpus")
+    args = parser.parse_args()
+
+    golden = read_golden()
+    reviews = generate(args.reviews, args.seed)
+    texts = [record['text'] for record in golden]
+    reference = MODES[REFERENCE](texts)
+    if args.update_golden:
+        write_golden(golden, reference)
+        print(f"recorded {len(golden)} golden outputs in {GOLDEN}")
+        return
+    reference += MODES[REFERENCE](reviews)
+    print(f"golden reviews: {len(golden)}   synthetic reviews: {len(reviews)}   reference: {REFERENCE}")
+
+    problems = {}
+    changed = check_recorded(golden, reference)
+    if changed:
+        for text, recorded, sentiment, polarity in changed:
+            print(f"  {text!r}: recorded {recorded}, now {sentiment} {polarity:.{DIGITS}f}")
+        problems['golden'] = [f"{len(changed)} reference outputs changed (re-record with --update-golden if intended)"]
+
+    # Every twin runs before the modes that must reproduce it
+    modes = [REFERENCE]
+    for name in args.modes:
+        for mode in (TWINS.get(name), name):
+            if mode is not None and mode not in modes:
+                modes.append(mode)
+    runs = {}
+    results = {}
+    scorer = None
+    try:
+        for name in modes:
+            fn = MODES[name]
+            if name == 'parallel':
+                scorer = ParallelScorer(args.workers, 500, 'lexicon', False)
+                scorer.map(["warm up"] * args.workers)
+                fn = scorer.map
+            runs[name], results[name] = evaluate(fn, golden, reviews, reference, args.repeat)
+            if name in TWINS:
+                runs[name]['mismatches'] = mismatches(results[name], results[TWINS[name]])
+    finally:
+        if scorer is not None:
+            scorer.close()
+
+    report(runs)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['modes']
+    for name in runs:
+        found = failures(name, runs, baseline, args.max_slowdown)
+        if found:
+            problems[name] = found
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'reviews': args.reviews, 'seed': args.seed,
+                       'modes': runs}, f, indent=2)
+        print(f"\nsaved {args.output}")
+
+    if problems:
+        print()
+        for name, found in problems.items():
+            print(f"FAILED {name}: {'; '.join(found)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Streaming rollups vs rebuilding a pandas groupby over the full history
+
+Rollups are fed both the default result dicts and compact Results.
+
+Usage: python benchmarks/bench_aggregate.py [n_reviews] [n_keys]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+from corpus import generate
+from sentiment_engine import analyze_batch
+from sentiment_engine.aggregate import StreamAggregator, merge_all
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_keys = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(0)
+    texts = generate(n)
+    results = analyze_batch(texts)
+    compact = list(analyze_batch(texts, compact=True))
+    keys = [f"sku-{rng.randrange(n_keys)}" for _ in range(n)]
+
+    start = time.perf_counter()
+    agg = StreamAggregator().update(zip(keys, results))
+    t_stream = time.perf_counter() - start
+
+    start = time.perf_counter()
+    agg_compact = StreamAggregator().update(zip(keys, compact))
+    t_compact = time.perf_counter() - start
+    assert agg_compact.to_dict() == agg.to_dict()
+
+    tracemalloc.start()
+    kept = StreamAggregator().update(zip(keys, results))
+    memory = tracemalloc.get_traced_memory()[0] / len(kept)
+    tracemalloc.stop()
+
+    parts = [StreamAggregator().update(zip(keys[i::8], results[i::8])) for i in range(8)]
+    start = time.perf_counter()
+    merge_all(parts)
+    t_merge = time.perf_counter() - start
+
+    # What a dashboard does today: rebuild a frame from all history and group it
+    start = time.perf_counter()
+    df = pd.DataFrame({'key': keys, 'sentiment': [r['sentiment'] for r in results],
+                       'polarity': [r['polarity'] for r in results],
+                       'slang_score': [r['slang_score'] for r in results]})
+    df.groupby('key').agg(polarity_mean=('polarity', 'mean'), polarity_std=('polarity', 'std'),
+                          slang_p50=('slang_score', 'median'), count=('sentiment', 'size'))
+    t_pandas = time.perf_counter() - start
+
+    print(f"reviews: {n}  keys: {len(agg)}")
+    print(f"streaming add:    {t_stream / n * 1e6:8.2f} us/review  ({t_stream:.2f}s total)")
+    print(f"  compact Result: {t_compact / n * 1e6:8.2f} us/review  ({t_compact:.2f}s total)")
+    print(f"memory per key:   {memory:8.0f} bytes")
+    print(f"merge 8 partials: {t_merge * 1e3:8.1f} ms")
+    print(f"pandas rebuild:   {t_pandas * 1e3:8.1f} ms per refresh over the full history")
+
+
+if __name__ == '__main__':
+    main()
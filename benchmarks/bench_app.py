@@ -0,0 +1,71 @@
+"""Headless rerun latency of the Streamlit app
+
+Drives app.py with Streamlit's AppTest (no browser or server). Several
+sessions in the same process, like users on one demo server, analyze
+the sample reviews in turn. The latency of every Analyze rerun and of
+a plain rerun (a widget change that reruns the script) is recorded.
+
+Usage: python benchmarks/bench_app.py [sessions] [rounds]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(__file__), '..', 'app.py')
+REVIEWS = (
+    "Boht mast product hai! Quality ekdum top notch. This slaps fr! 🔥",
+    "Total waste of money. Bekaar quality, huge L. Cringe experience.",
+    "No cap this is goated! W purchase, hits different. Bussin fr fr!",
+)
+
+
+def timed(at):
+    start = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return (time.perf_counter() - start) * 1e3
+
+
+def analyze(at, text):
+    at.text_area[0].set_value(text)
+    next(b for b in at.button if 'Analyze' in b.label).click()
+    return timed(at)
+
+
+def summary(name, times):
+    times = sorted(times)
+    p90 = times[min(len(times) - 1, int(len(times) * 0.9))]
+    print(f"{name:16s} n={len(times):4d}  p50 {statistics.median(times):7.1f} ms  p90 {p90:7.1f} ms  "
+          f"max {times[-1]:7.1f} ms")
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    start = time.perf_counter()
+    apps = [AppTest.from_file(APP, default_timeout=60) for _ in range(sessions)]
+    first = timed(apps[0])
+    for at in apps[1:]:
+        at.run()
+    cold = analyze(apps[0], REVIEWS[0])
+    print(f"first run {first:.0f} ms, first analyze {cold:.0f} ms")
+
+    analyze_times, rerun_times = [], []
+    for _ in range(rounds):
+        for at in apps:
+            for text in REVIEWS:
+                analyze_times.append(analyze(at, text))
+            rerun_times.append(timed(at))
+    summary('analyze rerun', analyze_times)
+    summary('plain rerun', rerun_times)
+    print(f"total {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
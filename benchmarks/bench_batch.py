@@ -0,0 +1,59 @@
+"""Compare analyze_batch against per-review analyze_hinglish_genz_sentiment
+
+Usage: python benchmarks/bench_batch.py [n_reviews]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sentiment_engine import analyze_batch, analyze_hinglish_genz_sentiment
+from sentiment_engine.batch import get_table, _lexicon_scores
+from sentiment_engine.tokenizer import tokenize
+
+SAMPLES = [
+    "Boht mast product hai! Quality ekdum top notch. This slaps fr! 🔥",
+    "Total waste of money. Bekaar quality, huge L. Cringe experience.",
+    "No cap this is goated! W purchase, hits different. Bussin fr fr!",
+]
+
+
+def make_reviews(n, seed=0):
+    """Shuffle sample words into n distinct reviews"""
+    rng = random.Random(seed)
+    words = " ".join(SAMPLES).split()
+    return [" ".join(rng.choices(words, k=rng.randint(4, 30))) for _ in range(n)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    reviews = make_reviews(n)
+
+    single, t_single = timed(lambda: [analyze_hinglish_genz_sentiment(r) for r in reviews])
+    batch, t_batch = timed(analyze_batch, reviews)
+    assert single == batch, "batch results differ from single-text results"
+
+    # Lexicon stage alone: the Python token loop vs the array version
+    table = get_table()
+    docs = [tokenize(r) for r in reviews]
+    _, t_encode = timed(table.encode, docs)
+    ids, lengths = table.encode(docs)
+    _, t_vector = timed(_lexicon_scores, table, ids, lengths)
+
+    print(f"reviews:              {n}")
+    print(f"single-text loop:     {t_single:8.2f}s  {n / t_single:10.0f} reviews/s")
+    print(f"analyze_batch:        {t_batch:8.2f}s  {n / t_batch:10.0f} reviews/s  ({t_single / t_batch:.1f}x)")
+    print(f"lexicon stage (array):{t_encode + t_vector:8.2f}s  (encode {t_encode:.2f}s, score {t_vector:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
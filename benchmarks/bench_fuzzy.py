@@ -0,0 +1,105 @@
+"""Per-token lookup latency: exact dict lookup vs fuzzy index
+
+Lookups are timed on the bundled lexicon and on one padded with synthetic
+words, to show the fuzzy cost does not grow with lexicon size. First,
+ordinary words that are one edit away from a lexicon word must stay
+unmatched and must not change a review's label, and short words must not
+match a lexicon word with a doubled letter ("god" -> "good").
+
+Usage: python benchmarks/bench_fuzzy.py [n_tokens]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sentiment_engine import analyze_hinglish_genz_sentiment
+from sentiment_engine.batch import get_table
+from sentiment_engine.fuzzy import FuzzyIndex, get_index
+
+# Ordinary words one edit away from a negation or a short lexicon word, or
+# a lexicon word with a doubled letter
+FALSE_FRIENDS = ('fever', 'lever', 'sever', 'noting', 'dread', 'fired', 'kis', 'god', 'por')
+# Positive or neutral reviews that false matches used to turn negative
+FALSE_FRIEND_REVIEWS = ('fever gone mast medicine', 'bahut accha, fever se relief')
+# Reviews whose only near misses are false friends: fuzzy scores them as written
+UNCHANGED_REVIEWS = ('kis cheez ka paisa liya bekaar', 'ye product kis kaam ka, paisa barbaad', 'Oh god, this phone')
+
+
+def make_variants(words, n, seed=0):
+    """Tokens drawn from the lexicon with elongations, typos and punctuation"""
+    rng = random.Random(seed)
+    tokens = []
+    for _ in range(n):
+        word = rng.choice(words)
+        kind = rng.random()
+        if kind < 0.3 and len(word) > 2:
+            i = rng.randrange(len(word))
+            word = word[:i] + word[i] * rng.randint(2, 4) + word[i + 1:]
+        elif kind < 0.5 and len(word) > 4:
+            i = rng.randrange(len(word))
+            word = word[:i] + rng.choice('aeiou') + word[i + 1:]
+        elif kind < 0.6:
+            word += rng.choice('!?.')
+        elif kind < 0.8:
+            word = rng.choice(['product', 'delivery', 'quality', 'hai', 'tha', 'bhi', 'ye'])
+        tokens.append(word)
+    return tokens
+
+
+def check_false_friends():
+    index = get_index()
+    for word in FALSE_FRIENDS:
+        assert index.lookup(word) is None, f"{word!r} matched {index.lookup(word)!r}"
+    for review in FALSE_FRIEND_REVIEWS:
+        result = analyze_hinglish_genz_sentiment(review, 'lexicon', False, fuzzy=True)
+        assert result['sentiment'] != 'Negative', f"{review!r} scored {result['polarity']}"
+    for review in UNCHANGED_REVIEWS:
+        exact = analyze_hinglish_genz_sentiment(review)['polarity']
+        fuzzy = analyze_hinglish_genz_sentiment(review, fuzzy=True)['polarity']
+        assert fuzzy == exact, f"{review!r} scored {fuzzy} instead of {exact}"
+
+
+def per_token_ns(fn, tokens):
+    start = time.perf_counter()
+    for t in tokens:
+        fn(t)
+    return (time.perf_counter() - start) / len(tokens) * 1e9
+
+
+def run(label, words, tokens):
+    start = time.perf_counter()
+    index = FuzzyIndex(words)
+    build = time.perf_counter() - start
+    exact = set(words)
+    exact_ns = per_token_ns(exact.__contains__, tokens)
+    cold_ns = per_token_ns(index._search, tokens)
+    for t in tokens:
+        index.lookup(t)
+    warm_ns = per_token_ns(index.lookup, tokens)
+    exact_hits = sum(t in exact for t in tokens)
+    fuzzy_hits = sum(index.lookup(t) is not None for t in tokens)
+    print(f"{label:<22} {len(words):>7} {build * 1000:9.1f} {exact_ns:9.0f} {cold_ns:9.0f} {warm_ns:9.0f}"
+          f" {exact_hits / len(tokens):7.1%} {fuzzy_hits / len(tokens):7.1%}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    check_false_friends()
+    words = get_table().words
+    tokens = make_variants(words, n)
+    rng = random.Random(1)
+    padding = ["".join(rng.choices('abcdefghijklmnoprstuvy', k=rng.randint(4, 10))) for _ in range(50_000)]
+
+    print(f"tokens: {n}   (ns per token; cold = no memo, warm = memoized)")
+    print(f"{'lexicon':<22} {'words':>7} {'build ms':>9} {'exact':>9} {'cold':>9} {'warm':>9}"
+          f" {'exact%':>7} {'fuzzy%':>7}")
+    run('bundled', words, tokens)
+    run('bundled + 50k words', words + padding, tokens)
+
+
+if __name__ == '__main__':
+    main()
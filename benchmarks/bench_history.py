@@ -0,0 +1,102 @@
+"""Per-rerun cost of the app's session history: list of dicts vs HistoryStore
+
+The old app rebuilt a DataFrame, CSV and base64 link plus a chart
+DataFrame on every rerun; the store only appends and hands the chart the
+new points. Exports are timed separately since they now only run on
+request.
+
+Usage: python benchmarks/bench_history.py [n_entries] [capacity]
+"""
+
+import base64
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+from corpus import generate
+from sentiment_engine import analyze_batch
+from sentiment_engine.history import HistoryStore
+
+
+def entries(n):
+    texts = generate(n)
+    for i, (text, result) in enumerate(zip(texts, analyze_batch(texts))):
+        yield {
+            'timestamp': f"{i // 60 % 24:02d}:{i % 60:02d}",
+            'text': text,
+            'sentiment': result['sentiment'],
+            'polarity': result['polarity'],
+            'confidence': result['confidence'],
+            'slang_score': result['slang_score'],
+            'subjectivity': result['subjectivity'],
+        }
+
+
+def rerun_list(history, entry):
+    history.append(entry)
+    csv = pd.DataFrame(history).to_csv(index=False)
+    base64.b64encode(csv.encode()).decode()
+    df = pd.DataFrame(history)
+    df['index'] = range(len(df))
+
+
+def rerun_store(history, entry, seen):
+    history.append(entry)
+    return history.since(seen)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    data = list(entries(n))
+
+    history = []
+    start = time.perf_counter()
+    for entry in data:
+        rerun_list(history, entry)
+    t_list = time.perf_counter() - start
+
+    store = HistoryStore(capacity)
+    seen = 0
+    start = time.perf_counter()
+    for entry in data:
+        rerun_store(store, entry, seen)
+        seen = store.total
+    t_store = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.to_csv()
+    t_csv = time.perf_counter() - start
+    start = time.perf_counter()
+    store.to_parquet()
+    t_parquet = time.perf_counter() - start
+
+    tracemalloc.start()
+    history = [dict(entry) for entry in data]
+    frame = pd.DataFrame(history)
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del history, frame
+
+    tracemalloc.start()
+    store = HistoryStore(capacity)
+    for entry in data:
+        store.append(entry)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{n} reruns, capacity {capacity}")
+    print(f"list + DataFrame/CSV per rerun: {t_list:8.2f} s  ({t_list / n * 1e3:.2f} ms/rerun)")
+    print(f"HistoryStore append + since:    {t_store:8.2f} s  ({t_store / n * 1e6:.1f} µs/rerun)")
+    print(f"on-demand export: csv {t_csv * 1e3:.1f} ms, parquet {t_parquet * 1e3:.1f} ms")
+    print(f"memory: list + DataFrame {list_bytes / 2**20:.1f} MiB (all {n} entries), "
+          f"store {store_bytes / 2**20:.2f} MiB ({len(store)} entries)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Per-keystroke latency of live typing: full re-analysis vs IncrementalAnalyzer
+
+A sentence is typed one character at a time into reviews of growing
+length, at the end and in the middle. Each keystroke is scored with
+analyze_hinglish_genz_sentiment on the whole text and with
+IncrementalAnalyzer.update, both on the lexicon baseline without
+subjectivity (TextBlob is not incremental). Both must return the same
+result for every keystroke.
+
+Typing in the middle stays O(n) in the tokens after the cursor: a changed
+score means re-adding the running lexicon score left to right (in C), the
+only order that reproduces the single-text polarity exactly. Expect the
+middle column to grow about linearly from 2,000 to 20,000 tokens, while
+typing at the end stays far below it.
+
+Usage: python benchmarks/bench_incremental.py [max_tokens]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate
+from sentiment_engine import analyze_hinglish_genz_sentiment
+from sentiment_engine.incremental import IncrementalAnalyzer
+
+TYPED = " boht mast product hai, not bad at all! no cap this hits different 🔥"
+
+
+def keystrokes(text, at):
+    """Every version of ``text`` while TYPED is typed in at char offset ``at``"""
+    return [text[:at] + TYPED[:i] + text[at:] for i in range(1, len(TYPED) + 1)]
+
+
+def main():
+    max_tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    reviews = generate(max_tokens // 8 + 1, phrase_rate=0.05)
+    print(f"{len(TYPED)} keystrokes per run, lexicon baseline")
+    print(f"{'tokens':>7s} {'typing at':>9s} {'full us/key':>12s} {'incremental us/key':>19s} {'speedup':>8s}")
+    size = 20
+    while size <= max_tokens:
+        words = " ".join(reviews).split()[:size]
+        text = " ".join(words)
+        for name, at in (('end', len(text)), ('middle', text.rfind(' ', 0, len(text) // 2) + 1)):
+            versions = keystrokes(text, at)
+
+            start = time.perf_counter()
+            full = [analyze_hinglish_genz_sentiment(v, 'lexicon', False) for v in versions]
+            t_full = time.perf_counter() - start
+
+            analyzer = IncrementalAnalyzer(text)
+            start = time.perf_counter()
+            incremental = [analyzer.update(v) for v in versions]
+            t_inc = time.perf_counter() - start
+
+            assert incremental == full
+            per_key = 1e6 / len(versions)
+            print(f"{size:7d} {name:>9s} {t_full * per_key:12.0f} {t_inc * per_key:19.0f} {t_full / t_inc:7.1f}x")
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Per-review latency of each TextBlob baseline mode
+
+Usage: python benchmarks/bench_modes.py [n_reviews]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_batch import make_reviews
+from sentiment_engine import analyze_batch, analyze_hinglish_genz_sentiment
+from sentiment_engine.core import BASELINE_MODES
+
+
+def per_review_us(fn, reviews):
+    start = time.perf_counter()
+    fn(reviews)
+    return (time.perf_counter() - start) / len(reviews) * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    reviews = make_reviews(n)
+    # Half the reviews carry no lexicon words, so 'fallback' has work to do
+    rng = random.Random(1)
+    plain = "the delivery was on time and box looked fine but packing could improve".split()
+    for i in range(0, n, 2):
+        reviews[i] = " ".join(rng.choices(plain, k=rng.randint(4, 30)))
+
+    print(f"reviews: {n}   (latency in microseconds per review)")
+    print(f"{'mode':<10} {'subjectivity':<13} {'single':>9} {'batch':>9}")
+    for mode in BASELINE_MODES:
+        for subjectivity in (True, False):
+            single = per_review_us(
+                lambda rs: [analyze_hinglish_genz_sentiment(r, mode, subjectivity) for r in rs], reviews)
+            batch = per_review_us(lambda rs: analyze_batch(rs, mode, subjectivity), reviews)
+            print(f"{mode:<10} {str(subjectivity):<13} {single:9.1f} {batch:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
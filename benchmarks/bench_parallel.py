@@ -0,0 +1,40 @@
+"""Speedup curve of the process-pool scorer from 1 to N workers
+
+Usage: python benchmarks/bench_parallel.py [n_reviews] [max_workers] [chunksize]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_batch import make_reviews
+from sentiment_engine import ParallelScorer, analyze_batch
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    reviews = make_reviews(n)
+
+    start = time.perf_counter()
+    expected = analyze_batch(reviews)
+    baseline = time.perf_counter() - start
+    print(f"reviews: {n}  chunksize: {chunksize}  cpus: {os.cpu_count()}")
+    print(f"{'in-process':>10}  {baseline:8.2f}s  {n / baseline:10.0f} reviews/s")
+
+    counts = sorted({2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers} | {max_workers})
+    for workers in counts:
+        with ParallelScorer(workers, chunksize) as scorer:
+            scorer.map(reviews[:workers])  # start every worker before timing
+            start = time.perf_counter()
+            results = scorer.map(reviews)
+            elapsed = time.perf_counter() - start
+        assert results == expected, "parallel results differ"
+        print(f"{workers:>10}  {elapsed:8.2f}s  {n / elapsed:10.0f} reviews/s  speedup {baseline / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Phrase matching throughput as the phrase lexicon grows
+
+Synthetic 2-4 word phrases built from the lexicon and filler words are
+added to PHRASES. Because they overlap ordinary review words heavily,
+most tokens become phrase candidates. The same corpus, with phrases
+mixed in, is scored with every phrase count. Aho-Corasick scans each
+review once, so the lexicon stage should stay close to flat as the
+count grows.
+
+Usage: python benchmarks/bench_phrases.py [n_reviews] [max_phrases]
+"""
+
+from collections import Counter
+from itertools import islice
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate, vocabulary
+from sentiment_engine import analyze_batch
+from sentiment_engine.batch import _collapse_phrases, _lexicon_scores, get_table
+from sentiment_engine.core import score_tokens
+from sentiment_engine.lexicons import PHRASES
+from sentiment_engine.phrases import PhraseMatcher
+from sentiment_engine.tokenizer import tokenize
+
+
+def synthetic_phrases(n, seed=0):
+    """n distinct phrases of 2-4 lexicon and filler words"""
+    rng = random.Random(seed)
+    pools = vocabulary()
+    words = pools['slang'] + pools['filler'] + pools['emotion']
+    phrases = {}
+    while len(phrases) < n:
+        phrase = " ".join(rng.choice(words) for _ in range(rng.randint(2, 4)))
+        if phrase not in PHRASES:
+            phrases[phrase] = round(rng.uniform(-1, 1), 2)
+    return phrases
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    max_phrases = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    bundled = dict(PHRASES)
+    extra = synthetic_phrases(max_phrases)
+
+    # One corpus for every run, with phrases from the largest lexicon mixed in
+    PHRASES.update(extra)
+    reviews = generate(n, phrase_rate=0.1)
+    docs = [tokenize(r) for r in reviews]
+    n_tokens = sum(map(len, docs))
+
+    print(f"{n} reviews, {n_tokens} tokens")
+    print(f"{'phrases':>8s} {'build ms':>9s} {'single tok/s':>13s} {'batch tok/s':>12s} "
+          f"{'end-to-end rev/s':>17s} {'hits/review':>12s}")
+    counts = sorted({0, len(bundled), 1000, 10_000, max_phrases})
+    for count in counts:
+        PHRASES.clear()
+        if count:
+            PHRASES.update(bundled)
+            PHRASES.update(dict(islice(extra.items(), count - len(bundled))))
+        _, t_build = timed(PhraseMatcher, PHRASES) if PHRASES else (None, 0.0)
+
+        table = get_table()
+        stats = Counter()
+        _, t_single = timed(lambda: [score_tokens(d, stats) for d in docs])
+        ids, lengths = table.encode(docs)
+
+        def lexicon_stage():
+            i, l = (ids, lengths) if table.phrases is None else _collapse_phrases(table, ids, lengths)
+            return _lexicon_scores(table, i, l)
+        _, t_batch = timed(lexicon_stage)
+        _, t_total = timed(analyze_batch, reviews, 'lexicon', False)
+        print(f"{len(PHRASES):8d} {t_build * 1e3:9.1f} {n_tokens / t_single:13.0f} {n_tokens / t_batch:12.0f} "
+              f"{n / t_total:17.0f} {stats['phrases'] / n:12.2f}")
+
+    PHRASES.clear()
+    PHRASES.update(bundled)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Reading a large JSONL dump: line-by-line vs memory-mapped spans
+
+A JSONL dump of synthetic reviews is written to a temporary file and
+read, then read and scored (lexicon baseline, so reading is a large
+share of the work), in chunks:
+
+- lines:   cli.read_reviews, one readline() and json.loads per record
+- mmap:    mapped.read_spans, records found by a background NumPy scan
+- pandas:  pd.read_json(lines=True), the whole file at once (read only)
+
+With workers, lines ships every text to the pool (ParallelScorer.map)
+and mmap only byte offsets (ParallelScorer.map_spans). Before every run
+the file is dropped from the page cache where the OS allows it
+(posix_fadvise), so reads hit the disk. Peak traced memory is measured
+in a separate, untimed run.
+
+Usage: python benchmarks/bench_reader.py [n_reviews] [workers]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate
+from sentiment_engine import ParallelScorer, analyze_batch
+from sentiment_engine.cli import _chunks, read_reviews
+from sentiment_engine.mapped import read_spans
+
+CHUNK = 10_000
+
+
+def write_dump(path, n):
+    reviews = generate(min(n, 100_000), seed=5)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n):
+            f.write(json.dumps({'id': i, 'product': f'p{i % 977}', 'text': reviews[i % len(reviews)]},
+                               ensure_ascii=False) + '\n')
+
+
+def drop_cache(path):
+    if hasattr(os, 'posix_fadvise'):
+        with open(path, 'rb') as f:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def lines(path, score):
+    n = 0
+    for chunk in _chunks(read_reviews(path), CHUNK):
+        n += len(score([text for text, _ in chunk]))
+    return n
+
+
+def spans(path, score):
+    n = 0
+    for chunk in read_spans(path, chunksize=CHUNK):
+        n += len(score(chunk.texts()))
+    return n
+
+
+def spans_to_workers(path, scorer):
+    return sum(len(scorer.map_spans(chunk)) for chunk in read_spans(path, chunksize=CHUNK))
+
+
+def pandas_read(path):
+    import pandas as pd
+    return len(pd.read_json(path, lines=True)['text'].tolist())
+
+
+def measure(path, fn, memory=True):
+    """(records, seconds, peak traced MiB or None) of a cold-cache run"""
+    drop_cache(path)
+    start = time.perf_counter()
+    n = fn()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        drop_cache(path)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return n, seconds, peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    score = lambda texts: analyze_batch(texts, 'lexicon', False)
+    read = lambda texts: texts
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dump.jsonl')
+        write_dump(path, n)
+        mib = os.path.getsize(path) / 2**20
+        score(["warm up"])
+        print(f"{n} records, {mib:.0f} MiB, chunks of {CHUNK}")
+        print(f"{'':28s} {'seconds':>8s} {'records/s':>10s} {'MiB/s':>7s} {'peak MiB':>9s}")
+
+        def row(name, fn, memory=True):
+            count, seconds, peak = measure(path, fn, memory)
+            assert count == n, f"{name} read {count} records"
+            peak = f"{peak:9.1f}" if peak is not None else f"{'-':>9s}"
+            print(f"{name:28s} {seconds:8.2f} {n / seconds:10.0f} {mib / seconds:7.0f} {peak}")
+
+        row('read: lines', lambda: lines(path, read))
+        row('read: mmap', lambda: spans(path, read))
+        row('read: pandas', lambda: pandas_read(path))
+        row('score: lines', lambda: lines(path, score), memory=False)
+        row('score: mmap', lambda: spans(path, score), memory=False)
+        with ParallelScorer(workers, 1000, 'lexicon', False) as scorer:
+            scorer.map(["warm up"] * workers)
+            row(f'score: lines, {workers} workers', lambda: lines(path, scorer.map), memory=False)
+            row(f'score: mmap, {workers} workers', lambda: spans_to_workers(path, scorer), memory=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Lexicon hot swaps under load
+
+A scoring thread runs analyze_batch and analyze_hinglish_genz_sentiment
+over synthetic reviews while the main thread installs one of two
+compiled lexicon variants every few milliseconds, as LexiconWatcher
+does. Every batch must carry a single lexicon_version and match, review
+for review, the results that version gives without any swapping; that
+is, an in-flight batch finished on the snapshot it started with.
+
+Also reports the cost of taking the current snapshot, which every review
+or batch pays, and the time of one swap.
+
+Usage: python benchmarks/bench_reload.py [seconds] [swap_ms]
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate
+from sentiment_engine import analyze_batch, analyze_hinglish_genz_sentiment
+from sentiment_engine.compiled import LexiconTable, bundled_sources, install
+from sentiment_engine.snapshot import get_snapshot
+
+
+def variants():
+    """Two compiled lexicons: the bundled one and one with every slang weight halved"""
+    sources = bundled_sources()
+    halved = dict(sources)
+    for name in ('genz_positive', 'genz_negative'):
+        halved[name] = {word: value / 2 for word, value in sources[name].items()}
+    return LexiconTable.from_sources(sources), LexiconTable.from_sources(halved)
+
+
+def expected(tables, reviews, batch_size):
+    """Batch and single results of every variant, keyed by lexicon version"""
+    results = {}
+    for table in tables:
+        tag = install(table).tag
+        batches = [analyze_batch(reviews[i:i + batch_size], 'lexicon', False)
+                   for i in range(0, len(reviews), batch_size)]
+        singles = [analyze_hinglish_genz_sentiment(r, 'lexicon', False) for r in reviews[:batch_size]]
+        results[tag] = (batches, singles)
+    return results
+
+
+def score(reviews, batch_size, stop, log):
+    i = 0
+    while not stop.is_set():
+        k = i % (len(reviews) // batch_size)
+        start = time.perf_counter()
+        results = analyze_batch(reviews[k * batch_size:(k + 1) * batch_size], 'lexicon', False)
+        log.append(('batch', k, results, time.perf_counter() - start))
+        single = analyze_hinglish_genz_sentiment(reviews[i % batch_size], 'lexicon', False)
+        log.append(('single', i % batch_size, single, None))
+        i += 1
+
+
+def run(reviews, batch_size, tables, seconds, swap_ms):
+    """Score for ``seconds``, swapping lexicons every ``swap_ms`` (never if None)"""
+    stop = threading.Event()
+    log = []
+    worker = threading.Thread(target=score, args=(reviews, batch_size, stop, log))
+    swaps = []
+    worker.start()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if swap_ms is None:
+            time.sleep(0.05)
+            continue
+        time.sleep(swap_ms / 1000)
+        start = time.perf_counter()
+        install(tables[len(swaps) % 2])
+        swaps.append(time.perf_counter() - start)
+    stop.set()
+    worker.join()
+    return log, swaps
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    swap_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    batch_size = 500
+    reviews = generate(20 * batch_size, seed=3)
+    tables = variants()
+    truth = expected(tables, reviews, batch_size)
+
+    n = 1_000_000
+    start = time.perf_counter()
+    for _ in range(n):
+        get_snapshot()
+    print(f"get_snapshot: {(time.perf_counter() - start) / n * 1e9:.0f} ns per call")
+
+    for name, interval in (('no swaps', None), (f'swap every {swap_ms:g} ms', swap_ms)):
+        log, swaps = run(reviews, batch_size, tables, seconds, interval)
+        latencies = [seconds for kind, _, _, seconds in log if kind == 'batch']
+        versions = set()
+        for kind, k, results, _ in log:
+            if kind == 'batch':
+                tags = {r['lexicon_version'] for r in results}
+                assert len(tags) == 1, f"batch scored with several lexicons: {tags}"
+                tag = tags.pop()
+                assert results == truth[tag][0][k], "batch does not match its lexicon version"
+            else:
+                tag = results['lexicon_version']
+                assert results == truth[tag][1][k], "review does not match its lexicon version"
+            versions.add(tag)
+        p99 = sorted(latencies)[int(0.99 * (len(latencies) - 1))]
+        line = (f"{name:20s} {len(latencies):5d} batches  {batch_size * len(latencies) / seconds:8.0f} reviews/s"
+                f"  p50 {statistics.median(latencies) * 1e3:6.2f} ms  p99 {p99 * 1e3:6.2f} ms"
+                f"  {len(versions)} versions")
+        if swaps:
+            line += f"  {len(swaps)} swaps, {statistics.median(swaps) * 1e3:.2f} ms each"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Memory per result: default dicts vs compact Result / ResultBatch
+
+Results are kept alive while tracemalloc measures them, as they would be
+when a job holds every result before writing it out.
+
+Usage: python benchmarks/bench_results.py [n_reviews]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate
+from sentiment_engine import analyze_batch, analyze_hinglish_genz_sentiment
+
+
+def measure(build):
+    """(seconds, bytes still allocated) for build(), keeping its result alive"""
+    start = time.perf_counter()
+    build()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    results = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return seconds, size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    texts = generate(n)
+    analyze_batch(texts[:10])
+    analyze_hinglish_genz_sentiment(texts[0])
+
+    cases = {
+        'single, dict': lambda: [analyze_hinglish_genz_sentiment(t) for t in texts],
+        'single, Result': lambda: [analyze_hinglish_genz_sentiment(t, compact=True) for t in texts],
+        'batch, dicts': lambda: analyze_batch(texts),
+        'batch, ResultBatch': lambda: analyze_batch(texts, compact=True),
+    }
+    print(f"{n} reviews")
+    print(f"{'':20s} {'bytes/result':>12s} {'total MiB':>10s} {'reviews/s':>10s}")
+    for name, build in cases.items():
+        seconds, size = measure(build)
+        print(f"{name:20s} {size / n:12.0f} {size / 2**20:10.1f} {n / seconds:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Segment-level scoring of long documents: batch, parallel and streaming
+
+A forum-thread-like document is built from synthetic reviews joined by
+sentence ends, contrast words and line breaks. It is scored whole (one
+result), with analyze_segments on one core and on a ParallelScorer, and
+with stream_segments reading 64 KiB chunks. Peak traced memory shows
+that streaming holds one batch, not the document's intermediate state.
+
+Usage: python benchmarks/bench_segments.py [n_reviews] [workers]
+"""
+
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from corpus import generate
+from sentiment_engine import ParallelScorer, analyze_batch
+from sentiment_engine.segments import SegmentSummary, analyze_segments, split_segments, stream_segments
+
+JOINS = ('. ', '! ', ' but ', ' lekin ', '\n')
+
+
+def thread(n, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    for review in generate(n, seed=seed):
+        parts.append(review.rstrip('.!? '))
+        parts.append(rng.choice(JOINS))
+    return ''.join(parts)
+
+
+def chunks(text, size=1 << 16):
+    f = io.StringIO(text)
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def measure(fn):
+    """(result, seconds, peak traced bytes); timed without tracemalloc, which slows everything down"""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def streamed(text, **kwargs):
+    summary = SegmentSummary()
+    for segment in stream_segments(chunks(text), **kwargs):
+        summary.add(segment)
+    return summary.to_dict()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    text = thread(n)
+    analyze_batch(["warm up"], 'lexicon', False)
+    n = len(split_segments(text))
+    print(f"{n} segments, {len(text) / 2**20:.1f} MiB of text, lexicon baseline")
+    print(f"{'':28s} {'seconds':>8s} {'segments/s':>11s} {'peak MiB':>9s}")
+
+    cases = {
+        'whole document': lambda: analyze_batch([text], 'lexicon', False),
+        'split_segments': lambda: split_segments(text),
+        'analyze_segments': lambda: analyze_segments(text, 'lexicon', False)['aggregate'],
+        'stream_segments': lambda: streamed(text, baseline='lexicon', subjectivity=False),
+    }
+    results = {}
+    for name, fn in cases.items():
+        results[name], seconds, peak = measure(fn)
+        print(f"{name:28s} {seconds:8.2f} {n / seconds:11.0f} {peak / 2**20:9.1f}")
+
+    with ParallelScorer(workers, chunksize=2000, baseline='lexicon', subjectivity=False) as scorer:
+        scorer.map(["warm up"] * workers)
+        name = f'analyze_segments, {workers} workers'
+        results[name], seconds, peak = measure(
+            lambda: analyze_segments(text, score_batch=scorer.map)['aggregate'])
+        print(f"{name:28s} {seconds:8.2f} {n / seconds:11.0f} {peak / 2**20:9.1f}")
+
+    assert results['analyze_segments'] == results['stream_segments'] == results[name]
+    print("aggregate:", results['stream_segments'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Load test the HTTP scoring service on localhost
+
+Starts the server in-process on a free port, then runs concurrent
+keep-alive clients against /analyze and reports client-side throughput
+and latency next to the server's own metrics.
+
+Usage: python benchmarks/bench_server.py [clients] [requests_per_client] [workers]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_batch import make_reviews
+from sentiment_engine.parallel import ParallelScorer
+from sentiment_engine.server import ScoringServer
+
+
+async def client(port, reviews, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for review in reviews:
+        body = json.dumps({'text': review}).encode('utf-8')
+        start = time.perf_counter()
+        writer.write(b'POST /analyze HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                     + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+        await writer.drain()
+        status = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            if line.lower().startswith(b'content-length'):
+                length = int(line.split(b':')[1])
+        await reader.readexactly(length)
+        if b' 200 ' in status:
+            latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    reviews = make_reviews(clients * per_client)
+
+    with ParallelScorer(workers, 64) as scorer:
+        server = ScoringServer(scorer, max_batch_size=64, max_wait_ms=5)
+        _, port = await server.start('127.0.0.1', 0)
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, reviews[i::clients], latencies) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+        metrics = server.metrics()
+        await server.stop()
+
+    latencies.sort()
+    print(f"clients: {clients}  requests: {len(reviews)}  workers: {scorer.workers}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s  ok: {len(latencies)}")
+    print(f"client p50: {latencies[len(latencies) // 2] * 1000:.1f} ms"
+          f"  p99: {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+    print("server metrics:", json.dumps(metrics, indent=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
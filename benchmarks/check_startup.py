@@ -0,0 +1,81 @@
+"""Cold-start budget check: import time and time to first score
+
+Every measurement runs in a fresh interpreter, so nothing is cached in
+sys.modules, and is timed from the start of ``import sentiment_engine``
+to the first result. The median of ``--runs`` runs must stay within its
+budget, and importing the package must not load any of the heavy
+modules listed in HEAVY. Exits with status 1 on any failure, so it can gate CI.
+
+Usage: python benchmarks/check_startup.py [--runs N] [--scale F]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must not be loaded by a bare ``import sentiment_engine``
+HEAVY = ('numpy', 'pandas', 'textblob', 'nltk', 'streamlit', 'plotly')
+
+# name -> (first call, budget in ms from the start of the import to its result)
+CHECKS = {
+    'import': ('', 60),
+    'first_score_lexicon': ("se.analyze_hinglish_genz_sentiment(REVIEW, baseline='lexicon', subjectivity=False)", 80),
+    'first_score_blend': ("se.analyze_hinglish_genz_sentiment(REVIEW)", 1500),
+    'first_batch_lexicon': ("se.analyze_batch([REVIEW], baseline='lexicon', subjectivity=False)", 800),
+}
+
+PROBE = """
+import json, sys, time
+REVIEW = "No cap this is goated! W purchase, hits different. Bussin fr fr!"
+start = time.perf_counter()
+import sentiment_engine as se
+imported = time.perf_counter()
+heavy = [name for name in {heavy!r} if name in sys.modules]
+{code}
+done = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - start) * 1e3, 'total_ms': (done - start) * 1e3, 'heavy': heavy}}))
+"""
+
+
+def probe(code):
+    """Run one measurement in a fresh interpreter"""
+    out = subprocess.run([sys.executable, '-c', PROBE.format(heavy=HEAVY, code=code)],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check import time and time-to-first-score budgets.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiply every budget, e.g. 2 on a slow CI machine')
+    args = parser.parse_args()
+
+    failures = []
+    for name, (code, budget) in CHECKS.items():
+        runs = [probe(code) for _ in range(args.runs)]
+        key = 'total_ms' if code else 'import_ms'
+        median = statistics.median(run[key] for run in runs)
+        limit = budget * args.scale
+        ok = median <= limit
+        print(f"{name:22s} {median:8.1f} ms  (budget {limit:6.0f} ms)  {'ok' if ok else 'OVER'}")
+        if not ok:
+            failures.append(name)
+        if not code:
+            heavy = sorted({m for run in runs for m in run['heavy']})
+            print(f"{'heavy modules loaded':22s} {', '.join(heavy) or 'none'}")
+            if heavy:
+                failures.append('heavy imports')
+
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
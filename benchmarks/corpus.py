@@ -0,0 +1,116 @@
+"""Deterministic synthetic Hinglish / Gen Z review generator
+
+Reviews are drawn from the engine's own lexicons, negation words and
+intensifiers mixed with neutral filler, so every code path of the scorer
+gets exercised. The same arguments always give the same reviews.
+
+Usage: python benchmarks/corpus.py N [--seed S] [--slang-density D] > reviews.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sentiment_engine.lexicons import (
+    HINGLISH_POSITIVE, HINGLISH_NEGATIVE, GENZ_SLANG_POSITIVE, GENZ_SLANG_NEGATIVE,
+    HINDI_INTENSIFIERS, EMOTION_KEYWORDS, NEGATION_WORDS, PHRASES
+)
+
+FILLER = (
+    "ye product the delivery was and quality ka bhi hai tha ki se mein par "
+    "i it this my box order phone item seller price after use for days with "
+    "kal aaj packing size colour battery camera screen but so on time got"
+).split()
+DECORATIONS = ('!', '!!', '?', '.', ' 🔥', ' 😭', ' 💯', ' 👎', ' fr', ' https://amzn.in/d/x1')
+
+
+def _unique(words):
+    return list(dict.fromkeys(words))
+
+
+def vocabulary():
+    """Word pools the generator draws from"""
+    slang = _unique([*HINGLISH_POSITIVE, *HINGLISH_NEGATIVE, *GENZ_SLANG_POSITIVE, *GENZ_SLANG_NEGATIVE])
+    emotion = _unique(w for words in EMOTION_KEYWORDS.values() for w in words)
+    return {
+        'slang': slang,
+        'emotion': [w for w in emotion if w not in set(slang)],
+        'negation': sorted(NEGATION_WORDS),
+        'intensifier': list(HINDI_INTENSIFIERS),
+        'phrase': list(PHRASES),
+        'filler': FILLER,
+    }
+
+
+def iter_reviews(n, seed=0, min_words=4, max_words=30, slang_density=0.3,
+                 negation_rate=0.15, intensifier_rate=0.2, decoration_rate=0.3, phrase_rate=0.0):
+    """Yield n synthetic reviews
+
+    ``slang_density`` is the share of lexicon words among the words of a
+    review. Each lexicon word is preceded by an intensifier with
+    probability ``intensifier_rate`` and negated (before or after) with
+    probability ``negation_rate``. Some reviews get punctuation, emoji or
+    a URL appended (``decoration_rate``). With ``phrase_rate`` above zero,
+    that share of lexicon draws is a whole phrase from PHRASES instead; it
+    is off by default so existing corpora stay the same.
+    """
+    rng = random.Random(seed)
+    pools = vocabulary()
+    slang, emotion, filler = pools['slang'], pools['emotion'], pools['filler']
+    negation, intensifier, phrases = pools['negation'], pools['intensifier'], pools['phrase']
+    for _ in range(n):
+        length = rng.randint(min_words, max_words)
+        words = []
+        while len(words) < length:
+            if rng.random() < slang_density:
+                if rng.random() < intensifier_rate:
+                    words.append(rng.choice(intensifier))
+                if phrase_rate and rng.random() < phrase_rate:
+                    words.extend(rng.choice(phrases).split())
+                else:
+                    words.append(rng.choice(slang))
+                if rng.random() < negation_rate:
+                    # Negations go either just before or right after the word
+                    if rng.random() < 0.5:
+                        words.insert(len(words) - 1, rng.choice(negation))
+                    else:
+                        words.append(rng.choice(negation))
+            elif rng.random() < 0.1:
+                words.append(rng.choice(emotion))
+            else:
+                words.append(rng.choice(filler))
+        review = " ".join(words[:length])
+        if rng.random() < 0.3:
+            review = review.capitalize()
+        if rng.random() < decoration_rate:
+            review += rng.choice(DECORATIONS)
+        yield review
+
+
+def generate(n, seed=0, **options):
+    """Return n synthetic reviews as a list (see iter_reviews)"""
+    return list(iter_reviews(n, seed, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write synthetic reviews as JSON lines.')
+    parser.add_argument('n', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-words', type=int, default=4)
+    parser.add_argument('--max-words', type=int, default=30)
+    parser.add_argument('--slang-density', type=float, default=0.3)
+    parser.add_argument('--negation-rate', type=float, default=0.15)
+    parser.add_argument('--intensifier-rate', type=float, default=0.2)
+    parser.add_argument('--phrase-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    for review in iter_reviews(args.n, args.seed, args.min_words, args.max_words, args.slang_density,
+                               args.negation_rate, args.intensifier_rate, phrase_rate=args.phrase_rate):
+        sys.stdout.write(json.dumps({'text': review}, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark suite: throughput, per-stage latency and peak memory
+
+For every corpus size the suite measures
+
+- reviews/sec of analyze_hinglish_genz_sentiment (one review at a time)
+  and of analyze_batch (in chunks of --batch-size)
+- per-review latency of each stage of the single-text scorer: cleaning,
+  lexicon loop, TextBlob and emotions (mean, p50, p99)
+- peak memory traced while scoring, results discarded
+
+Results are written as JSON, by default to benchmarks/results/<commit>.json,
+and two result files can be compared:
+
+    python benchmarks/suite.py --sizes 1000 100000 1000000
+    python benchmarks/suite.py --compare results/abc123.json results/def456.json
+"""
+
+import argparse
+from datetime import datetime, timezone
+import gc
+from importlib import metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from textblob import TextBlob
+
+from corpus import generate
+from sentiment_engine import analyze_batch, analyze_hinglish_genz_sentiment, analyze_emotions
+from sentiment_engine.core import score_tokens
+from sentiment_engine.tokenizer import clean_and_tokenize
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+STAGES = ('clean', 'lexicon', 'textblob', 'emotions')
+
+
+def git_commit():
+    """Short commit hash of the tree, with '-dirty' for uncommitted changes"""
+    def git(*args):
+        return subprocess.run(['git', *args], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+    return commit + '-dirty' if git('status', '--porcelain', '--untracked-files=no') else commit
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'textblob': metadata.version('textblob'),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def single_loop(reviews):
+    for review in reviews:
+        analyze_hinglish_genz_sentiment(review)
+
+
+def batch_loop(reviews, batch_size):
+    for start in range(0, len(reviews), batch_size):
+        analyze_batch(reviews[start:start + batch_size])
+
+
+def throughput(fn, reviews, *args):
+    gc.collect()
+    start = time.perf_counter()
+    fn(reviews, *args)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'reviews_per_sec': len(reviews) / seconds}
+
+
+def peak_memory(fn, reviews, *args):
+    """Peak bytes allocated while fn runs, on top of what was already live"""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    fn(reviews, *args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+
+def stage_latencies(reviews):
+    """Time each stage of the single-text scorer for every review"""
+    clock = time.perf_counter_ns
+    times = np.empty((len(STAGES), len(reviews)), dtype=np.int64)
+    for i, review in enumerate(reviews):
+        t0 = clock()
+        cleaned, words = clean_and_tokenize(review)
+        t1 = clock()
+        score_tokens(words)
+        t2 = clock()
+        TextBlob(cleaned).sentiment
+        t3 = clock()
+        analyze_emotions(cleaned, words)
+        t4 = clock()
+        times[:, i] = (t1 - t0, t2 - t1, t3 - t2, t4 - t3)
+    return {
+        stage: {
+            'total_s': float(row.sum()) / 1e9,
+            'mean_us': float(row.mean()) / 1e3,
+            'p50_us': float(np.percentile(row, 50)) / 1e3,
+            'p99_us': float(np.percentile(row, 99)) / 1e3,
+        }
+        for stage, row in zip(STAGES, times)
+    }
+
+
+def run_size(n, seed, batch_size, memory):
+    reviews = generate(n, seed)
+    run = {
+        'n': n,
+        'single': throughput(single_loop, reviews),
+        'batch': throughput(batch_loop, reviews, batch_size),
+        'stages': stage_latencies(reviews),
+    }
+    if memory:
+        run['single']['peak_bytes'] = peak_memory(single_loop, reviews)
+        run['batch']['peak_bytes'] = peak_memory(batch_loop, reviews, batch_size)
+    return run
+
+
+def report(run):
+    print(f"\nreviews: {run['n']}")
+    for name in ('single', 'batch'):
+        r = run[name]
+        memory = f"  peak {r['peak_bytes'] / 2**20:8.1f} MiB" if 'peak_bytes' in r else ''
+        print(f"  {name:8} {r['reviews_per_sec']:10.0f} reviews/s  {r['seconds']:8.2f}s{memory}")
+    for stage, s in run['stages'].items():
+        print(f"  {stage:8} mean {s['mean_us']:8.1f} us  p50 {s['p50_us']:8.1f} us  p99 {s['p99_us']:8.1f} us")
+
+
+def compare(old_path, new_path):
+    """Print new/old ratios for every size present in both result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['environment']['commit']} -> {new['environment']['commit']}")
+    old_runs = {run['n']: run for run in old['runs']}
+    for run in new['runs']:
+        base = old_runs.get(run['n'])
+        if base is None:
+            continue
+        print(f"\nreviews: {run['n']}")
+        for name in ('single', 'batch'):
+            a, b = base[name]['reviews_per_sec'], run[name]['reviews_per_sec']
+            print(f"  {name:8} {a:10.0f} -> {b:10.0f} reviews/s  ({b / a:5.2f}x)")
+            if 'peak_bytes' in base[name] and 'peak_bytes' in run[name]:
+                a, b = base[name]['peak_bytes'], run[name]['peak_bytes']
+                print(f"  {'':8} {a / 2**20:10.1f} -> {b / 2**20:10.1f} MiB peak")
+        for stage in STAGES:
+            a, b = base['stages'][stage]['mean_us'], run['stages'][stage]['mean_us']
+            print(f"  {stage:8} {a:10.1f} -> {b:10.1f} us/review  ({a / b:5.2f}x faster)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite or compare two result files.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100_000, 1_000_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip the (slower) traced peak-memory passes')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    env = environment()
+    results = {'environment': env, 'seed': args.seed, 'batch_size': args.batch_size, 'runs': []}
+    for n in args.sizes:
+        run = run_size(n, args.seed, args.batch_size, args.memory)
+        results['runs'].append(run)
+        report(run)
+
+    output = args.output or os.path.join(RESULTS_DIR, env['commit'] + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nwrote {output}")
+
+
+if __name__ == '__main__':
+    main()
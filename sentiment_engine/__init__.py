@@ -0,0 +1,50 @@
+"""Sentiment engine for Hinglish and Gen Z product reviews
+
+Importing the package only loads the pure-Python scorer. The NumPy-backed
+batch, parallel and cache modules are imported the first time one of
+their names is used, and textblob only once a review needs the TextBlob
+baseline or subjectivity.
+"""
+
+import importlib
+
+from .lexicons import (
+    HINGLISH_POSITIVE, HINGLISH_NEGATIVE, GENZ_SLANG_POSITIVE, GENZ_SLANG_NEGATIVE,
+    HINDI_INTENSIFIERS, EMOTION_KEYWORDS, NEGATION_WORDS, lexicon_version
+)
+from .tokenizer import clean_text, tokenize
+from .core import analyze_emotions, analyze_hinglish_genz_sentiment
+from .aggregate import StreamAggregator
+
+# Exported name -> module it is loaded from on first access
+_LAZY = {
+    'LexiconTable': '.compiled',
+    'analyze_batch': '.batch',
+    'ParallelScorer': '.parallel',
+    'analyze_parallel': '.parallel',
+    'CachedAnalyzer': '.cache',
+    'IncrementalAnalyzer': '.incremental',
+    'analyze_segments': '.segments',
+    'stream_segments': '.segments',
+    'LexiconWatcher': '.reload',
+}
+
+__all__ = [
+    'HINGLISH_POSITIVE', 'HINGLISH_NEGATIVE', 'GENZ_SLANG_POSITIVE', 'GENZ_SLANG_NEGATIVE',
+    'HINDI_INTENSIFIERS', 'EMOTION_KEYWORDS', 'NEGATION_WORDS', 'lexicon_version',
+    'clean_text', 'tokenize', 'analyze_emotions', 'analyze_hinglish_genz_sentiment',
+    'StreamAggregator', *_LAZY,
+]
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,238 @@
+"""Streaming per-key sentiment rollups
+
+Scored reviews are consumed one at a time and folded into a fixed-size
+Rollup per key (a product id, a seller, a day, or a tuple of those), so
+memory grows with the number of keys, not the number of reviews:
+
+    agg = StreamAggregator()
+    for review in reviews:
+        agg.add((review['sku'], day_key(review['date'])), analyze_hinglish_genz_sentiment(review['text']))
+    agg[('sku-1', '2024-05-01')].to_dict()
+
+Every piece is mergeable, so partial aggregates built by parallel workers
+(see ParallelScorer.aggregate) combine into the same totals as one pass.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timezone
+import math
+from operator import add
+
+SENTIMENTS = ('Positive', 'Neutral', 'Negative')
+
+
+class RunningStats:
+    """Count, mean and variance in one pass (Welford), mergeable (Chan et al.)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Fixed-grid quantile sketch over a bounded range
+
+    Values are counted on ``bins`` evenly spaced points from ``lo`` to
+    ``hi`` (values outside are clamped). Memory is constant, merging is
+    adding counts, and quantiles are off by at most half a grid step.
+    The defaults put a point on every integer from 0 to 100, which makes
+    slang scores exact.
+    """
+
+    def __init__(self, lo=0.0, hi=100.0, bins=101):
+        if bins < 2 or hi <= lo:
+            raise ValueError("need hi > lo and at least 2 bins")
+        self.lo = lo
+        self.hi = hi
+        self.step = (hi - lo) / (bins - 1)
+        self.counts = [0] * bins
+        self.count = 0
+
+    def add(self, x):
+        i = round((x - self.lo) / self.step)
+        self.counts[min(max(i, 0), len(self.counts) - 1)] += 1
+        self.count += 1
+
+    def merge(self, other):
+        if (other.lo, other.hi, len(other.counts)) != (self.lo, self.hi, len(self.counts)):
+            raise ValueError("can only merge sketches with the same range and bins")
+        self.counts = list(map(add, self.counts, other.counts))
+        self.count += other.count
+
+    def quantile(self, q):
+        """Value at quantile q (0 <= q <= 1), or None when empty"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.lo + i * self.step
+        return self.hi
+
+
+class Rollup:
+    """Running statistics for all the reviews of one key"""
+
+    def __init__(self):
+        self.count = 0
+        self.sentiments = Counter()
+        self.polarity = RunningStats()
+        self.confidence = RunningStats()
+        self.emotions = {}
+        self.slang_detected = 0
+        self.slang_score = QuantileSketch()
+
+    def add(self, result):
+        """Fold one analyzer result, a dict or a compact Result, into the rollup"""
+        if isinstance(result, dict):
+            sentiment, polarity, confidence = result['sentiment'], result['polarity'], result['confidence']
+            shares = result['emotions'].items()
+            slang_score = result['slang_score']
+        else:
+            sentiment, polarity, confidence = result.sentiment, result.polarity, result.confidence
+            shares = zip(result.emotion_names, result.emotion_shares)
+            slang_score = result.slang_score
+        self.count += 1
+        self.sentiments[sentiment] += 1
+        self.polarity.add(polarity)
+        self.confidence.add(confidence)
+        emotions = self.emotions
+        for emotion, share in shares:
+            emotions[emotion] = emotions.get(emotion, 0.0) + share
+        self.slang_detected += slang_score > 0
+        self.slang_score.add(slang_score)
+
+    def merge(self, other):
+        """Add another rollup's reviews to this one"""
+        self.count += other.count
+        self.sentiments.update(other.sentiments)
+        self.polarity.merge(other.polarity)
+        self.confidence.merge(other.confidence)
+        for emotion, total in other.emotions.items():
+            self.emotions[emotion] = self.emotions.get(emotion, 0.0) + total
+        self.slang_detected += other.slang_detected
+        self.slang_score.merge(other.slang_score)
+
+    def to_dict(self):
+        n = self.count or 1
+        return {
+            'count': self.count,
+            'sentiments': {label: self.sentiments.get(label, 0) for label in SENTIMENTS},
+            'polarity_mean': self.polarity.mean,
+            'polarity_std': self.polarity.std,
+            'confidence_mean': self.confidence.mean,
+            'emotions': {emotion: total / n for emotion, total in self.emotions.items()},
+            'slang_rate': self.slang_detected / n,
+            'slang_score_p50': self.slang_score.quantile(0.5),
+            'slang_score_p90': self.slang_score.quantile(0.9),
+            'slang_score_p99': self.slang_score.quantile(0.99),
+        }
+
+
+class StreamAggregator:
+    """Per-key rollups over a stream of (key, result) pairs"""
+
+    def __init__(self):
+        self.rollups = {}
+
+    def __len__(self):
+        return len(self.rollups)
+
+    def __contains__(self, key):
+        return key in self.rollups
+
+    def __getitem__(self, key):
+        return self.rollups[key]
+
+    def keys(self):
+        return self.rollups.keys()
+
+    def items(self):
+        return self.rollups.items()
+
+    def add(self, key, result):
+        rollup = self.rollups.get(key)
+        if rollup is None:
+            rollup = self.rollups[key] = Rollup()
+        rollup.add(result)
+
+    def update(self, pairs):
+        """Add every (key, result) pair of an iterable"""
+        for key, result in pairs:
+            self.add(key, result)
+        return self
+
+    def merge(self, other):
+        """Fold another aggregator (e.g. from a worker) into this one"""
+        for key, rollup in other.rollups.items():
+            mine = self.rollups.get(key)
+            if mine is None:
+                mine = self.rollups[key] = Rollup()
+            mine.merge(rollup)
+        return self
+
+    def to_dict(self):
+        return {key: rollup.to_dict() for key, rollup in self.rollups.items()}
+
+    def rows(self, key_names=('key',)):
+        """Flat rows (one per key) ready for a DataFrame or CSV writer
+
+        Tuple keys are spread over ``key_names``.
+        """
+        rows = []
+        for key, rollup in self.rollups.items():
+            parts = key if isinstance(key, tuple) else (key,)
+            row = dict(zip(key_names, parts))
+            for name, value in rollup.to_dict().items():
+                if isinstance(value, dict):
+                    for sub, v in value.items():
+                        row[f'{name}_{sub.lower()}'] = v
+                else:
+                    row[name] = value
+            rows.append(row)
+        return rows
+
+
+def merge_all(aggregators):
+    """Merge partial aggregators into a new one"""
+    total = StreamAggregator()
+    for agg in aggregators:
+        total.merge(agg)
+    return total
+
+
+def day_key(value):
+    """Normalize a datetime, date, ISO string or epoch seconds to 'YYYY-MM-DD'"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).date().isoformat()
+    return datetime.fromisoformat(str(value)).date().isoformat()
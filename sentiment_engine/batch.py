@@ -0,0 +1,231 @@
+"""Vectorized batch scoring for large volumes of reviews"""
+
+from itertools import chain
+from time import perf_counter
+
+import numpy as np
+
+from . import profiling
+from .core import NEGATION_WINDOW, check_baseline, check_negation_window
+from .results import NEGATIVE, NEUTRAL, POSITIVE, ResultBatch
+from .snapshot import get_snapshot
+from .tokenizer import EDGE_PUNCT, tokenize_batch
+
+
+def get_table():
+    """Return the lexicon table of the current lexicon snapshot"""
+    return get_snapshot().table
+
+
+def _window_flags(flags, pos, remaining, window_before, window_after):
+    """Find negations before each token and the first one after it
+
+    The nearest negation on either side comes from a running max / min of
+    negation positions, so the cost does not grow with the window size.
+    """
+    n = len(flags)
+    idx = np.arange(n)
+    before = np.zeros(n, dtype=bool)
+    first_after = np.full(n, -1, dtype=np.int64)
+    if n < 2:
+        return before, first_after
+    last = np.maximum.accumulate(np.where(flags, idx, -1))
+    gap = idx[1:] - last[:-1]
+    before[1:] = (last[:-1] >= 0) & (gap <= window_before) & (gap <= pos[1:])
+    upcoming = np.minimum.accumulate(np.where(flags, idx, n)[::-1])[::-1]
+    gap = upcoming[1:] - idx[:-1]
+    ahead = (upcoming[1:] < n) & (gap <= window_after) & (gap <= remaining[:-1])
+    first_after[:-1] = np.where(ahead, upcoming[1:], -1)
+    return before, first_after
+
+
+def _phrase_symbols(table, docs, ids):
+    """Phrase symbol of every token, ignoring punctuation at token edges
+
+    Only tokens outside the table can carry punctuation ("notch."); they
+    are looked up again without it.
+    """
+    symbols = table.phrase_symbol[ids]
+    unknown = np.flatnonzero(ids == 0)
+    if len(unknown):
+        tokens = list(chain.from_iterable(docs))
+        get = table.phrases.vocab.get
+        symbols[unknown] = [get(tokens[i].strip(EDGE_PUNCT), 0) for i in unknown.tolist()]
+    return symbols
+
+
+def _collapse_phrases(table, ids, lengths, symbols):
+    """Replace every phrase match by the phrase's token id
+
+    Only runs of consecutive tokens that occur in some phrase can match,
+    so the automaton is only run over runs of two or more such tokens.
+    """
+    n = len(ids)
+    candidate = symbols > 0
+    doc_start = np.zeros(n + 1, dtype=bool)
+    doc_start[np.cumsum(lengths) - lengths] = True
+    doc_start[n] = True
+    prev = np.concatenate(([False], candidate[:-1]))
+    nxt = np.concatenate((candidate[1:], [False]))
+    run_starts = np.flatnonzero(candidate & (~prev | doc_start[:-1]))
+    run_ends = np.flatnonzero(candidate & (~nxt | doc_start[1:])) + 1
+    long_runs = run_ends - run_starts >= 2
+    if not long_runs.any():
+        return ids, lengths
+
+    find = table.phrases.find
+    phrase_ids = table.phrase_ids
+    ids = ids.copy()
+    keep = np.ones(n, dtype=bool)
+    for s, e in zip(run_starts[long_runs].tolist(), run_ends[long_runs].tolist()):
+        for start, end, phrase in find(symbols[s:e].tolist()):
+            ids[s + start] = phrase_ids[phrase]
+            keep[s + start + 1:s + end] = False
+    doc_ids = np.repeat(np.arange(len(lengths)), lengths)
+    return ids[keep], np.bincount(doc_ids[keep], minlength=len(lengths))
+
+
+def _emotion_counts(table, ids, lengths):
+    """Per-review emotion keyword weights, one column per emotion"""
+    doc_ids = np.repeat(np.arange(len(lengths)), lengths)
+    token_emotions = table.emotions[ids]
+    return np.column_stack([
+        np.bincount(doc_ids, weights=token_emotions[:, col], minlength=len(lengths))
+        for col in range(token_emotions.shape[1])
+    ])
+
+
+def _lexicon_scores(table, ids, lengths, stats=None, window=NEGATION_WINDOW):
+    """Score every token of the batch with array operations
+
+    Returns per-review (custom score, lexicon hit count). When ``stats``
+    (a Counter) is given, scored phrases and applied negations and
+    intensifiers are counted into it.
+    """
+    n = len(ids)
+    doc_ids = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    pos = np.arange(n) - starts[doc_ids]
+    remaining = lengths[doc_ids] - pos - 1
+
+    hit = table.is_hit[ids]
+    neg = table.is_negation[ids]
+    before, first_after = _window_flags(neg, pos, remaining, *check_negation_window(window))
+    negated = before | (first_after >= 0)
+
+    # A hit skips the first negation after it. Only hits that are also
+    # negation words can themselves be skipped, so everything else is
+    # resolved at once and the rare dependent tokens in one ordered pass.
+    dependent = hit & neg
+    skipped = np.zeros(n, dtype=bool)
+    independent = hit & ~dependent & (first_after >= 0)
+    skipped[first_after[independent]] = True
+    for i in np.flatnonzero(dependent):
+        if not skipped[i] and first_after[i] >= 0:
+            skipped[first_after[i]] = True
+
+    active = hit & ~skipped
+    multiplier = np.ones(n)
+    if n > 1:
+        # Product of each run of consecutive intensifiers up to every token;
+        # stacked ones ("boht boht") are rare, so they are chained in a loop
+        intense = table.is_intensifier[ids]
+        run = np.where(intense, table.intensity[ids], 1.0)
+        prev_intense = intense[:-1] & (pos[1:] > 0)
+        for i in np.flatnonzero(intense[1:] & prev_intense) + 1:
+            run[i] *= run[i - 1]
+        multiplier[1:] = np.where(prev_intense, run[:-1], 1.0)
+
+    score = table.value[ids] * multiplier
+    positive = table.is_positive[ids]
+    score = np.where(negated & positive, -np.abs(score), score)
+    score = np.where(negated & ~positive, np.abs(score) * 0.6, score)
+
+    if stats is not None:
+        stats['phrases'] += int(np.count_nonzero(active & table.is_phrase[ids]))
+        stats['negations'] += int(np.count_nonzero(active & negated))
+        stats['intensifiers'] += int(np.count_nonzero(active[1:] & prev_intense)) if n > 1 else 0
+    n_docs = len(lengths)
+    custom = np.bincount(doc_ids[active], weights=score[active], minlength=n_docs)
+    word_count = np.bincount(doc_ids[active], minlength=n_docs)
+    return custom, word_count
+
+
+def analyze_batch(texts, baseline='blend', subjectivity=True, fuzzy=False, negation_window=NEGATION_WINDOW,
+                  compact=False):
+    """Score a batch of reviews, returning the same dicts as analyze_hinglish_genz_sentiment
+
+    With ``compact`` on, a column-oriented ResultBatch is returned instead.
+    The whole batch is scored with the lexicon snapshot current when it
+    starts, whose tag every result carries as ``lexicon_version``.
+    """
+    check_baseline(baseline)
+    prof = profiling.active
+    if prof:
+        start = t = perf_counter()
+    snapshot = get_snapshot()
+    table = snapshot.table
+    cleaned, docs = tokenize_batch(texts)
+    if prof:
+        t = prof.lap('batch_clean', t)
+    if fuzzy:
+        from .fuzzy import get_index
+        normalize = get_index(table).normalize
+        docs = [normalize(d) for d in docs]
+        if prof:
+            t = prof.lap('batch_fuzzy', t)
+    ids, lengths = table.encode(docs)
+    n_tokens = len(ids)
+    if prof:
+        t = prof.lap('batch_encode', t)
+    # Emotions are counted over the words as written, phrases or not
+    emotion_counts = _emotion_counts(table, ids, lengths)
+    if table.phrases is not None:
+        ids, lengths = _collapse_phrases(table, ids, lengths, _phrase_symbols(table, docs, ids))
+    custom, word_count = _lexicon_scores(table, ids, lengths, prof.counters if prof else None, negation_window)
+    has_hits = word_count > 0
+    if prof:
+        t = prof.lap('batch_lexicon', t)
+
+    if subjectivity or baseline == 'blend':
+        needed = range(len(cleaned))
+    elif baseline == 'fallback':
+        needed = np.flatnonzero(~has_hits)
+    else:
+        needed = ()
+    base_polarity = np.zeros(len(cleaned))
+    base_subjectivity = np.zeros(len(cleaned))
+    baselines = {}
+    if len(needed):
+        from textblob.en import sentiment as pattern_sentiment
+    for i in needed:
+        c = cleaned[i]
+        if c not in baselines:
+            baselines[c] = pattern_sentiment(c)
+        base_polarity[i], base_subjectivity[i] = baselines[c]
+    if prof and len(needed):
+        t = prof.lap('batch_textblob', t)
+
+    custom_polarity = custom / np.maximum(word_count, 1)
+    if baseline == 'blend':
+        custom_polarity = custom_polarity * 0.8 + base_polarity * 0.2
+    polarity = np.where(has_hits, custom_polarity, base_polarity if baseline != 'lexicon' else 0.0)
+    confidence = np.minimum(np.abs(polarity) * 100, 95)
+    confidence = np.where(has_hits, np.minimum(confidence + 10, 98), confidence)
+    slang_score = np.minimum(word_count * 20, 100)
+
+    totals = emotion_counts.sum(axis=1, keepdims=True)
+    shares = np.divide(emotion_counts, totals, out=np.zeros(emotion_counts.shape), where=totals > 0)
+
+    labels = np.where(polarity > 0.15, POSITIVE, np.where(polarity < -0.15, NEGATIVE, NEUTRAL)).astype(np.int8)
+    results = ResultBatch(labels, polarity, base_subjectivity if subjectivity else None, confidence,
+                          slang_score.astype(np.int8), table.emotion_names, shares, snapshot.tag)
+    if not compact:
+        results = results.to_dicts()
+    if prof:
+        prof.lap('batch_results', t)
+        prof.lap('batch_total', start)
+        prof.count('reviews', len(results))
+        prof.count('tokens', n_tokens)
+        prof.count('lexicon_hits', int(word_count.sum()))
+    return results
@@ -0,0 +1,155 @@
+"""Bounded LRU result cache for repeated reviews
+
+Short reviews such as "mast product" or "waste of money" repeat a lot,
+so results are memoized on the cleaned text with its whitespace
+normalized, so reviews that differ only in spacing share an entry.
+TextBlob's sentence and abbreviation splitting depends on case, so case
+is kept in the key unless TextBlob is never consulted
+(``baseline='lexicon'`` without subjectivity). The lexicon scores
+alone only see lowercased tokens. The cache clears itself when any
+lexicon is edited.
+"""
+
+from collections import OrderedDict
+import functools
+import sys
+
+from .batch import analyze_batch
+from .core import NEGATION_WINDOW, analyze_hinglish_genz_sentiment, check_baseline, check_negation_window
+from .lexicons import lexicon_version
+from .tokenizer import clean_text, tokenize
+
+
+def _result_size(key, result):
+    """Rough number of bytes held by one cache entry"""
+    size = sys.getsizeof(key) + sys.getsizeof(result)
+    for value in result.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return size
+
+
+def _copy(result):
+    return {**result, 'emotions': dict(result['emotions'])}
+
+
+class CachedAnalyzer:
+    """LRU cache in front of the analyzer
+
+    At most ``max_entries`` results are kept, and when ``max_bytes`` is set
+    the estimated size of all entries stays under it; the least recently
+    used entries are evicted first. ``score_batch`` replaces analyze_batch
+    for misses, e.g. with ``ParallelScorer.map``.
+    """
+
+    def __init__(self, max_entries=10_000, max_bytes=None, baseline='blend', subjectivity=True,
+                 fuzzy=False, score_batch=None, negation_window=NEGATION_WINDOW):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        check_baseline(baseline)
+        check_negation_window(negation_window)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.baseline = baseline
+        self.subjectivity = subjectivity
+        self.fuzzy = fuzzy
+        self.negation_window = negation_window
+        self._lowercase = baseline == 'lexicon' and not subjectivity
+        self._score_batch = score_batch or functools.partial(
+            analyze_batch, baseline=baseline, subjectivity=subjectivity, fuzzy=fuzzy,
+            negation_window=negation_window)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = lexicon_version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, text):
+        """Cleaned, whitespace-normalized text used as the cache key, lowercased without TextBlob"""
+        if self._lowercase:
+            return " ".join(tokenize(text))
+        return " ".join(clean_text(text).split())
+
+    def _check_version(self):
+        if self._version != lexicon_version():
+            self.clear()
+            self._version = lexicon_version()
+            self.invalidations += 1
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _copy(entry[0])
+
+    def _put(self, key, result):
+        size = _result_size(key, result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (_copy(result), size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def analyze(self, text):
+        """Cached analyze_hinglish_genz_sentiment"""
+        self._check_version()
+        key = self.key(text)
+        result = self._get(key)
+        if result is None:
+            result = analyze_hinglish_genz_sentiment(text, self.baseline, self.subjectivity, self.fuzzy,
+                                                     self.negation_window)
+            self._put(key, result)
+        return result
+
+    def analyze_batch(self, texts):
+        """Cached analyze_batch; misses are scored together in one call"""
+        self._check_version()
+        results = [None] * len(texts)
+        missing = {}
+        for i, text in enumerate(texts):
+            key = self.key(text)
+            results[i] = self._get(key)
+            if results[i] is None:
+                missing.setdefault(key, []).append(i)
+        if missing:
+            positions = list(missing.values())
+            scored = self._score_batch([texts[p[0]] for p in positions])
+            for key, p, result in zip(missing, positions, scored):
+                self._put(key, result)
+                for i in p:
+                    results[i] = _copy(result)
+        return results
+
+    def clear(self):
+        """Drop every cached result (counters are kept)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,306 @@
+"""Command-line scoring of large CSV / JSONL review files
+
+    python -m sentiment_engine reviews.csv scored.jsonl --text-column review
+
+Input is read and scored one chunk at a time and every chunk is appended
+to the output before the next one is read, so memory use does not grow
+with the file size. After each chunk a small JSON checkpoint records the
+input and output byte offsets; ``--resume`` continues from it. With
+``--mmap`` JSONL input is memory-mapped and split on a background thread
+while the previous chunk is scored (see mapped.py).
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import functools
+import sys
+
+from .batch import analyze_batch
+from .cache import CachedAnalyzer
+from . import compiled, profiling
+from .core import BASELINE_MODES, NEGATION_WINDOW, check_negation_window
+from .mapped import read_spans, record_text
+from .parallel import ParallelScorer
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+
+
+class _LineReader:
+    """Iterate over the decoded lines of a binary file, tracking the byte offset"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+    def seek(self, offset):
+        self.f.seek(offset)
+        self.offset = offset
+
+
+def detect_format(path, fmt=None):
+    """Pick csv or jsonl from an explicit format or the file extension"""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Cannot tell the format of {path!r}, pass --input-format/--output-format")
+    return FORMATS[ext]
+
+
+def read_reviews(path, text_column='text', fmt=None, offset=0):
+    """Yield (text, end_offset) for each record, starting at a byte offset
+
+    The end offset is the byte position just after the record, which is
+    what gets stored in the checkpoint.
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, 'rb') as f:
+        lines = _LineReader(f)
+        if fmt == 'csv':
+            reader = csv.reader(lines)
+            header = next(reader, None)
+            if header is None:
+                return
+            header[0] = header[0].lstrip('\ufeff')
+            if text_column not in header:
+                raise ValueError(f"Column {text_column!r} not found in {path!r} (columns: {', '.join(header)})")
+            col = header.index(text_column)
+            if offset > lines.offset:
+                lines.seek(offset)
+            for row in reader:
+                yield (row[col] if col < len(row) else ''), lines.offset
+        else:
+            lines.seek(offset)
+            for line in lines:
+                if not line.strip():
+                    continue
+                yield record_text(json.loads(line), text_column), lines.offset
+
+
+def flatten_result(record, result):
+    """Turn a result dict into a flat output row"""
+    row = {'record': record}
+    for key, value in result.items():
+        if key == 'emotions':
+            for emotion, share in value.items():
+                row[f'emotion_{emotion}'] = share
+        else:
+            row[key] = value
+    return row
+
+
+def _encode_rows(rows, fmt, header):
+    buf = io.StringIO(newline='')
+    if fmt == 'csv':
+        writer = csv.DictWriter(buf, fieldnames=list(rows[0]))
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            buf.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return buf.getvalue().encode('utf-8')
+
+
+def load_checkpoint(path):
+    """Return the saved checkpoint, or a fresh one if there is none"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'input_offset': 0, 'output_offset': 0, 'records': 0}
+
+
+def save_checkpoint(path, state):
+    """Atomically replace the checkpoint file"""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _chunks(reviews, chunksize):
+    chunk = []
+    for item in reviews:
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _input_chunks(path, text_column, fmt, offset, chunksize, mmap):
+    """Yield (chunk, end offset): a list of texts, or Spans when memory-mapping"""
+    if mmap:
+        if detect_format(path, fmt) != 'jsonl':
+            raise ValueError("--mmap needs JSONL input (a CSV field may span several lines)")
+        for spans in read_spans(path, text_column, offset, chunksize):
+            yield spans, spans.end
+    else:
+        for chunk in _chunks(read_reviews(path, text_column, fmt, offset), chunksize):
+            yield [text for text, _ in chunk], chunk[-1][1]
+
+
+def score_file(input_path, output_path, text_column='text', chunksize=10_000,
+               input_format=None, output_format=None, checkpoint=None, resume=False,
+               score=analyze_batch, mmap=False, score_spans=None):
+    """Stream reviews from input_path, score them and append to output_path
+
+    With ``mmap`` on, JSONL input is read through mapped.read_spans and
+    each chunk is scored with ``score_spans(spans)`` when given (e.g.
+    ParallelScorer.map_spans, whose workers decode the records), else
+    decoded here for ``score``. Returns the total number of records
+    scored, including earlier runs when resuming.
+    """
+    out_fmt = detect_format(output_path, output_format)
+    checkpoint = checkpoint or output_path + '.ckpt'
+    state = load_checkpoint(checkpoint) if resume else {'input_offset': 0, 'output_offset': 0, 'records': 0}
+    if mmap and score_spans is None:
+        score_spans = lambda spans: score(spans.texts())
+
+    mode = 'r+b' if resume and os.path.exists(output_path) else 'wb'
+    with open(output_path, mode) as out:
+        # Drop anything written after the last checkpoint
+        out.seek(state['output_offset'])
+        out.truncate()
+        chunks = _input_chunks(input_path, text_column, input_format, state['input_offset'], chunksize, mmap)
+        for chunk, end in chunks:
+            results = score_spans(chunk) if mmap else score(chunk)
+            first = state['records']
+            rows = [flatten_result(first + i, r) for i, r in enumerate(results)]
+            out.write(_encode_rows(rows, out_fmt, header=out.tell() == 0))
+            out.flush()
+            state = {
+                'input_offset': end,
+                'output_offset': out.tell(),
+                'records': first + len(chunk),
+            }
+            save_checkpoint(checkpoint, state)
+    return state['records']
+
+
+def negation_window_arg(value):
+    """argparse type for --negation-window: N or BEFORE,AFTER"""
+    try:
+        parts = [int(p) for p in value.split(',')]
+        if len(parts) not in (1, 2):
+            raise ValueError(value)
+        return check_negation_window(parts[0] if len(parts) == 1 else tuple(parts))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected N or BEFORE,AFTER with N >= 0, got {value!r}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m sentiment_engine',
+        description='Score a CSV or JSONL file of reviews for Hinglish / Gen Z sentiment. '
+                    'Run "python -m sentiment_engine compile-lexicon -h" to build a lexicon file.'
+    )
+    parser.add_argument('input', help='CSV or JSONL file of reviews')
+    parser.add_argument('output', help='CSV or JSONL file to write results to')
+    parser.add_argument('--text-column', default='text', help='column / key holding the review text (default: text)')
+    parser.add_argument('--chunksize', type=int, default=10_000, help='reviews scored per chunk (default: 10000)')
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='override input format detection')
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help='override output format detection')
+    parser.add_argument('--checkpoint', help='checkpoint file (default: OUTPUT.ckpt)')
+    parser.add_argument('--resume', action='store_true', help='continue from the last checkpoint')
+    parser.add_argument('--mmap', action='store_true',
+                        help='memory-map JSONL input and find records while the previous chunk is scored; '
+                             'with --workers, workers decode their own records')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes to score with (default: 1)')
+    parser.add_argument('--task-size', type=int, default=1000,
+                        help='reviews per task sent to a worker when --workers > 1 (default: 1000)')
+    parser.add_argument('--baseline', choices=BASELINE_MODES, default='blend',
+                        help='when to run the TextBlob baseline: blend (always), fallback '
+                             '(only without lexicon hits) or lexicon (never) (default: blend)')
+    parser.add_argument('--no-subjectivity', dest='subjectivity', action='store_false',
+                        help='skip the TextBlob subjectivity column')
+    parser.add_argument('--fuzzy', action='store_true',
+                        help='match spelling variants such as "mastttt" or "gr8" against the lexicons')
+    parser.add_argument('--lexicon', help='compiled lexicon file to score with (see compile-lexicon)')
+    parser.add_argument('--negation-window', type=negation_window_arg, default=NEGATION_WINDOW, metavar='N',
+                        help='tokens a negation reaches, N or BEFORE,AFTER (default: 3)')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='memoize up to N distinct reviews, useful for duplicate-heavy input (default: off)')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write stage timings and counters to FILE, in Prometheus text format '
+                             'if it ends in .prom, else JSON (single process only)')
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['compile-lexicon']:
+        return compiled.main(argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.chunksize < 1:
+        parser.error('--chunksize must be at least 1')
+    if args.workers < 1 or args.task_size < 1:
+        parser.error('--workers and --task-size must be at least 1')
+    if args.profile and args.workers > 1:
+        parser.error('--profile only sees this process; use it with --workers 1')
+    if args.lexicon:
+        try:
+            compiled.install(compiled.LexiconTable.load(args.lexicon))
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"error: {e}\n")
+    scorer = None
+    score_spans = None
+    if args.workers > 1:
+        scorer = ParallelScorer(args.workers, args.task_size, args.baseline, args.subjectivity,
+                                args.fuzzy, lexicon_path=args.lexicon, negation_window=args.negation_window)
+        score = scorer.map
+        score_spans = scorer.map_spans
+    else:
+        score = functools.partial(analyze_batch, baseline=args.baseline, subjectivity=args.subjectivity,
+                                  fuzzy=args.fuzzy, negation_window=args.negation_window)
+    cache = None
+    if args.cache_size > 0:
+        cache = CachedAnalyzer(args.cache_size, baseline=args.baseline, subjectivity=args.subjectivity,
+                               fuzzy=args.fuzzy, score_batch=score, negation_window=args.negation_window)
+        score = cache.analyze_batch
+        # Cache lookups need the texts, so records are decoded here
+        score_spans = None
+    prof = profiling.enable() if args.profile else None
+    try:
+        total = score_file(
+            args.input, args.output,
+            text_column=args.text_column,
+            chunksize=args.chunksize,
+            input_format=args.input_format,
+            output_format=args.output_format,
+            checkpoint=args.checkpoint,
+            resume=args.resume,
+            score=score,
+            mmap=args.mmap,
+            score_spans=score_spans,
+        )
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"error: {e}\n")
+    finally:
+        if scorer:
+            scorer.close()
+        profiling.disable()
+    print(f"Scored {total} reviews -> {args.output}", file=sys.stderr)
+    if cache:
+        print("Cache: " + ", ".join(f"{k}={v:.3g}" if isinstance(v, float) else f"{k}={v}"
+                                   for k, v in cache.stats().items()), file=sys.stderr)
+    if prof:
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            f.write(prof.to_prometheus() if args.profile.endswith('.prom') else prof.to_json(indent=2))
+    return 0
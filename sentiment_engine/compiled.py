@@ -0,0 +1,302 @@
+"""Compiled lexicon tables and the on-disk lexicon artifact
+
+Lexicon sources (the bundled dictionaries in lexicons.py or external
+files) are resolved once into a single token table with parallel score
+and flag arrays. When the same word appears in more than one sentiment
+lexicon, the scorer's priority decides the winner: Hinglish positive,
+Hinglish negative, Gen Z positive, Gen Z negative. Losing entries are
+reported as conflicts.
+
+A compiled table can be saved as one binary file and loaded with
+np.memmap, so worker processes start in milliseconds and share the
+array pages through the OS page cache. Saving replaces the file
+atomically, so it can be rewritten while scorers have it mapped.
+
+    python -m sentiment_engine compile-lexicon lexicon.lex --source my_lexicons/
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from .phrases import PhraseMatcher, phrase_key
+from .snapshot import build_emotion_index, bundled_sources, default_sources, publish
+
+# Sentiment lexicons in priority order, with their polarity type
+SENTIMENT_SOURCES = (
+    ('hinglish_positive', True),
+    ('hinglish_negative', False),
+    ('genz_positive', True),
+    ('genz_negative', False),
+)
+SOURCE_NAMES = [name for name, _ in SENTIMENT_SOURCES] + ['phrases', 'intensifiers', 'negations', 'emotions']
+# Source index of phrase entries; their polarity type comes from the sign
+PHRASE_SOURCE = len(SENTIMENT_SOURCES) + 1
+
+INTENSIFIER = 1
+NEGATION = 2
+
+MAGIC = b'SNTLEX01'
+ALIGN = 64
+
+
+def _read_file(path):
+    """Read a .json file, or a .tsv/.txt file of 'word[<TAB>score]' lines"""
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    words = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            word, _, score = line.partition('\t')
+            words[word.strip()] = float(score) if score.strip() else None
+    if all(v is None for v in words.values()):
+        return list(words)
+    return words
+
+
+def read_sources(directory):
+    """Load lexicon files named after SOURCE_NAMES from a directory
+
+    Each source may be NAME.json, NAME.tsv or NAME.txt. Missing sources
+    fall back to the bundled lexicon as shipped, whatever is installed.
+    Emotions must be JSON of the form {emotion: [words]} or
+    {emotion: {word: weight}}.
+    """
+    sources = default_sources()
+    for name in SOURCE_NAMES:
+        for ext in ('.json', '.tsv', '.txt'):
+            path = os.path.join(directory, name + ext)
+            if os.path.exists(path):
+                sources[name] = _read_file(path)
+                break
+    return sources
+
+
+def resolve(sources):
+    """Merge sentiment sources by priority
+
+    Returns ({word: (value, source_index)}, conflicts) where source_index
+    is 1-based into SENTIMENT_SOURCES and each conflict is
+    (word, winning_source, losing_source, winning_value, losing_value).
+    """
+    entries = {}
+    conflicts = []
+    for index, (name, _) in enumerate(SENTIMENT_SOURCES, start=1):
+        for word, value in sources[name].items():
+            word = word.lower()
+            if word in entries:
+                won_value, won = entries[word]
+                conflicts.append((word, SENTIMENT_SOURCES[won - 1][0], name, won_value, value))
+            else:
+                entries[word] = (value, index)
+    return entries, conflicts
+
+
+class LexiconTable:
+    """All lexicons merged into one token -> id table with parallel arrays
+
+    Id 0 is reserved for tokens that appear in no lexicon. ``source`` holds
+    the 1-based index into SENTIMENT_SOURCES of the lexicon a word's score
+    came from (0 for none, PHRASE_SOURCE for phrases) and ``flags`` marks
+    intensifiers and negations.
+
+    Phrases are entries whose word is the phrase key. ``phrases`` is their
+    matcher (None without phrases), ``phrase_symbol`` maps token ids to
+    its symbols and ``phrase_ids`` its phrase indexes back to token ids.
+    """
+
+    def __init__(self, words, value, source, intensity, flags, emotions, emotion_names,
+                 conflicts=()):
+        self.words = words
+        self.vocab = {word: idx for idx, word in enumerate(words, start=1)}
+        self.value = value
+        self.source = source
+        self.intensity = intensity
+        self.flags = flags
+        self.emotions = emotions
+        self.emotion_names = list(emotion_names)
+        self.conflicts = list(conflicts)
+
+        self.is_hit = source > 0
+        self.is_phrase = source == PHRASE_SOURCE
+        positive = np.array([False] + [p for _, p in SENTIMENT_SOURCES] + [False])
+        self.is_positive = positive[source] | (self.is_phrase & (value >= 0))
+        self.is_intensifier = (flags & INTENSIFIER) > 0
+        self.is_negation = (flags & NEGATION) > 0
+
+        phrases = {words[i - 1]: float(value[i]) for i in np.flatnonzero(self.is_phrase)}
+        self.phrases = PhraseMatcher(phrases) if phrases else None
+        if self.phrases is not None:
+            get = self.phrases.vocab.get
+            self.phrase_symbol = np.array([0] + [get(word, 0) for word in words], dtype=np.int64)
+            self.phrase_ids = np.array([self.vocab[key] for key in self.phrases.keys], dtype=np.int64)
+
+    @classmethod
+    def from_sources(cls, sources):
+        """Compile lexicon sources (see bundled_sources) into a table"""
+        entries, conflicts = resolve(sources)
+        phrases = {phrase_key(p): v for p, v in sources['phrases'].items()}
+        phrase_words = [w for key in phrases for w in key.split()]
+        intensifiers = {w.lower(): v for w, v in sources['intensifiers'].items()}
+        negations = {w.lower() for w in sources['negations']}
+        emotion_names = list(sources['emotions'])
+        column = {name: col for col, name in enumerate(emotion_names)}
+        emotion_weights = {}
+        for word, hits in build_emotion_index(sources['emotions']).items():
+            for emotion, weight in hits:
+                emotion_weights.setdefault(word.lower(), {})[column[emotion]] = weight
+
+        vocab = {}
+        for group in (entries, phrases, phrase_words, intensifiers, negations, emotion_weights):
+            for word in group:
+                vocab.setdefault(word, len(vocab) + 1)
+        size = len(vocab) + 1
+
+        value = np.zeros(size)
+        source = np.zeros(size, dtype=np.uint8)
+        for word, (v, index) in entries.items():
+            value[vocab[word]] = v
+            source[vocab[word]] = index
+        for key, v in phrases.items():
+            value[vocab[key]] = v
+            source[vocab[key]] = PHRASE_SOURCE
+        intensity = np.ones(size)
+        flags = np.zeros(size, dtype=np.uint8)
+        for word, v in intensifiers.items():
+            intensity[vocab[word]] = v
+            flags[vocab[word]] |= INTENSIFIER
+        for word in negations:
+            flags[vocab[word]] |= NEGATION
+        emotions = np.zeros((size, len(emotion_names)))
+        for word, weights in emotion_weights.items():
+            for col, weight in weights.items():
+                emotions[vocab[word], col] = weight
+        return cls(list(vocab), value, source, intensity, flags, emotions, emotion_names, conflicts)
+
+    @classmethod
+    def from_lexicons(cls):
+        """Compile the lexicons currently defined in lexicons.py"""
+        return cls.from_sources(bundled_sources())
+
+    def to_sources(self):
+        """Rebuild source dictionaries from the table (conflict losers are gone)"""
+        sources = {name: {} for name, _ in SENTIMENT_SOURCES}
+        for idx in np.flatnonzero(self.is_hit & ~self.is_phrase):
+            name = SENTIMENT_SOURCES[self.source[idx] - 1][0]
+            sources[name][self.words[idx - 1]] = float(self.value[idx])
+        sources['phrases'] = {self.words[i - 1]: float(self.value[i]) for i in np.flatnonzero(self.is_phrase)}
+        sources['intensifiers'] = {self.words[i - 1]: float(self.intensity[i])
+                                   for i in np.flatnonzero(self.is_intensifier)}
+        sources['negations'] = [self.words[i - 1] for i in np.flatnonzero(self.is_negation)]
+        sources['emotions'] = {
+            name: {self.words[i - 1]: float(self.emotions[i, col])
+                   for i in np.flatnonzero(self.emotions[:, col])}
+            for col, name in enumerate(self.emotion_names)
+        }
+        return sources
+
+    def encode(self, docs):
+        """Map tokenized docs to a flat id array plus per-doc lengths"""
+        get = self.vocab.get
+        lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+        ids = np.fromiter((get(w, 0) for d in docs for w in d), dtype=np.int64,
+                          count=int(lengths.sum()))
+        return ids, lengths
+
+    def save(self, path):
+        """Write the table as a single memory-mappable file"""
+        arrays = {
+            'words': np.frombuffer('\n'.join(self.words).encode('utf-8'), dtype=np.uint8),
+            'value': self.value,
+            'source': self.source,
+            'intensity': self.intensity,
+            'flags': self.flags,
+            'emotions': self.emotions,
+        }
+        layout = {}
+        offset = 0
+        for name, arr in arrays.items():
+            layout[name] = {'offset': offset, 'dtype': arr.dtype.str, 'shape': list(arr.shape)}
+            offset += -(-arr.nbytes // ALIGN) * ALIGN
+        header = json.dumps({
+            'size': len(self.words) + 1,
+            'emotion_names': self.emotion_names,
+            'conflicts': self.conflicts,
+            'arrays': layout,
+        }).encode('utf-8')
+        data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+        # Written next to the target and renamed over it, so a process that
+        # memory-maps or reloads the old file never sees a partial one
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for name, arr in arrays.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(np.ascontiguousarray(arr).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a table written by save(), memory-mapping the arrays by default"""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path!r} is not a compiled lexicon file")
+            header_len = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(header_len))
+        data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+        if mmap:
+            raw = np.memmap(path, dtype=np.uint8, mode='r')
+        else:
+            raw = np.fromfile(path, dtype=np.uint8)
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape'], dtype=np.int64))
+            start = data_start + spec['offset']
+            arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+        words = bytes(arrays['words']).decode('utf-8').split('\n') if header['size'] > 1 else []
+        return cls(words, arrays['value'], arrays['source'], arrays['intensity'], arrays['flags'],
+                   arrays['emotions'], header['emotion_names'], [tuple(c) for c in header['conflicts']])
+
+
+def install(table):
+    """Make a compiled table the active lexicon for every scorer
+
+    The table's lexicons are published as one new snapshot (see
+    snapshot.py), so the single-text scorer agrees with it and
+    analyze_batch uses the table itself, until the lexicons are edited
+    again. The dictionaries in lexicons.py keep the bundled lexicons.
+    Scorers already running finish on the old snapshot. Returns the new
+    LexiconSnapshot.
+    """
+    return publish(table.to_sources(), table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m sentiment_engine compile-lexicon',
+        description='Compile lexicon sources into a memory-mappable lexicon file.'
+    )
+    parser.add_argument('output', help='compiled lexicon file to write')
+    parser.add_argument('--source', help='directory of lexicon files (default: bundled lexicons)')
+    args = parser.parse_args(argv)
+
+    sources = read_sources(args.source) if args.source else bundled_sources()
+    table = LexiconTable.from_sources(sources)
+    table.save(args.output)
+    print(f"Compiled {len(table.words)} tokens, {int(table.is_hit.sum())} scored, "
+          f"{len(table.phrases or ())} phrases, {len(table.conflicts)} conflicts -> {args.output}",
+          file=sys.stderr)
+    for word, winner, loser, won_value, lost_value in table.conflicts:
+        print(f"  {word!r}: {winner} ({won_value}) overrides {loser} ({lost_value})", file=sys.stderr)
+    return 0
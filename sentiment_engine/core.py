@@ -0,0 +1,247 @@
+"""Core scoring functions for Hinglish and Gen Z sentiment"""
+
+from time import perf_counter
+
+from . import profiling
+from .results import COLORS, EMOJIS, LABELS, Result, label_code
+from .snapshot import get_snapshot
+from .tokenizer import clean_and_tokenize
+
+def analyze_emotions(text, tokens=None, snapshot=None):
+    """Simple heuristic-based emotion detection
+
+    Pass ``tokens`` from the tokenizer to skip splitting the text again.
+    ``snapshot`` is the LexiconSnapshot to read (default: the current one).
+    """
+    words = text.lower().split() if tokens is None else tokens
+    if snapshot is None:
+        snapshot = get_snapshot()
+    emotions = dict.fromkeys(snapshot.emotion_names, 0)
+    
+    lookup = snapshot.emotion_index.get
+    for word in words:
+        hits = lookup(word)
+        if hits:
+            for emotion, weight in hits:
+                emotions[emotion] += weight
+                
+    # Normalize
+    total = sum(emotions.values())
+    if total > 0:
+        for k in emotions:
+            emotions[k] /= total
+    return emotions
+
+BASELINE_MODES = ('blend', 'fallback', 'lexicon')
+
+def check_baseline(baseline):
+    """Raise ValueError for an unknown baseline mode"""
+    if baseline not in BASELINE_MODES:
+        raise ValueError(f"baseline must be one of {', '.join(BASELINE_MODES)}, got {baseline!r}")
+
+NEGATION_WINDOW = 3
+
+def check_negation_window(window):
+    """Return a window size or (before, after) pair as a (before, after) tuple"""
+    before, after = (window, window) if isinstance(window, int) else window
+    if before < 0 or after < 0:
+        raise ValueError(f"negation window sizes must not be negative, got {window!r}")
+    return before, after
+
+def score_tokens(words, stats=None, window=NEGATION_WINDOW, snapshot=None):
+    """Run the lexicon loop over tokens, returning (custom_score, word_count, slang_count)
+
+    Phrases from PHRASES are matched first and each one replaced by a
+    single token, so it counts as one lexicon hit instead of its words.
+    A lexicon word is negated by a negation up to ``window`` tokens before
+    or after it (an int, or a (before, after) pair); the first negation
+    after it is consumed. Consecutive intensifiers right before a word
+    multiply ("boht boht mast"). Negation and intensifier scope are
+    tracked in one left-to-right pass, so the cost is linear in tokens.
+
+    When ``stats`` (a Counter) is given, scored phrases and applied
+    negations and intensifiers are counted into it. The lexicons are read
+    from ``snapshot`` (default: the current LexiconSnapshot).
+    """
+    before, after = check_negation_window(window)
+    if snapshot is None:
+        snapshot = get_snapshot()
+    hinglish_positive, hinglish_negative = snapshot.hinglish_positive, snapshot.hinglish_negative
+    genz_positive, genz_negative = snapshot.genz_positive, snapshot.genz_negative
+    negation_words, intensifiers = snapshot.negations, snapshot.intensifiers
+    matcher = snapshot.phrases
+    if matcher is not None:
+        words = matcher.collapse(words)
+        phrases = matcher.values
+    else:
+        phrases = {}
+    n = len(words)
+    # Negation positions, then a sentinel beyond every forward window
+    negations = [i for i, word in enumerate(words) if word in negation_words]
+    negations.append(n + after)
+    k = 0
+    upcoming = negations[0]        # first negation after the current token
+    last_negation = -before - 1    # last negation before the current token
+    intensity = None               # product of the intensifiers right before it
+    skipped = [False] * n
+    
+    custom_score = 0
+    word_count = 0
+    slang_count = 0
+    
+    for i, word in enumerate(words):
+        is_negation = i == upcoming
+        if is_negation:
+            k += 1
+            upcoming = negations[k]
+        
+        if not skipped[i]:
+            sentiment_value = None
+            word_type = None
+            
+            if word in phrases:
+                sentiment_value = phrases[word]
+                word_type = 'positive' if sentiment_value >= 0 else 'negative'
+                slang_count += 1
+                if stats is not None:
+                    stats['phrases'] += 1
+            elif word in hinglish_positive:
+                sentiment_value = hinglish_positive[word]
+                word_type = 'positive'
+                slang_count += 1
+            elif word in hinglish_negative:
+                sentiment_value = hinglish_negative[word]
+                word_type = 'negative'
+                slang_count += 1
+            elif word in genz_positive:
+                sentiment_value = genz_positive[word]
+                word_type = 'positive'
+                slang_count += 1
+            elif word in genz_negative:
+                sentiment_value = genz_negative[word]
+                word_type = 'negative'
+                slang_count += 1
+            
+            if sentiment_value is not None:
+                is_negated = i - last_negation <= before
+                if upcoming - i <= after:
+                    is_negated = True
+                    skipped[upcoming] = True
+                
+                score = sentiment_value
+                if intensity is not None:
+                    score = sentiment_value * intensity
+                    if stats is not None:
+                        stats['intensifiers'] += 1
+                if is_negated:
+                    score = -abs(score) if word_type == 'positive' else abs(score) * 0.6
+                    if stats is not None:
+                        stats['negations'] += 1
+                
+                custom_score += score
+                word_count += 1
+        
+        if is_negation:
+            last_negation = i
+        value = intensifiers.get(word)
+        if value is None:
+            intensity = None
+        else:
+            intensity = value if intensity is None else intensity * value
+    
+    return custom_score, word_count, slang_count
+
+def final_scores(custom_score, word_count, baseline, base):
+    """Final (polarity, confidence) from the lexicon score and the TextBlob sentiment
+
+    ``base`` is only read when ``baseline`` needs it for this review.
+    """
+    if word_count > 0:
+        custom_polarity = custom_score / max(word_count, 1)
+        if baseline == 'blend':
+            final_polarity = (custom_polarity * 0.8 + base.polarity * 0.2)
+        else:
+            final_polarity = custom_polarity
+    else:
+        final_polarity = base.polarity if baseline != 'lexicon' else 0.0
+    
+    confidence = min(abs(final_polarity) * 100, 95)
+    if word_count > 0:
+        confidence = min(confidence + 10, 98)
+    # The caps are ints; analyze_batch always returns floats
+    return final_polarity, float(confidence)
+
+def analyze_hinglish_genz_sentiment(text, baseline='blend', subjectivity=True, fuzzy=False,
+                                    negation_window=NEGATION_WINDOW, compact=False):
+    """Enhanced sentiment analysis for Hinglish and Gen Z slang
+
+    ``baseline`` decides when the TextBlob baseline is computed: 'blend'
+    mixes it into every score (20%), 'fallback' only uses it when no
+    lexicon word is found and 'lexicon' never runs it. Subjectivity also
+    comes from TextBlob, so it is only computed and returned when
+    ``subjectivity`` is true. With ``fuzzy`` on, spelling variants such as
+    "mastttt" or "gr8" are mapped to lexicon words before scoring.
+    ``negation_window`` is passed on to score_tokens. With ``compact`` on,
+    a slotted Result is returned instead of a dict (see results.py).
+    ``lexicon_version`` is the tag of the lexicon snapshot that scored it.
+    """
+    check_baseline(baseline)
+    prof = profiling.active
+    if prof:
+        start = t = perf_counter()
+    # Every step reads the same snapshot, even if the lexicons are swapped meanwhile
+    snapshot = get_snapshot()
+    cleaned_text, words = clean_and_tokenize(text)
+    if prof:
+        t = prof.lap('clean', t)
+    if fuzzy:
+        from .fuzzy import get_index
+        words = get_index(snapshot.table).normalize(words)
+        if prof:
+            t = prof.lap('fuzzy', t)
+    
+    custom_score, word_count, slang_count = score_tokens(words, prof.counters if prof else None, negation_window,
+                                                         snapshot)
+    if prof:
+        t = prof.lap('lexicon', t)
+    
+    # TextBlob is the slowest step, so only run it when something needs it
+    needs_polarity = baseline == 'blend' or (baseline == 'fallback' and word_count == 0)
+    base = None
+    if needs_polarity or subjectivity:
+        # textblob pulls in nltk, so it is only imported once a review needs it
+        from textblob import TextBlob
+        base = TextBlob(cleaned_text).sentiment
+    if prof and base is not None:
+        t = prof.lap('textblob', t)
+    
+    final_polarity, confidence = final_scores(custom_score, word_count, baseline, base)
+    code = label_code(final_polarity)
+    
+    emotions = analyze_emotions(cleaned_text, words, snapshot)
+    if prof:
+        prof.lap('emotions', t)
+        prof.lap('total', start)
+        prof.count('reviews')
+        prof.count('tokens', len(words))
+        prof.count('lexicon_hits', word_count)
+    
+    if compact:
+        return Result(code, final_polarity, base.subjectivity if subjectivity else None, confidence,
+                      min(slang_count * 20, 100), snapshot.emotion_names, tuple(emotions.values()), snapshot.tag)
+    
+    result = {
+        'sentiment': LABELS[code],
+        'emoji': EMOJIS[code],
+        'color': COLORS[code],
+        'polarity': final_polarity,
+        'subjectivity': base.subjectivity if subjectivity else None,
+        'confidence': confidence,
+        'slang_detected': slang_count > 0,
+        'slang_score': min(slang_count * 20, 100),
+        'emotions': emotions,
+        'lexicon_version': snapshot.tag
+    }
+    if not subjectivity:
+        del result['subjectivity']
+    return result
@@ -0,0 +1,200 @@
+"""Spelling-variant matching against the lexicons
+
+Reviews say "mastttt", "bekaaar", "bussinnn" and "gr8". Tokens that miss
+the exact lookup are tried, in order, as:
+
+1. the token without surrounding punctuation ("fr!" -> "fr")
+2. a known alias ("gr8" -> "great")
+3. its canonical form: repeated letters collapsed and common Hinglish
+   transliteration swaps applied (w/v, z/j, q/k, ph/f, ck/k)
+4. a canonical form within ``max_distance`` edits, found through a
+   precomputed deletion-neighbourhood (SymSpell) index
+
+Only the token's own repeated letters are collapsed: a token never
+matches a word longer than itself (beyond the edits it pays for), so
+"kis", "god" and "por" stay apart from "kiss", "good" and "poor".
+
+Only sentiment and phrase words are reached through steps 3 and 4, and
+edits only lead to words of at least ``min_edit_length`` letters, so
+ordinary words are not rewritten into short lexicon words ("fired" ->
+"fire") or negations ("fever" -> "never"). Negations, intensifiers and
+emotion-only words are matched as written or with repeated letters
+collapsed ("nahiii" -> "nahi").
+
+Every step is a hash lookup over a small, fixed number of keys, so the
+cost per token does not depend on the size of the lexicon. Matches are
+memoized per index.
+"""
+
+import re
+
+from .batch import get_table
+from .tokenizer import EDGE_PUNCT
+
+ALIASES = {
+    'gr8': 'great', 'h8': 'hate', 'luv': 'love', 'gud': 'good', 'gd': 'good',
+    'nyc': 'nice', 'awsm': 'awesome', 'osm': 'awesome', 'bst': 'best', 'wrst': 'worst',
+    'bkwas': 'bakwas', 'bkwaas': 'bakwaas', 'bkr': 'bekar', 'bhot': 'bohot', 'bhut': 'bahut',
+    'ni': 'nahi',
+}
+
+_REPEATS = re.compile(r'(.)\1+')
+_SWAPS = (('ph', 'f'), ('ck', 'k'), ('q', 'k'), ('w', 'v'), ('z', 'j'))
+
+MEMO_LIMIT = 100_000
+
+
+def collapse(word):
+    """Collapse runs of a repeated letter into one"""
+    return _REPEATS.sub(r'\1', word)
+
+
+def transliterate(word):
+    """Apply the transliteration swaps"""
+    for old, new in _SWAPS:
+        word = word.replace(old, new)
+    return word
+
+
+def canonical(word):
+    """Collapse repeated letters and apply transliteration swaps"""
+    return transliterate(collapse(word))
+
+
+def _deletes(word, distance):
+    """All strings reachable from word by deleting up to ``distance`` characters"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzyIndex:
+    """Variant and edit-distance index over a list of lexicon words
+
+    Earlier words win ties, so pass them in lexicon priority order.
+    ``exact_words`` are only matched as written or with repeated letters
+    collapsed. Tokens shorter than 3 characters are only matched exactly
+    (after stripping punctuation); edit distance is only tried between
+    tokens and words of at least ``min_edit_length`` characters.
+    """
+
+    def __init__(self, words, exact_words=(), max_distance=1, min_edit_length=5):
+        self.max_distance = max_distance
+        self.min_edit_length = min_edit_length
+        self.words = set(words) | set(exact_words)
+        self.aliases = {k: v for k, v in ALIASES.items() if v in self.words}
+        self.canonical = {}
+        self.rank = {}
+        self.length = {}               # canonical form -> length of its word, swaps applied
+        self.deletes = {}
+        for rank, word in enumerate(words):
+            form = canonical(word)
+            if form in self.canonical:
+                continue
+            self.canonical[form] = word
+            self.rank[form] = rank
+            self.length[form] = len(transliterate(word))
+            if len(form) >= min_edit_length:
+                for key in _deletes(form, max_distance):
+                    self.deletes.setdefault(key, []).append(form)
+        self.collapsed = {}
+        for word in exact_words:
+            self.collapsed.setdefault(collapse(word), word)
+        self._memo = {}
+
+    def _search(self, token):
+        stripped = token.strip(EDGE_PUNCT)
+        if stripped in self.words:
+            return stripped
+        if stripped in self.aliases:
+            return self.aliases[stripped]
+        if len(stripped) < 3:
+            return None
+        length = len(transliterate(stripped))
+        form = canonical(stripped)
+        if form in self.canonical:
+            return self.canonical[form] if length >= self.length[form] else None
+        collapsed = collapse(stripped)
+        word = self.collapsed.get(collapsed)
+        if word is not None:
+            return word if len(stripped) >= len(word) else None
+        if len(form) < self.min_edit_length or not self.max_distance:
+            return None
+        best, best_key = None, (self.max_distance + 1, 0)
+        seen = set()
+        for key in _deletes(form, self.max_distance):
+            for candidate in self.deletes.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(form, candidate, self.max_distance)
+                if length + distance < self.length[candidate]:
+                    continue
+                # Closest first, then lexicon priority
+                if (distance, self.rank[candidate]) < best_key:
+                    best, best_key = candidate, (distance, self.rank[candidate])
+        return self.canonical[best] if best is not None else None
+
+    def lookup(self, token):
+        """Return the lexicon word a token matches, or None"""
+        if token in self.words:
+            return token
+        memo = self._memo
+        if token not in memo:
+            if len(memo) >= MEMO_LIMIT:
+                memo.clear()
+            memo[token] = self._search(token)
+        return memo[token]
+
+    def normalize(self, tokens):
+        """Replace every token that matches a lexicon word with that word"""
+        words = self.words
+        lookup = self.lookup
+        return [t if t in words else (lookup(t) or t) for t in tokens]
+
+
+_index = None
+
+
+def get_index(table=None):
+    """Return the fuzzy index for a lexicon table (default: the current one)"""
+    global _index
+    if table is None:
+        table = get_table()
+    if _index is None or _index[0] is not table:
+        phrase_keys = table.phrases.keys if table.phrases is not None else ()
+        phrase_words = {w for key in phrase_keys for w in key.split()}
+        variants, exact = [], []
+        for word, hit, modifier in zip(table.words, table.is_hit[1:],
+                                       table.is_negation[1:] | table.is_intensifier[1:]):
+            # Phrase keys contain spaces and can never be a single token
+            if ' ' in word:
+                continue
+            if (hit or word in phrase_words) and not modifier:
+                variants.append(word)
+            else:
+                exact.append(word)
+        _index = (table, FuzzyIndex(variants, exact))
+    return _index[1]
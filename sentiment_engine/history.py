@@ -0,0 +1,162 @@
+"""Bounded, columnar history of analyzed reviews
+
+HistoryStore keeps the last ``capacity`` analyses in a ring buffer. The
+numeric fields live in preallocated typed arrays and the text fields in
+fixed-size lists, so appending is O(1), memory is fixed, and old
+entries drop off once the store is full.
+
+Every entry gets a sequence number that keeps counting across
+evictions, so a chart can ask only for what was added since its last
+refresh (``since``). CSV and Parquet exports are only built when
+someone asks for them, and CSV can be streamed in chunks.
+"""
+
+import csv
+import io
+
+import numpy as np
+
+TEXT_FIELDS = ('timestamp', 'text', 'sentiment')
+NUMERIC_FIELDS = {
+    'polarity': np.float64,
+    'confidence': np.float64,
+    'slang_score': np.int16,
+    'subjectivity': np.float64,   # NaN when subjectivity was not computed
+}
+FIELDS = TEXT_FIELDS + tuple(NUMERIC_FIELDS)
+
+
+class HistoryStore:
+    """Fixed-capacity ring buffer of history entries"""
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._text = {name: [None] * capacity for name in TEXT_FIELDS}
+        self._numeric = {name: np.zeros(capacity, dtype=dtype) for name, dtype in NUMERIC_FIELDS.items()}
+        self._head = 0       # slot of the oldest entry
+        self._len = 0
+        self.total = 0       # entries ever appended; the next sequence number
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def append(self, entry, **fields):
+        """Add an entry, evicting the oldest when full
+
+        ``entry`` is a dict with the FIELDS keys or an analyzer result, a
+        dict or a compact Result; ``fields`` (e.g. text and timestamp,
+        which results do not carry) are added to it. Missing fields are
+        stored as None.
+        """
+        if not isinstance(entry, dict):
+            entry = {name: getattr(entry, name, None) for name in FIELDS}
+        if fields:
+            entry = {**entry, **fields}
+        slot = (self._head + self._len) % self.capacity
+        for name in TEXT_FIELDS:
+            self._text[name][slot] = entry.get(name)
+        for name, column in self._numeric.items():
+            value = entry.get(name)
+            column[slot] = np.nan if value is None else value
+        if self._len < self.capacity:
+            self._len += 1
+        else:
+            self._head = (self._head + 1) % self.capacity
+        self.total += 1
+
+    def clear(self):
+        self._text = {name: [None] * self.capacity for name in TEXT_FIELDS}
+        self._head = 0
+        self._len = 0
+
+    @property
+    def first_seq(self):
+        """Sequence number of the oldest retained entry"""
+        return self.total - self._len
+
+    def _slots(self, start=0, stop=None):
+        """Buffer slots of the start-th to (stop-1)-th oldest entries"""
+        stop = self._len if stop is None else min(stop, self._len)
+        return (self._head + np.arange(start, stop)) % self.capacity
+
+    def _entry(self, slot):
+        entry = {name: self._text[name][slot] for name in TEXT_FIELDS}
+        for name, column in self._numeric.items():
+            value = column[slot].item()
+            entry[name] = None if value != value else value
+        return entry
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("history index out of range")
+        return self._entry((self._head + i) % self.capacity)
+
+    def __iter__(self):
+        for slot in self._slots():
+            yield self._entry(int(slot))
+
+    def tail(self, n):
+        """The newest n entries as dicts, oldest first"""
+        return [self._entry(int(slot)) for slot in self._slots(max(0, self._len - n))]
+
+    def column(self, name, start=0, stop=None):
+        """A field for the retained entries, oldest first (numeric fields as arrays)"""
+        slots = self._slots(start, stop)
+        if name in self._numeric:
+            return self._numeric[name][slots]
+        return [self._text[name][slot] for slot in slots]
+
+    def sequence(self, start=0):
+        """Sequence numbers of the retained entries, oldest first"""
+        return np.arange(self.first_seq + start, self.total)
+
+    def since(self, seq, name='polarity'):
+        """(sequence numbers, values) of a field for entries numbered seq or later
+
+        Entries evicted in the meantime are skipped.
+        """
+        start = min(max(seq - self.first_seq, 0), self._len)
+        return self.sequence(start), self.column(name, start)
+
+    def iter_csv(self, chunk_rows=1000):
+        """Yield the history as CSV text, a header and then chunks of rows"""
+        buf = io.StringIO(newline='')
+        writer = csv.writer(buf, lineterminator='\n')
+        writer.writerow(FIELDS)
+        for start in range(0, self._len, chunk_rows):
+            columns = [self.column(name, start, start + chunk_rows) for name in FIELDS]
+            for row in zip(*columns):
+                writer.writerow('' if v != v else v.item() if isinstance(v, np.generic) else v for v in row)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    def to_csv(self):
+        """The whole history as UTF-8 CSV bytes"""
+        return "".join(self.iter_csv()).encode('utf-8')
+
+    def to_parquet(self):
+        """The whole history as Parquet bytes (needs pyarrow)"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from None
+        table = pa.table({name: self.column(name) for name in FIELDS})
+        sink = io.BytesIO()
+        pq.write_table(table, sink)
+        return sink.getvalue()
+
+    def to_frame(self):
+        """The history as a pandas DataFrame"""
+        import pandas as pd
+        return pd.DataFrame({name: self.column(name) for name in FIELDS})
@@ -0,0 +1,386 @@
+"""Incremental re-scoring of a review while it is being edited
+
+IncrementalAnalyzer keeps the state of the lexicon loop for every unit
+of the review (a token, or a phrase collapsed into one token): the char
+offset it starts at, the negation / intensifier state entering it and
+the score it contributed. Emotion counts and the lexicon score are kept
+as running totals.
+
+An edit only re-reads the chunks around it. Units are rebuilt from a few
+tokens before the edit (far enough back that no phrase decision before
+them can see it) until a unit boundary after the edit lines up with an
+old one. Scores are then recomputed from ``after`` units before the
+edit, since those look ahead for negations, until the state entering a
+unit equals the old state entering it; from there on every old score
+still holds. The Python work per edit therefore grows with the edit and
+the phrase / negation windows, not with the length of the review.
+
+The lexicon score is kept as a running sum before every unit, added up
+left to right as in score_tokens, so results are identical to
+analyze_hinglish_genz_sentiment. When an edit changes a score, the sums
+after it are redone with itertools.accumulate; edits that change no
+score (most keystrokes) stop at the first unchanged unit. That pass, and
+the list splices that insert or drop units, are O(n) in the units after
+the edit, at C speed (about 1 ms per keystroke in the middle of a
+20,000-token review). A Fenwick or segment tree would make it O(log n),
+but floating-point addition is not associative: only summing left to
+right gives the single-text scorer's polarity bit for bit. Emotion counts
+stay exact: integer weights as ints, any others as Fractions. TextBlob has no incremental form: with a baseline
+other than 'lexicon' or with subjectivity on, every update runs it on
+the full text.
+"""
+
+from bisect import bisect_right
+from fractions import Fraction
+from itertools import accumulate
+from operator import add
+import re
+
+from .core import NEGATION_WINDOW, check_baseline, check_negation_window, final_scores
+from .results import Result, label_code
+from .snapshot import get_snapshot
+from .tokenizer import clean_chunk, clean_text
+
+_CHUNK_RE = re.compile(r'\S+')
+
+_word_values = (None, None)
+
+def get_word_values(snapshot):
+    """Return word -> (sentiment value, is positive) for every lexicon word and phrase of a snapshot
+
+    Words in several lexicons keep the entry score_tokens would use. The
+    index of the last snapshot asked for is kept.
+    """
+    global _word_values
+    cached, values = _word_values
+    if cached is not snapshot:
+        values = {}
+        for lexicon, positive in ((snapshot.genz_negative, False), (snapshot.genz_positive, True),
+                                  (snapshot.hinglish_negative, False), (snapshot.hinglish_positive, True)):
+            values.update((word, (value, positive)) for word, value in lexicon.items())
+        matcher = snapshot.phrases
+        if matcher is not None:
+            values.update((key, (value, value >= 0)) for key, value in matcher.values.items())
+        _word_values = (snapshot, values)
+    return values
+
+
+def _common_prefix(a, b):
+    """Length of the longest common prefix of two strings"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    """Length of the longest common suffix of two strings, at most ``limit``"""
+    lo, hi = 0, limit
+    la, lb = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - lo] == b[lb - mid:lb - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class IncrementalAnalyzer:
+    """Analyzer for one review that is re-scored after every edit
+
+    Pass each new version of the text to ``update`` (or describe the edit
+    with ``edit``); both return the same result as
+    analyze_hinglish_genz_sentiment would for the new text. The defaults
+    skip TextBlob, which would re-read the whole review on every
+    keystroke. A new lexicon snapshot (after an edit or a reload) is
+    picked up on the next update with a full re-score.
+    """
+
+    def __init__(self, text='', baseline='lexicon', subjectivity=False, fuzzy=False,
+                 negation_window=NEGATION_WINDOW):
+        check_baseline(baseline)
+        self.baseline = baseline
+        self.subjectivity = subjectivity
+        self.fuzzy = fuzzy
+        self.negation_window = negation_window
+        self._before, self._after = check_negation_window(negation_window)
+        self._reset(text)
+
+    @property
+    def text(self):
+        return self._text
+
+    def __len__(self):
+        """Number of units: tokens, with each phrase counted once"""
+        return len(self._units)
+
+    def _reset(self, text):
+        snapshot = self._snapshot = get_snapshot()
+        self._matcher = snapshot.phrases
+        self._values = get_word_values(snapshot)
+        self._emotion_index = snapshot.emotion_index
+        self._negations = snapshot.negations
+        self._intensifiers = snapshot.intensifiers
+        self._normalize = None
+        if self.fuzzy:
+            from .fuzzy import get_index
+            self._normalize = get_index(snapshot.table).normalize
+        self._text = ''
+        self._units = []
+        self._starts = []        # char offset of each unit, see _start
+        self._shift_from = 0     # offsets from here on are stored minus _shift
+        self._shift = 0
+        self._states = []        # (negation gap, intensity, next negation skipped) entering each unit
+        self._scores = []        # score of each unit, 0.0 when it is not a lexicon hit
+        self._is_hit = bytearray()
+        self._sums = [0]         # lexicon score before each unit, then the total
+        self._hits = 0
+        self._names = snapshot.emotion_names
+        self._emotions = dict.fromkeys(self._names, 0)
+        self._result = None
+        self._apply(text, 0, 0, len(text))
+
+    def update(self, text, compact=False):
+        """Re-score for a new version of the text and return the result"""
+        if get_snapshot() is not self._snapshot:
+            self._reset(text)
+        elif text != self._text:
+            old = self._text
+            start = _common_prefix(old, text)
+            same = _common_suffix(old, text, min(len(old), len(text)) - start)
+            self._apply(text, start, len(old) - same, len(text) - same)
+        return self.result(compact)
+
+    def edit(self, start, stop, replacement, compact=False):
+        """Replace text[start:stop] with ``replacement`` and return the new result"""
+        old = self._text
+        start, stop, _ = slice(start, stop).indices(len(old))
+        stop = max(start, stop)
+        text = old[:start] + replacement + old[stop:]
+        if get_snapshot() is not self._snapshot:
+            self._reset(text)
+        else:
+            self._apply(text, start, stop, start + len(replacement))
+        return self.result(compact)
+
+    def _start(self, i):
+        start = self._starts[i]
+        return start + self._shift if i >= self._shift_from else start
+
+    def _locate(self, pos):
+        """Index of the last unit starting at or before ``pos``, -1 if none"""
+        starts, k = self._starts, self._shift_from
+        i = bisect_right(starts, pos, 0, k)
+        if i == k:
+            i = bisect_right(starts, pos - self._shift, k)
+        return i - 1
+
+    def _tokens(self, text, pos):
+        """(start, token) for every chunk of ``text`` from ``pos`` that survives cleaning"""
+        normalize = self._normalize
+        for chunk in _CHUNK_RE.finditer(text, pos):
+            token = clean_chunk(chunk.group())
+            if token:
+                if normalize is not None:
+                    token = normalize([token])[0]
+                yield chunk.start(), token
+
+    def _apply(self, text, pos, old_end, new_end):
+        """Re-score after text[pos:new_end] replaced the old text[pos:old_end]"""
+        delta = new_end - old_end
+        units = self._units
+        matcher = self._matcher
+        longest = max_length = None
+        if matcher is not None:
+            longest, keys, symbol, max_length = matcher.longest, matcher.keys, matcher.symbol, matcher.max_length
+
+        # Back up until the phrase decision of the unit before r cannot
+        # see any token from unit u on
+        u = self._locate(pos)
+        r = max(u, 0)
+        if max_length:
+            between = 0
+            while r > 0 and between + units[r - 1].count(' ') + 1 < max_length:
+                between += units[r - 1].count(' ') + 1
+                r -= 1
+
+        # Rebuild units until one starts after the edit where an old one did
+        n_old = len(units)
+        stop = j = r
+        tokens, starts, symbols = [], [], []
+        head = 0
+        source = self._tokens(text, self._start(r) if r else 0)
+        new_units, new_starts = [], []
+        while True:
+            if head == len(tokens):
+                nxt = next(source, None)
+                if nxt is None:
+                    stop = n_old
+                    break
+                starts.append(nxt[0])
+                tokens.append(nxt[1])
+                if matcher is not None:
+                    symbols.append(symbol(nxt[1]))
+            start = starts[head]
+            if start >= new_end:
+                old_start = start - delta
+                while j < n_old and self._start(j) < old_start:
+                    j += 1
+                if j < n_old and self._start(j) == old_start:
+                    stop = j
+                    break
+            match = None
+            if matcher is not None and symbols[head]:
+                while len(tokens) < head + max_length:
+                    nxt = next(source, None)
+                    if nxt is None:
+                        break
+                    starts.append(nxt[0])
+                    tokens.append(nxt[1])
+                    symbols.append(symbol(nxt[1]))
+                match = longest(symbols, head)
+            if match is None:
+                new_units.append(tokens[head])
+                head += 1
+            else:
+                new_units.append(keys[match[1]])
+                head = match[0]
+            new_starts.append(start)
+
+        # Emotions count the tokens as written, phrases included ("notch."
+        # in a phrase unit "top notch"), so the replaced units are
+        # tokenized again from the old text
+        old_end = self._start(stop) if stop < n_old else None
+        written = []
+        for start, token in self._tokens(self._text, self._start(r) if r else 0):
+            if old_end is not None and start >= old_end:
+                break
+            written.append(token)
+        emotions = self._emotion_index
+        totals = self._emotions
+        for sign, changed in ((-1, written), (1, tokens[:head])):
+            for word in changed:
+                hits = emotions.get(word)
+                if hits:
+                    for emotion, weight in hits:
+                        if type(weight) is not int:
+                            weight = Fraction(weight)
+                        totals[emotion] += sign * weight
+
+        m = len(new_units)
+        for i in range(r, stop):
+            self._hits -= self._is_hit[i]
+        units[r:stop] = new_units
+        self._scores[r:stop] = [0.0] * m
+        self._is_hit[r:stop] = bytes(m)
+        self._states[r:stop] = [None] * m
+        self._sums[r:stop] = [None] * m
+        self._splice_starts(r, stop, new_starts, delta)
+        self._text = text
+        self._result = None
+        # Units up to ``after`` before the edit look ahead into it; restart
+        # at least one unit back, whose entering state is still valid
+        self._rescore(max(r - max(self._after, 1), 0), r + m)
+
+    def _splice_starts(self, r, stop, new_starts, delta):
+        """Replace the offsets of units r:stop; the ones after them move by ``delta``
+
+        Offsets after the edit are not rewritten: they are stored minus a
+        pending shift, and only the offsets between this edit and the
+        previous one are brought up to date.
+        """
+        starts = self._starts
+        k, shift = self._shift_from, self._shift
+        if not shift:
+            k = r
+        if k <= stop:
+            for i in range(k, r):
+                starts[i] += shift
+            self._shift_from = r + len(new_starts)
+        else:
+            for i in range(stop, k):
+                starts[i] += delta
+            self._shift_from = k + len(new_starts) - (stop - r)
+        self._shift = shift + delta
+        starts[r:stop] = new_starts
+
+    def _rescore(self, i, changed_end):
+        """Recompute scores from unit i until the state lines up after ``changed_end``
+
+        This is score_tokens one unit at a time: a negation up to
+        ``before`` units back or ``after`` units ahead negates a hit, and
+        consecutive intensifiers right before it multiply.
+        """
+        units, states, scores, is_hit, sums = self._units, self._states, self._scores, self._is_hit, self._sums
+        values, negations, intensifiers = self._values, self._negations, self._intensifiers
+        before, after = self._before, self._after
+        n = len(units)
+        state = states[i] if i else (before + 1, None, False)
+        total = sums[i] if i else 0
+        while i < n:
+            if i >= changed_end and states[i] == state:
+                break
+            states[i] = state
+            sums[i] = total
+            self._hits -= is_hit[i]
+            gap, intensity, skip = state
+            word = units[i]
+            is_negation = word in negations
+            skipped = is_negation and skip
+            if is_negation:
+                skip = False
+            score = 0.0
+            hit = None if skipped else values.get(word)
+            if hit is not None:
+                value, positive = hit
+                is_negated = gap <= before
+                for k in range(i + 1, min(i + after, n - 1) + 1):
+                    if units[k] in negations:
+                        # The first negation after a word is consumed by it
+                        is_negated = skip = True
+                        break
+                score = value
+                if intensity is not None:
+                    score = value * intensity
+                if is_negated:
+                    score = -abs(score) if positive else abs(score) * 0.6
+                total += score
+                self._hits += 1
+            scores[i] = score
+            is_hit[i] = hit is not None
+            gap = 1 if is_negation else min(gap + 1, before + 1)
+            value = intensifiers.get(word)
+            if value is None:
+                intensity = None
+            else:
+                intensity = value if intensity is None else intensity * value
+            state = (gap, intensity, skip)
+            i += 1
+        # Every later score still holds, but the running sums after a
+        # changed score are added up again in order (at C speed)
+        if sums[i] != total:
+            sums[i:] = accumulate(scores[i:], add, initial=total)
+
+    def result(self, compact=False):
+        """Result for the current text, in the format of analyze_hinglish_genz_sentiment"""
+        if self._result is None:
+            base = None
+            hits = self._hits
+            if self.baseline == 'blend' or (self.baseline == 'fallback' and hits == 0) or self.subjectivity:
+                from textblob import TextBlob
+                base = TextBlob(clean_text(self._text)).sentiment
+            polarity, confidence = final_scores(self._sums[-1], hits, self.baseline, base)
+            totals = self._emotions
+            total = sum(totals.values())
+            if total > 0:
+                shares = tuple(float(count / total) for count in totals.values())
+            else:
+                shares = (0,) * len(totals)
+            self._result = Result(label_code(polarity), polarity, base.subjectivity if self.subjectivity else None,
+                                  confidence, min(hits * 20, 100), self._names, shares, self._snapshot.tag)
+        return self._result if compact else self._result.to_dict()
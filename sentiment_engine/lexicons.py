@@ -0,0 +1,182 @@
+"""Hinglish and Gen Z lexicons used by the sentiment engine
+
+The lexicons are tracked containers: every in-place edit bumps a global
+counter, so compiled tables and result caches can call lexicon_version()
+to find out whether they are stale.
+"""
+
+_version = 0
+
+
+def lexicon_version():
+    """Return a number that changes whenever any lexicon is edited"""
+    return _version
+
+
+def _changed():
+    global _version
+    _version += 1
+
+
+def _track(value):
+    if isinstance(value, list) and not isinstance(value, WordList):
+        return WordList(value)
+    if isinstance(value, (set, frozenset)) and not isinstance(value, WordSet):
+        return WordSet(value)
+    if isinstance(value, dict) and not isinstance(value, Lexicon):
+        return Lexicon(value)
+    return value
+
+
+def _mutator(name, base):
+    method = getattr(base, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        _changed()
+        return result
+    wrapper.__name__ = name
+    return wrapper
+
+
+class Lexicon(dict):
+    """dict that reports in-place edits to lexicon_version()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for key, value in self.items():
+            dict.__setitem__(self, key, _track(value))
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, _track(value))
+        _changed()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, _track(value))
+        _changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    __delitem__ = _mutator('__delitem__', dict)
+    pop = _mutator('pop', dict)
+    popitem = _mutator('popitem', dict)
+    clear = _mutator('clear', dict)
+
+
+class WordList(list):
+    """list that reports in-place edits to lexicon_version()"""
+
+    __setitem__ = _mutator('__setitem__', list)
+    __delitem__ = _mutator('__delitem__', list)
+    __iadd__ = _mutator('__iadd__', list)
+    __imul__ = _mutator('__imul__', list)
+    append = _mutator('append', list)
+    extend = _mutator('extend', list)
+    insert = _mutator('insert', list)
+    remove = _mutator('remove', list)
+    pop = _mutator('pop', list)
+    clear = _mutator('clear', list)
+    sort = _mutator('sort', list)
+    reverse = _mutator('reverse', list)
+
+
+class WordSet(set):
+    """set that reports in-place edits to lexicon_version()"""
+
+    add = _mutator('add', set)
+    discard = _mutator('discard', set)
+    remove = _mutator('remove', set)
+    pop = _mutator('pop', set)
+    clear = _mutator('clear', set)
+    update = _mutator('update', set)
+    difference_update = _mutator('difference_update', set)
+    intersection_update = _mutator('intersection_update', set)
+    symmetric_difference_update = _mutator('symmetric_difference_update', set)
+    __ior__ = _mutator('__ior__', set)
+    __iand__ = _mutator('__iand__', set)
+    __isub__ = _mutator('__isub__', set)
+    __ixor__ = _mutator('__ixor__', set)
+
+HINGLISH_POSITIVE = Lexicon({
+    'mast': 1.0, 'badhiya': 1.0, 'zabardast': 1.0, 'kamaal': 1.0, 'shandar': 1.0,
+    'badiya': 1.0, 'accha': 0.8, 'acha': 0.8, 'achha': 0.8, 'achchha': 0.8,
+    'sahi': 0.7, 'ekdum': 0.8, 'dhansu': 1.0, 'jhakaas': 1.0, 'lajawaab': 1.0, 
+    'top': 0.8, 'best': 1.0, 'maja': 0.8, 'mazaa': 0.8, 'maza': 0.8, 
+    'superb': 1.0, 'badass': 0.9, 'dope': 0.9, 'lit': 0.9, 'fire': 0.9, 
+    'op': 0.8, 'behtreen': 1.0, 'gazab': 0.9, 'ghazab': 0.9, 'tagda': 0.8, 
+    'solid': 0.8, 'perfect': 1.0, 'bindas': 0.8, 'kadak': 0.8, 'fadu': 0.9, 
+    'faadu': 0.9, 'jhakkas': 1.0, 'sunder': 0.8, 'sundar': 0.8, 'pyara': 0.7, 
+    'pyaara': 0.7, 'pasand': 0.7, 'like': 0.7, 'laga': 0.6, 'lagaa': 0.6,
+    'good': 0.8, 'nice': 0.7, 'great': 0.9, 'awesome': 0.9, 'excellent': 1.0
+})
+
+HINGLISH_NEGATIVE = Lexicon({
+    'bekaar': -0.9, 'bekar': -0.9, 'ganda': -0.8, 'kharab': -0.9, 'bakwas': -1.0,
+    'faltu': -0.8, 'bakwaas': -1.0, 'ghatiya': -1.0, 'wahiyat': -1.0, 'bura': -0.8,
+    'kachra': -1.0, 'waste': -0.9, 'bakkar': -0.9, 'thanda': -0.6, 'boring': -0.7,
+    'chutiya': -1.0, 'chutiyapa': -1.0, 'bekuf': -0.8, 'bevkuf': -0.8,
+    'pagal': -0.5, 'pagalpan': -0.6, 'nautanki': -0.6, 'dramabaazi': -0.6,
+    'dhokha': -0.9, 'fraud': -1.0, 'scam': -1.0, 'locha': -0.7, 'problem': -0.6,
+    'bad': -0.8, 'worst': -1.0, 'horrible': -1.0, 'terrible': -1.0, 'poor': -0.7
+})
+
+GENZ_SLANG_POSITIVE = Lexicon({
+    'slaps': 1.0, 'slap': 1.0, 'bussin': 1.0, 'fire': 0.9, 'lit': 0.9, 'dope': 0.9,
+    'goat': 1.0, 'slay': 0.9, 'slaying': 0.9, 'iconic': 0.9, 'vibe': 0.7, 'vibes': 0.7,
+    'chef': 0.8, 'chefs': 0.8, 'kiss': 0.8, 'snack': 0.7, 'queen': 0.8, 'king': 0.8,
+    'ate': 0.9, 'no': 0.0, 'cap': 0.8, 'based': 0.8, 'w': 0.9, 'bet': 0.7,
+    'facts': 0.7, 'fr': 0.7, 'frfr': 0.8, 'goated': 1.0, 'hits': 0.8, 'different': 0.8,
+    'built': 0.7, 'valid': 0.8, 'understood': 0.8, 'assignment': 0.9, 'serving': 0.8,
+    'stan': 0.7, 'bop': 0.8, 'banger': 0.9, 'smash': 0.8, 'bussing': 1.0
+})
+
+GENZ_SLANG_NEGATIVE = Lexicon({
+    'mid': -0.6, 'cringe': -0.8, 'cringy': -0.8, 'cringing': -0.8, 'ick': -0.7,
+    'sus': -0.6, 'sussy': -0.7, 'cap': -0.8, 'capping': -0.8, 'yikes': -0.7,
+    'bruh': -0.4, 'oof': -0.5, 'l': -0.8, 'ratio': -0.7, 'ratiod': -0.8,
+    'trash': -0.9, 'flop': -0.8, 'flopped': -0.8, 'dead': -0.7, 'awkward': -0.6,
+    'weird': -0.5, 'pressed': -0.6, 'salty': -0.6, 'toxic': -0.9, 'cancelled': -0.9,
+    'cringe': -0.8, 'basic': -0.5, 'tryhard': -0.6, 'dry': -0.6, 'boring': -0.7
+})
+
+# Multi-word expressions, scored as one hit in place of their words.
+# Values below zero are negative phrases.
+PHRASES = Lexicon({
+    'no cap': 0.8, 'hits different': 1.0, 'ate and left no crumbs': 1.0, 'understood the assignment': 1.0,
+    'chefs kiss': 1.0, 'main character energy': 0.8, 'its giving': 0.6, 'game changer': 0.9,
+    'mind blowing': 1.0, 'top notch': 0.9, 'worth it': 0.8, 'value for money': 0.8,
+    'paisa vasool': 1.0, 'ek number': 1.0, 'dil khush': 1.0,
+    'waste of money': -1.0, 'paisa barbaad': -1.0, 'red flag': -0.8, 'huge l': -0.9,
+    'fell off': -0.7, 'dimag kharab': -0.8, 'bura haal': -0.8, 'not it': -0.7
+})
+
+HINDI_INTENSIFIERS = Lexicon({
+    'boht': 1.5, 'bohot': 1.5, 'bahut': 1.5, 'bahot': 1.5, 'bht': 1.5,
+    'ekdum': 1.4, 'bilkul': 1.3, 'poora': 1.2, 'pura': 1.2, 'kaafi': 1.3,
+    'full': 1.3, 'very': 1.3, 'so': 1.2, 'too': 1.2, 'super': 1.4,
+    'ultra': 1.5, 'mega': 1.4, 'hella': 1.4, 'mad': 1.3, 'crazy': 1.3
+})
+
+# Emotion Keywords (Heuristics)
+# Each emotion maps to a keyword list (weight 1 each) or a {word: weight} dict
+EMOTION_KEYWORDS = Lexicon({
+    'joy': ['happy', 'love', 'great', 'awesome', 'mast', 'best', 'fun', 'enjoy', 'smile', 'laugh', 'lit', 'fire', 'slay'],
+    'sadness': ['sad', 'bad', 'cry', 'depressed', 'unhappy', 'worst', 'poor', 'bekaar', 'trash', 'dead', 'flop'],
+    'anger': ['angry', 'hate', 'mad', 'furious', 'annoyed', 'irritated', 'bakwas', 'ghatiya', 'cringe', 'toxic'],
+    'excitement': ['excited', 'wow', 'amazing', 'omg', 'hype', 'crazy', 'dhansu', 'jhakaas', 'goat', 'bussin']
+})
+
+# Looked up once per token, so kept as a set
+NEGATION_WORDS = WordSet(['nahi', 'nai', 'nhi', 'na', 'mat', 'not', 'no', 'never', 'neither', 'nobody', 'nothing', 'nowhere', 'none', 'nahin'])
+
+# Contrast words that start a new clause in segment-level scoring
+# ("packaging bekaar tha | but product mast hai")
+CLAUSE_BREAKS = WordSet(['but', 'lekin', 'magar', 'however', 'although', 'though', 'whereas', 'except'])
@@ -0,0 +1,224 @@
+"""Memory-mapped reading of large JSONL review dumps
+
+    for spans in read_spans('dump.jsonl', chunksize=10_000):
+        results = analyze_batch(spans.texts())      # or scorer.map_spans(spans)
+
+The file is mapped read-only and record boundaries are found by scanning
+the mapping for newlines with NumPy, one block at a time, without copying
+it. A chunk of records is a Spans object: the file path plus the byte
+offset and length of every record. It pickles to a few bytes per record,
+so ParallelScorer.map_spans sends workers only the offsets; each worker
+maps the file itself and decodes its own records.
+
+The scan runs ahead of the consumer on a background thread. NumPy
+releases the GIL while it scans, so the page faults that read the file
+from disk overlap with scoring on the main thread (or waiting on the
+workers), and madvise(WILLNEED) starts reading the next block before the
+scan gets there.
+
+Only newline-delimited input can be split this way; a CSV field may
+contain line breaks.
+"""
+
+import json
+import mmap
+import os
+import queue
+import threading
+
+import numpy as np
+
+BLOCK_SIZE = 8 * 2**20
+# First bytes of a line that may be blank: ASCII whitespace, the separators
+# str.strip() also removes, and UTF-8 lead bytes (for Unicode spaces)
+_MAY_BE_BLANK = np.zeros(256, dtype=bool)
+_MAY_BE_BLANK[list(b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f')] = True
+_MAY_BE_BLANK[0x80:] = True
+
+
+def record_text(record, text_column='text'):
+    """Review text of a decoded JSON record: a dict, or the text itself"""
+    text = record.get(text_column) if isinstance(record, dict) else record
+    return '' if text is None else str(text)
+
+
+class MappedFile:
+    """Read-only memory map of a newline-delimited file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self.size = st.st_size
+            self.key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            # mmap cannot map an empty file
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        if self.size and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self.data.madvise(mmap.MADV_SEQUENTIAL)
+
+    def prefetch(self, start, end):
+        """Ask the kernel to start reading bytes [start, end) in the background"""
+        end = min(end, self.size)
+        if end > start and hasattr(mmap, 'MADV_WILLNEED'):
+            start -= start % mmap.PAGESIZE
+            self.data.madvise(mmap.MADV_WILLNEED, start, end - start)
+
+    def records(self, start=0, block_size=BLOCK_SIZE):
+        """Yield (starts, ends) byte offsets of the non-blank lines, one block at a time
+
+        ``ends`` point just past each line's newline (or the end of the
+        file), which is where reading resumes.
+        """
+        view = np.frombuffer(self.data, dtype=np.uint8)
+        size = self.size
+        while start < size:
+            stop = min(start + block_size, size)
+            self.prefetch(stop, stop + block_size)
+            ends = np.flatnonzero(view[start:stop] == 10) + (start + 1)
+            if stop == size and (not len(ends) or ends[-1] < size):
+                ends = np.append(ends, size)
+            if not len(ends):
+                # No line ends in this block: scan it again with the next one
+                block_size *= 2
+                continue
+            starts = np.empty_like(ends)
+            starts[0] = start
+            starts[1:] = ends[:-1]
+            yield self._non_blank(starts, ends)
+            start = int(ends[-1])
+
+    def _non_blank(self, starts, ends):
+        """Drop the lines cli.read_reviews skips: those that are only whitespace"""
+        view = np.frombuffer(self.data, dtype=np.uint8)
+        maybe = np.flatnonzero(_MAY_BE_BLANK[view[starts]])
+        if len(maybe):
+            data = self.data
+            blank = [i for i in maybe.tolist()
+                     if not data[starts[i]:ends[i]].decode('utf-8', 'replace').strip()]
+            if blank:
+                keep = np.ones(len(starts), dtype=bool)
+                keep[blank] = False
+                starts, ends = starts[keep], ends[keep]
+        return starts, ends
+
+    def close(self):
+        if self.size:
+            self.data.close()
+
+
+_files = {}
+
+def open_mapped(path):
+    """Return this process's MappedFile for a path, mapping it again if the file changed"""
+    mapped = _files.get(path)
+    if mapped is not None:
+        st = os.stat(path)
+        if mapped.key != (st.st_ino, st.st_size, st.st_mtime_ns):
+            mapped = None
+    if mapped is None:
+        mapped = _files[path] = MappedFile(path)
+    return mapped
+
+
+class Spans:
+    """A chunk of JSONL records: the file path and each record's byte offset and length"""
+
+    def __init__(self, path, starts, lengths, text_column='text'):
+        self.path = path
+        self.starts = starts
+        self.lengths = lengths
+        self.text_column = text_column
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("Spans only supports slicing")
+        return Spans(self.path, self.starts[index], self.lengths[index], self.text_column)
+
+    @property
+    def end(self):
+        """Byte offset just past the last record"""
+        return int(self.starts[-1] + self.lengths[-1]) if len(self) else 0
+
+    def texts(self):
+        """Decode the review text of every record"""
+        if not len(self):
+            return []
+        data = open_mapped(self.path).data
+        starts, lengths = self.starts, self.lengths
+        # JSON strings cannot contain raw line breaks, so the records are
+        # parsed as one JSON array instead of one json.loads call each
+        if (starts[1:] == starts[:-1] + lengths[:-1]).all():
+            records = data[starts[0]:self.end].rstrip().replace(b'\n', b',')
+        else:
+            records = b','.join(data[start:start + length].rstrip()
+                                for start, length in zip(starts.tolist(), lengths.tolist()))
+        try:
+            records = json.loads(b'[' + records + b']')
+        except ValueError:
+            records = None
+        # A line holding several values ('"a", "b"') still parses as part of
+        # the array, but gives more records than lines
+        if records is None or len(records) != len(self):
+            # Parse record by record, so the error names the broken one
+            records = [json.loads(data[start:start + length])
+                       for start, length in zip(starts.tolist(), lengths.tolist())]
+        column = self.text_column
+        return [record_text(record, column) for record in records]
+
+
+def read_spans(path, text_column='text', offset=0, chunksize=10_000, readahead=4, block_size=BLOCK_SIZE):
+    """Yield Spans of up to ``chunksize`` records, from byte ``offset`` on
+
+    Records are found on a background thread, at most ``readahead``
+    chunks ahead of the caller.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    mapped = open_mapped(path)
+    chunks = queue.Queue(readahead)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def scan():
+        try:
+            starts = ends = np.zeros(0, dtype=np.int64)
+            for block_starts, block_ends in mapped.records(offset, block_size):
+                starts = np.concatenate((starts, block_starts))
+                ends = np.concatenate((ends, block_ends))
+                full = len(starts) - len(starts) % chunksize
+                for i in range(0, full, chunksize):
+                    if not put(Spans(path, starts[i:i + chunksize], ends[i:i + chunksize] - starts[i:i + chunksize],
+                                     text_column)):
+                        return
+                starts, ends = starts[full:], ends[full:]
+            if len(starts):
+                put(Spans(path, starts, ends - starts, text_column))
+        except BaseException as e:
+            put(e)
+        finally:
+            put(None)
+
+    thread = threading.Thread(target=scan, name='span-reader', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
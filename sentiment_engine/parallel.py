@@ -0,0 +1,172 @@
+"""Multi-core scoring on a pool of worker processes
+
+Reviews are split into chunks and each chunk is scored with analyze_batch
+in a worker process. Workers build the lexicon table once when they
+start, so tasks only carry review text and the generation of the
+compiled lexicon file to use, which workers reload between tasks when it
+moves on (see ParallelScorer.set_lexicon). Results come back in input
+order.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+from .aggregate import StreamAggregator
+from .batch import analyze_batch, get_table
+from .compiled import LexiconTable, install
+from .core import NEGATION_WINDOW, check_baseline, check_negation_window
+
+
+# (lexicon file, generation) this worker process has installed
+_lexicon = (None, 0)
+
+
+def _init_worker(lexicon_path=None):
+    """Load the lexicon table once per worker process"""
+    global _lexicon
+    if lexicon_path:
+        install(LexiconTable.load(lexicon_path))
+    _lexicon = (lexicon_path, 0)
+    get_table()
+
+
+def _use_lexicon(lexicon):
+    """Install a newer lexicon file before scoring a task"""
+    global _lexicon
+    path, generation = lexicon
+    if generation > _lexicon[1]:
+        install(LexiconTable.load(path))
+        _lexicon = lexicon
+
+
+def _score_chunk(texts, baseline, subjectivity, fuzzy, negation_window, lexicon=(None, 0)):
+    _use_lexicon(lexicon)
+    return analyze_batch(texts, baseline, subjectivity, fuzzy, negation_window)
+
+
+def _score_spans(spans, baseline, subjectivity, fuzzy, negation_window, lexicon=(None, 0)):
+    _use_lexicon(lexicon)
+    return analyze_batch(spans.texts(), baseline, subjectivity, fuzzy, negation_window)
+
+
+def _aggregate_chunk(pairs, baseline, subjectivity, fuzzy, negation_window, lexicon=(None, 0)):
+    _use_lexicon(lexicon)
+    keys = [key for key, _ in pairs]
+    results = analyze_batch([text for _, text in pairs], baseline, subjectivity, fuzzy, negation_window)
+    return StreamAggregator().update(zip(keys, results))
+
+
+def _split(texts, chunksize):
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelScorer:
+    """Score reviews across a process pool
+
+    ``workers`` defaults to the number of CPUs available to this process.
+    ``chunksize`` is the number of reviews sent to a worker per task.
+    ``baseline``, ``subjectivity``, ``fuzzy`` and ``negation_window`` are
+    passed on to analyze_batch.
+    ``lexicon_path`` is a compiled lexicon file each worker memory-maps
+    instead of compiling the bundled lexicons; set_lexicon switches to
+    another one (or a rewritten one) without restarting the workers.
+    """
+
+    def __init__(self, workers=None, chunksize=1000, baseline='blend', subjectivity=True,
+                 fuzzy=False, lexicon_path=None, mp_context=None, negation_window=NEGATION_WINDOW):
+        if workers is None:
+            workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+        if workers < 1 or chunksize < 1:
+            raise ValueError("workers and chunksize must be at least 1")
+        check_baseline(baseline)
+        check_negation_window(negation_window)
+        self.workers = workers
+        self.chunksize = chunksize
+        self.baseline = baseline
+        self.subjectivity = subjectivity
+        self.fuzzy = fuzzy
+        self.negation_window = negation_window
+        self.lexicon = (lexicon_path, 0)
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                         initializer=_init_worker, initargs=(lexicon_path,))
+
+    def submit(self, texts):
+        """Score one batch on the pool, returning a concurrent.futures.Future"""
+        return self._pool.submit(_score_chunk, list(texts), self.baseline, self.subjectivity, self.fuzzy,
+                                 self.negation_window, self.lexicon)
+
+    def set_lexicon(self, lexicon_path):
+        """Score tasks submitted from now on with a compiled lexicon file
+
+        Each worker loads the file before its next task. Tasks submitted
+        earlier are not held back; every result's ``lexicon_version``
+        tells which lexicons scored it. Call it again after the file is
+        rewritten (e.g. from LexiconWatcher's ``on_reload``) to reload it.
+        """
+        self.lexicon = (lexicon_path, self.lexicon[1] + 1)
+
+    def imap(self, texts):
+        """Yield results in input order, keeping a bounded number of tasks in flight"""
+        pending = deque()
+        for chunk in _split(texts, self.chunksize):
+            pending.append(self.submit(chunk))
+            if len(pending) >= self.workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def map(self, texts):
+        """Score all texts and return the results as a list"""
+        return list(self.imap(texts))
+
+    def map_spans(self, spans):
+        """Score the records of a memory-mapped file (a mapped.Spans) in order
+
+        Tasks carry only byte offsets and lengths; every worker maps the
+        file and decodes its own records.
+        """
+        pending = [self._pool.submit(_score_spans, spans[i:i + self.chunksize], self.baseline, self.subjectivity,
+                                     self.fuzzy, self.negation_window, self.lexicon)
+                   for i in range(0, len(spans), self.chunksize)]
+        return [result for future in pending for result in future.result()]
+
+    def aggregate(self, pairs):
+        """Score (key, text) pairs into per-key rollups
+
+        Each worker aggregates its own chunks and only the partial
+        StreamAggregators travel back, to be merged here.
+        """
+        total = StreamAggregator()
+        pending = deque()
+        for chunk in _split(pairs, self.chunksize):
+            pending.append(self._pool.submit(_aggregate_chunk, chunk, self.baseline, self.subjectivity,
+                                             self.fuzzy, self.negation_window, self.lexicon))
+            if len(pending) >= self.workers * 2:
+                total.merge(pending.popleft().result())
+        while pending:
+            total.merge(pending.popleft().result())
+        return total
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def analyze_parallel(texts, workers=None, chunksize=1000, baseline='blend', subjectivity=True,
+                     fuzzy=False, negation_window=NEGATION_WINDOW):
+    """Score texts on a temporary process pool, results in input order"""
+    with ParallelScorer(workers, chunksize, baseline, subjectivity, fuzzy,
+                        negation_window=negation_window) as scorer:
+        return scorer.map(texts)
@@ -0,0 +1,158 @@
+"""Multi-word phrase matching with an Aho-Corasick automaton
+
+Phrases such as "hits different" or "paisa vasool" are compiled into one
+automaton over token symbols (small integer ids, 0 for words that occur
+in no phrase). A review is scanned once, left to right, whatever the
+number of phrases; overlapping matches are resolved leftmost-longest.
+
+Matched spans are collapsed into a single token (the phrase key, its
+words joined by single spaces) before the lexicon loop, so a phrase is
+scored as one lexicon hit instead of its constituent unigrams, and
+negations and intensifiers apply to it as a unit. Tokens are looked up
+without punctuation stuck to their edges, so "top notch." and "paisa
+vasool," match too.
+"""
+
+from collections import deque
+
+from .tokenizer import EDGE_PUNCT, tokenize
+
+
+def phrase_key(phrase):
+    """Normalized key of a phrase: its tokens joined by single spaces"""
+    return " ".join(tokenize(phrase))
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over a set of multi-word phrases
+
+    ``phrases`` maps phrase text to its sentiment value. Every phrase must
+    have at least two tokens.
+    """
+
+    def __init__(self, phrases):
+        self.keys = []
+        self.values = {}
+        self.vocab = {}                # word -> symbol, from 1
+        self.max_length = 0            # words in the longest phrase
+        goto = [{}]
+        out = [None]                   # (length, phrase index) ending at a state
+        for phrase, value in phrases.items():
+            words = tokenize(phrase)
+            if len(words) < 2:
+                raise ValueError(f"phrases need at least two words, got {phrase!r}")
+            key = " ".join(words)
+            if key in self.values:
+                self.values[key] = value
+                continue
+            state = 0
+            for word in words:
+                symbol = self.vocab.setdefault(word, len(self.vocab) + 1)
+                nxt = goto[state].get(symbol)
+                if nxt is None:
+                    nxt = goto[state][symbol] = len(goto)
+                    goto.append({})
+                    out.append(None)
+                state = nxt
+            out[state] = (len(words), len(self.keys))
+            self.max_length = max(self.max_length, len(words))
+            self.keys.append(key)
+            self.values[key] = value
+
+        # Breadth-first: failure links, and dictionary links to the nearest
+        # proper suffix state that ends a phrase
+        fail = [0] * len(goto)
+        link = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, nxt in goto[state].items():
+                f = fail[state]
+                while f and symbol not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(symbol, 0)
+                fail[nxt] = f if f != nxt else 0
+                link[nxt] = f if out[f] else link[f]
+                queue.append(nxt)
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._link = link
+        # First state to report from: the state itself or its dictionary link
+        self._report = [state if out[state] else link[state] for state in range(len(goto))]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def symbol(self, word):
+        """Symbol of a token, ignoring punctuation at its edges; 0 if it is in no phrase"""
+        vocab = self.vocab
+        return vocab.get(word) or vocab.get(word.strip(EDGE_PUNCT), 0)
+
+    def symbols(self, words):
+        """Map tokens to the matcher's symbols"""
+        symbol = self.symbol
+        return [symbol(word) for word in words]
+
+    def find(self, symbols):
+        """Leftmost-longest non-overlapping matches as (start, end, phrase index)"""
+        goto, fail, out, link, report = self._goto, self._fail, self._out, self._link, self._report
+        state = 0
+        matches = []
+        for i, symbol in enumerate(symbols):
+            if not symbol:
+                # In no phrase: back to the root, which reports nothing
+                state = 0
+                continue
+            nxt = goto[state].get(symbol)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(symbol)
+            state = nxt or 0
+            s = report[state]
+            while s:
+                length, phrase = out[s]
+                matches.append((i + 1 - length, -length, phrase))
+                s = link[s]
+        if not matches:
+            return []
+        matches.sort()
+        selected = []
+        end = 0
+        for start, length, phrase in matches:
+            if start >= end:
+                end = start - length
+                selected.append((start, end, phrase))
+        return selected
+
+    def longest(self, symbols, start=0):
+        """Longest phrase starting at symbols[start] as (end, phrase index), or None
+
+        Picking the longest phrase at each position left to right selects
+        the same matches as find.
+        """
+        goto, out = self._goto, self._out
+        state = 0
+        best = None
+        for i in range(start, len(symbols)):
+            state = goto[state].get(symbols[i])
+            if state is None:
+                break
+            if out[state]:
+                best = (i + 1, out[state][1])
+        return best
+
+    def collapse(self, words):
+        """Replace every matched phrase in a token list by its key"""
+        matches = self.find(self.symbols(words))
+        if not matches:
+            return words
+        keys = self.keys
+        collapsed = []
+        prev = 0
+        for start, end, phrase in matches:
+            collapsed += words[prev:start]
+            collapsed.append(keys[phrase])
+            prev = end
+        collapsed += words[prev:]
+        return collapsed
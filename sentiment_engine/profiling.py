@@ -0,0 +1,162 @@
+"""Opt-in stage timers and event counters for the analyzers
+
+Profiling is off by default. The analyzers then only check that
+``active`` is None at each stage boundary, so the hooks stay in the hot
+path for good. Turn it on around the code of interest:
+
+    from sentiment_engine import profiling
+
+    with profiling.profile() as prof:
+        analyze_batch(reviews)
+    print(prof.to_prometheus())
+
+Stages of analyze_hinglish_genz_sentiment are timed per review: clean,
+fuzzy, lexicon (the lexicon loop including negation window scans),
+textblob and emotions, plus total. analyze_batch times whole batches
+under batch_* names. Counters track reviews, tokens, lexicon_hits,
+phrases (phrase hits scored), negations (hits flipped by a negation)
+and intensifiers (hits scaled by an intensifier).
+
+Only the current process is profiled; reviews scored in ParallelScorer
+workers are not seen. A Profiler is not thread-safe.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+import json
+from time import perf_counter
+
+# Histogram upper bounds in seconds, 1 µs to 10 s
+BUCKETS = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, n in zip(self.buckets + (float('inf'),), self.counts):
+            total += n
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (0 < q < 1)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_s': self.sum,
+            'mean_us': self.sum / self.count * 1e6 if self.count else 0.0,
+            'p50_us': self.quantile(0.5) * 1e6,
+            'p99_us': self.quantile(0.99) * 1e6,
+            'buckets': {repr(bound): total for bound, total in self.cumulative()},
+        }
+
+
+class Profiler:
+    """Per-stage duration histograms and event counters"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.stages = {}
+        self.counters = Counter()
+
+    def observe(self, stage, seconds):
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = Histogram(self.buckets)
+        hist.observe(seconds)
+
+    def lap(self, stage, start):
+        """Record the time since ``start`` under ``stage`` and return the current time"""
+        now = perf_counter()
+        self.observe(stage, now - start)
+        return now
+
+    def count(self, event, n=1):
+        self.counters[event] += n
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+    def to_dict(self):
+        return {
+            'stages': {name: hist.to_dict() for name, hist in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix='sentiment_engine'):
+        """Render the profile in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each analyzer stage",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, hist in self.stages.items():
+            for bound, total in hist.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {total}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {hist.sum!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {hist.count}')
+        lines += [
+            f"# HELP {prefix}_events_total Tokens, lexicon hits and rule applications seen",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for event, n in self.counters.items():
+            lines.append(f'{prefix}_events_total{{event="{event}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+# The profiler the analyzers report to, or None when profiling is off
+active = None
+
+
+def enable(profiler=None):
+    """Start reporting to ``profiler`` (a new one by default) and return it"""
+    global active
+    active = profiler if profiler is not None else Profiler()
+    return active
+
+
+def disable():
+    """Stop profiling and return the profiler that was active"""
+    global active
+    profiler, active = active, None
+    return profiler
+
+
+@contextmanager
+def profile(profiler=None):
+    """Profile the analyzers inside a with block"""
+    global active
+    previous = active
+    profiler = enable(profiler)
+    try:
+        yield profiler
+    finally:
+        active = previous
@@ -0,0 +1,118 @@
+"""Lexicon hot reloading for long-running scorers
+
+    watcher = LexiconWatcher('my_lexicons/')    # or a compiled .lex file
+    watcher.start()                             # poll every 2 seconds in a thread
+
+The source is either a directory of lexicon files (see
+compiled.read_sources) or a lexicon file written by compile-lexicon.
+It is installed when the watcher starts and again whenever a file in it
+changes. The new lexicons are compiled on the watcher thread and
+installed as one snapshot (see snapshot.py): scorers already
+running finish on the old snapshot, later ones pick up the new one, and
+no scorer ever waits for the compile. A source that fails to load is
+reported and the current lexicons stay in place until it changes again.
+
+Worker processes have their own lexicons. ``on_reload`` can pass the
+change on, e.g. ParallelScorer.set_lexicon for a compiled file.
+"""
+
+import os
+import sys
+import threading
+
+from .compiled import SOURCE_NAMES, LexiconTable, install, read_sources
+
+SOURCE_EXTENSIONS = ('.json', '.tsv', '.txt')
+
+
+class LexiconWatcher:
+    """Polls a lexicon source and installs it whenever it changes
+
+    ``check()`` installs the source the first time and after every
+    change; ``start()`` calls it once, then every ``interval`` seconds on
+    a daemon thread. ``on_reload`` is called with the new LexiconSnapshot
+    after every reload.
+    """
+
+    def __init__(self, path, interval=2.0, on_reload=None):
+        self.path = path
+        self.interval = interval
+        self.on_reload = on_reload
+        self.reloads = 0
+        self.errors = 0
+        self.snapshot = None
+        self._signature = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _files(self):
+        if not os.path.isdir(self.path):
+            return [self.path]
+        return [os.path.join(self.path, name + ext) for name in SOURCE_NAMES for ext in SOURCE_EXTENSIONS]
+
+    def _stat(self):
+        """(path, mtime, size) of every source file that exists"""
+        signature = []
+        for path in self._files():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        return signature
+
+    def load(self):
+        """Compile or read the source into a LexiconTable"""
+        if os.path.isdir(self.path):
+            return LexiconTable.from_sources(read_sources(self.path))
+        # Read into memory: a file rewritten in place must not change a
+        # snapshot that is still in use
+        return LexiconTable.load(self.path, mmap=False)
+
+    def check(self):
+        """Install the source if it changed since the last check; return the new snapshot or None"""
+        signature = self._stat()
+        if signature == self._signature:
+            return None
+        # Remembered even when loading fails, so a broken file is reported
+        # once and retried only after it changes again
+        self._signature = signature
+        try:
+            snapshot = install(self.load())
+        except Exception as e:
+            # A hand-edited file can be broken in any number of ways, none
+            # of which may stop the scorers or the watcher
+            self.errors += 1
+            print(f"Lexicon reload from {self.path} failed, keeping the current lexicons: {e}",
+                  file=sys.stderr)
+            return None
+        self.reloads += 1
+        self.snapshot = snapshot
+        if self.on_reload is not None:
+            self.on_reload(snapshot)
+        return snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Install the source now, then keep polling it on a daemon thread"""
+        if self._thread is None:
+            self.check()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='lexicon-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
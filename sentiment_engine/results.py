@@ -0,0 +1,166 @@
+"""Compact result types
+
+The analyzers return a 10-key dict per review by default. Holding
+millions of those is dominated by per-dict overhead, so with
+``compact=True`` they return these instead:
+
+- ``Result``: one review in a slotted object. It keeps only the scores,
+  a label code and the emotion shares.
+- ``ResultBatch``: a whole batch as typed NumPy columns.
+
+Presentation fields (sentiment name, emoji, color, slang_detected) are
+derived from the label code and scores when asked for. The lexicon
+version is one shared string. ``to_dict()`` /
+``to_dicts()`` give back exactly the dicts the analyzers return by
+default.
+"""
+
+from itertools import repeat
+
+# Label code -> sentiment, emoji and color
+LABELS = ('Negative', 'Neutral', 'Positive')
+EMOJIS = ('😞', '😐', '😊')
+COLORS = ('#ef4444', '#f59e0b', '#10b981')
+NEGATIVE, NEUTRAL, POSITIVE = range(3)
+
+
+def label_code(polarity):
+    """Label code of a final polarity"""
+    if polarity > 0.15:
+        return POSITIVE
+    if polarity < -0.15:
+        return NEGATIVE
+    return NEUTRAL
+
+
+def _as_dict(code, polarity, subjectivity, confidence, slang_score, names, shares, lexicon_version):
+    result = {
+        'sentiment': LABELS[code],
+        'emoji': EMOJIS[code],
+        'color': COLORS[code],
+        'polarity': polarity,
+        'subjectivity': subjectivity,
+        'confidence': confidence,
+        'slang_detected': slang_score > 0,
+        'slang_score': slang_score,
+        'emotions': dict(zip(names, shares)),
+        'lexicon_version': lexicon_version
+    }
+    if subjectivity is None:
+        del result['subjectivity']
+    return result
+
+
+class Result:
+    """Scores of one review
+
+    ``subjectivity`` is None when it was not computed. ``emotion_names``
+    is shared by every result scored with the same lexicons, and
+    ``lexicon_version`` is the tag of their snapshot.
+    """
+
+    __slots__ = ('label', 'polarity', 'subjectivity', 'confidence', 'slang_score',
+                 'emotion_names', 'emotion_shares', 'lexicon_version')
+
+    def __init__(self, label, polarity, subjectivity, confidence, slang_score, emotion_names, emotion_shares,
+                 lexicon_version=None):
+        self.label = label
+        self.polarity = polarity
+        self.subjectivity = subjectivity
+        self.confidence = confidence
+        self.slang_score = slang_score
+        self.emotion_names = emotion_names
+        self.emotion_shares = emotion_shares
+        self.lexicon_version = lexicon_version
+
+    @property
+    def sentiment(self):
+        return LABELS[self.label]
+
+    @property
+    def emoji(self):
+        return EMOJIS[self.label]
+
+    @property
+    def color(self):
+        return COLORS[self.label]
+
+    @property
+    def slang_detected(self):
+        return self.slang_score > 0
+
+    @property
+    def emotions(self):
+        return dict(zip(self.emotion_names, self.emotion_shares))
+
+    def to_dict(self):
+        """The result as the analyzers' default dict"""
+        return _as_dict(self.label, self.polarity, self.subjectivity, self.confidence, self.slang_score,
+                        self.emotion_names, self.emotion_shares, self.lexicon_version)
+
+    def __repr__(self):
+        return (f"Result({self.sentiment}, polarity={self.polarity:.3f}, "
+                f"confidence={self.confidence:.1f}, slang_score={self.slang_score})")
+
+
+class ResultBatch:
+    """Scores of a batch of reviews as NumPy columns
+
+    - ``labels``: int8 label codes
+    - ``polarity`` and ``confidence``: float64
+    - ``subjectivity``: float64, or None when it was not computed
+    - ``slang_score``: int8
+    - ``emotion_shares``: float64 with one row per review and one column per entry of ``emotion_names``
+    - ``lexicon_version``: tag of the lexicon snapshot that scored the whole batch
+    """
+
+    def __init__(self, labels, polarity, subjectivity, confidence, slang_score, emotion_names, emotion_shares,
+                 lexicon_version=None):
+        self.labels = labels
+        self.polarity = polarity
+        self.subjectivity = subjectivity
+        self.confidence = confidence
+        self.slang_score = slang_score
+        self.emotion_names = tuple(emotion_names)
+        self.emotion_shares = emotion_shares
+        self.lexicon_version = lexicon_version
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("batch index out of range")
+        return Result(int(self.labels[i]), float(self.polarity[i]),
+                      None if self.subjectivity is None else float(self.subjectivity[i]),
+                      float(self.confidence[i]), int(self.slang_score[i]),
+                      self.emotion_names, tuple(self.emotion_shares[i].tolist()), self.lexicon_version)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def sentiments(self):
+        """Sentiment name of every review"""
+        return [LABELS[code] for code in self.labels.tolist()]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns"""
+        columns = (self.labels, self.polarity, self.subjectivity, self.confidence, self.slang_score,
+                   self.emotion_shares)
+        return sum(column.nbytes for column in columns if column is not None)
+
+    def to_dicts(self):
+        """The batch as the analyzers' default list of dicts"""
+        names, version = self.emotion_names, self.lexicon_version
+        subjectivity = repeat(None) if self.subjectivity is None else self.subjectivity.tolist()
+        return [
+            _as_dict(code, p, s, c, score, names, shares, version)
+            for code, p, s, c, score, shares in zip(
+                self.labels.tolist(), self.polarity.tolist(), subjectivity, self.confidence.tolist(),
+                self.slang_score.tolist(), self.emotion_shares.tolist())
+        ]
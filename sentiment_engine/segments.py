@@ -0,0 +1,217 @@
+"""Sentence and clause level scoring for long reviews
+
+A long review such as "packaging bekaar tha but product mast hai" mixes
+opinions that one averaged polarity hides, and the negation window of a
+single pass runs across sentence boundaries. Here a review is split once
+into segments, which are scored independently (as a batch, or on a
+ParallelScorer) and summed up in a SegmentSummary:
+
+    analyze_segments(text)          # {'segments': [...], 'aggregate': {...}}
+    for segment in stream_segments(open('thread.txt', encoding='utf-8')):
+        ...                         # one dict per segment, in order
+
+Segments end at a whitespace run that follows '.', '!' or '?', contains a
+line break, or comes before a word from CLAUSE_BREAKS ("but", "lekin",
+...). Splitting only looks at a few characters around each run, so
+stream_segments reads its input chunk by chunk and holds at most one
+unfinished segment and one batch of segments at a time.
+"""
+
+import functools
+from itertools import islice
+import re
+
+from .aggregate import RunningStats, SENTIMENTS
+from .batch import analyze_batch
+from .core import NEGATION_WINDOW, check_baseline, check_negation_window
+from .lexicons import CLAUSE_BREAKS, lexicon_version
+from .results import COLORS, EMOJIS, LABELS, label_code
+
+_boundary = (None, None, 0)
+
+def get_boundary_pattern():
+    """Return (pattern, lookahead) for segment boundaries, rebuilt after lexicon edits
+
+    A boundary match that ends at least ``lookahead`` characters before
+    the end of the text read so far cannot change when more text arrives.
+    """
+    global _boundary
+    version, pattern, lookahead = _boundary
+    if version != lexicon_version():
+        # Every match starts with one whitespace character, so re skips
+        # ahead to the next whitespace instead of trying each alternative
+        # at every position. The run then either follows '.', '!' or '?',
+        # starts with a line break, has one further on, or is followed by
+        # a clause break word.
+        alternatives = [r'(?<=[.!?]\s)\s*', r'(?<=\n)\s*', r'[^\S\n]*\n\s*']
+        words = sorted(CLAUSE_BREAKS, key=len, reverse=True)
+        if words:
+            alternatives.append(r'\s*(?=(?i:%s)\b)' % '|'.join(map(re.escape, words)))
+        pattern = re.compile(r'\s(?:%s)' % '|'.join(alternatives))
+        lookahead = max(map(len, words), default=0) + 2
+        _boundary = (lexicon_version(), pattern, lookahead)
+    return pattern, lookahead
+
+
+def _trimmed(text, start, end):
+    """(start, end) of text[start:end] without surrounding whitespace, or None if blank"""
+    segment = text[start:end]
+    stripped = segment.lstrip()
+    if not stripped:
+        return None
+    start += len(segment) - len(stripped)
+    return start, start + len(stripped.rstrip())
+
+
+def split_segments(text):
+    """(start, end) char offsets of the segments of a text"""
+    pattern, _ = get_boundary_pattern()
+    spans = []
+    start = 0
+    for match in pattern.finditer(text):
+        span = _trimmed(text, start, match.start())
+        if span:
+            spans.append(span)
+        start = match.end()
+    span = _trimmed(text, start, len(text))
+    if span:
+        spans.append(span)
+    return spans
+
+
+def stream_spans(chunks):
+    """Yield (start, end, segment text) for a text that arrives as an iterable of chunks
+
+    Offsets count characters from the start of the stream. The spans are
+    the same as split_segments gives for the whole text.
+    """
+    pattern, lookahead = get_boundary_pattern()
+    buffer = ''
+    offset = 0                      # stream offset of buffer[0]
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # Boundaries in the last few characters read may still grow, so
+        # rescan from the whitespace run around that point
+        scan = max(len(buffer) - lookahead, 0)
+        while scan and buffer[scan - 1].isspace():
+            scan -= 1
+        buffer += chunk
+        safe = len(buffer) - lookahead
+        start = 0
+        for match in pattern.finditer(buffer, scan):
+            if match.end() >= safe:
+                break
+            span = _trimmed(buffer, start, match.start())
+            if span:
+                yield offset + span[0], offset + span[1], buffer[span[0]:span[1]]
+            start = match.end()
+        if start:
+            buffer = buffer[start:]
+            offset += start
+    for start, end in split_segments(buffer):
+        yield offset + start, offset + end, buffer[start:end]
+
+
+class SegmentSummary:
+    """Aggregate of the segment results of one document, built one segment at a time
+
+    The aggregate polarity and confidence are the mean over segments with
+    a Positive or Negative label, so neutral filler does not water down
+    the opinions (the mean over every segment when none has one).
+    ``mixed`` is set when both positive and negative segments occur.
+    """
+
+    def __init__(self):
+        self.sentiments = dict.fromkeys(SENTIMENTS, 0)
+        self.polarity = RunningStats()
+        self.opinion_polarity = RunningStats()
+        self.confidence = RunningStats()
+        self.opinion_confidence = RunningStats()
+
+    @property
+    def count(self):
+        return self.polarity.count
+
+    def add(self, result):
+        """Fold one segment result into the summary"""
+        self.sentiments[result['sentiment']] += 1
+        self.polarity.add(result['polarity'])
+        self.confidence.add(result['confidence'])
+        if result['sentiment'] != 'Neutral':
+            self.opinion_polarity.add(result['polarity'])
+            self.opinion_confidence.add(result['confidence'])
+
+    def merge(self, other):
+        """Add the segments of another summary (e.g. of a later part of the document)"""
+        for label, n in other.sentiments.items():
+            self.sentiments[label] += n
+        self.polarity.merge(other.polarity)
+        self.confidence.merge(other.confidence)
+        self.opinion_polarity.merge(other.opinion_polarity)
+        self.opinion_confidence.merge(other.opinion_confidence)
+
+    def to_dict(self):
+        opinions = self.opinion_polarity.count > 0
+        polarity = (self.opinion_polarity if opinions else self.polarity).mean
+        code = label_code(polarity)
+        return {
+            'sentiment': LABELS[code],
+            'emoji': EMOJIS[code],
+            'color': COLORS[code],
+            'polarity': polarity,
+            'confidence': (self.opinion_confidence if opinions else self.confidence).mean,
+            'segments': self.count,
+            'sentiments': dict(self.sentiments),
+            'mixed': self.sentiments['Positive'] > 0 and self.sentiments['Negative'] > 0,
+        }
+
+
+def _batch_scorer(score_batch, baseline, subjectivity, fuzzy, negation_window):
+    check_baseline(baseline)
+    check_negation_window(negation_window)
+    return score_batch or functools.partial(
+        analyze_batch, baseline=baseline, subjectivity=subjectivity, fuzzy=fuzzy,
+        negation_window=negation_window)
+
+
+def analyze_segments(text, baseline='blend', subjectivity=True, fuzzy=False, negation_window=NEGATION_WINDOW,
+                     score_batch=None):
+    """Score every sentence / clause of a review on its own
+
+    Returns ``{'segments': [...], 'aggregate': {...}}``. Each segment is
+    an analyzer result dict plus its ``text`` and ``start`` / ``end``
+    offsets. ``aggregate`` is SegmentSummary.to_dict(). All segments are
+    scored as one batch; pass ``score_batch=scorer.map`` with a
+    ParallelScorer to spread a large document over several cores.
+    """
+    score_batch = _batch_scorer(score_batch, baseline, subjectivity, fuzzy, negation_window)
+    spans = split_segments(text)
+    results = score_batch([text[start:end] for start, end in spans])
+    summary = SegmentSummary()
+    segments = []
+    for (start, end), result in zip(spans, results):
+        summary.add(result)
+        segments.append({'text': text[start:end], 'start': start, 'end': end, **result})
+    return {'segments': segments, 'aggregate': summary.to_dict()}
+
+
+def stream_segments(chunks, baseline='blend', subjectivity=True, fuzzy=False, negation_window=NEGATION_WINDOW,
+                    batch_size=1000, score_batch=None):
+    """Yield one segment dict (as in analyze_segments) at a time for a long text
+
+    ``chunks`` is any iterable of strings, e.g. an open text file. Up to
+    ``batch_size`` segments are scored together, so memory is bounded by
+    one batch whatever the length of the input. Fold the segments into a
+    SegmentSummary for the aggregate.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    score_batch = _batch_scorer(score_batch, baseline, subjectivity, fuzzy, negation_window)
+    spans = stream_spans(chunks)
+    while True:
+        batch = list(islice(spans, batch_size))
+        if not batch:
+            return
+        for (start, end, segment), result in zip(batch, score_batch([s for _, _, s in batch])):
+            yield {'text': segment, 'start': start, 'end': end, **result}
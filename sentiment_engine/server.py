@@ -0,0 +1,347 @@
+"""Asyncio HTTP scoring service with request micro-batching
+
+    python -m sentiment_engine.server --port 8000 --workers 4
+
+Endpoints (JSON in, JSON out):
+
+    POST /analyze        {"text": "..."}           -> result dict
+    POST /analyze/batch  {"texts": ["...", ...]}   -> {"results": [...]}
+    GET  /metrics                                  -> counters and p50/p99 latency
+    GET  /health                                   -> {"status": "ok"}
+
+Concurrent /analyze requests are queued and coalesced into micro-batches
+of at most ``max_batch_size`` reviews, waiting no longer than
+``max_wait_ms`` for a batch to fill. Batches are scored on a process pool
+so the event loop never runs CPU-bound work. When more than
+``max_pending`` reviews are queued or being scored, new requests get
+503 Service Unavailable instead of growing the queue.
+
+With ``--watch-lexicon`` the ``--lexicon`` file is polled, and after it
+is rewritten (e.g. by compile-lexicon) every worker loads it before its
+next batch, without a restart. Each result's ``lexicon_version`` names
+the lexicons that scored it.
+"""
+
+import argparse
+import asyncio
+from collections import deque
+import json
+import time
+
+from .cli import negation_window_arg
+from .core import BASELINE_MODES, NEGATION_WINDOW
+from .parallel import ParallelScorer
+from .reload import LexiconWatcher
+
+MAX_BODY = 8 * 2**20
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyRecorder:
+    """Keeps the most recent latencies and reports percentiles"""
+
+    def __init__(self, size=10_000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'p50_ms': self.percentile(50) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+        }
+
+
+class MicroBatcher:
+    """Coalesces single-review requests into batches for the process pool"""
+
+    def __init__(self, scorer, max_batch_size=64, max_wait_ms=5.0, max_pending=10_000):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self.pending = 0
+        self.batches = 0
+        self.batch_sizes = deque(maxlen=1000)
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._inflight = set()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _reserve(self, n):
+        if self.pending + n > self.max_pending:
+            raise HTTPError(503, f"server busy: {self.pending} reviews pending")
+        self.pending += n
+
+    async def score(self, text):
+        """Queue one review and wait for its result"""
+        self._reserve(1)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def score_many(self, texts):
+        """Score a client batch directly, split into pool-sized pieces"""
+        self._reserve(len(texts))
+        try:
+            pieces = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)]
+            scored = await asyncio.gather(*(asyncio.wrap_future(self.scorer.submit(p)) for p in pieces))
+        finally:
+            self.pending -= len(texts)
+        return [r for piece in scored for r in piece]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            self.batch_sizes.append(len(items))
+            # Do not wait for the pool here, so the next batch can fill meanwhile
+            task = loop.create_task(self._dispatch(items))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, items):
+        try:
+            results = await asyncio.wrap_future(self.scorer.submit([text for text, _ in items]))
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.pending -= len(items)
+
+
+class ScoringServer:
+    """HTTP/1.1 server exposing the scoring engine"""
+
+    def __init__(self, scorer, max_batch_size=64, max_wait_ms=5.0, max_pending=10_000,
+                 max_request_texts=1000):
+        self.batcher = MicroBatcher(scorer, max_batch_size, max_wait_ms, max_pending)
+        self.max_request_texts = max_request_texts
+        self.latency = {'/analyze': LatencyRecorder(), '/analyze/batch': LatencyRecorder()}
+        self.rejected = 0
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=8000):
+        # Start the pool workers before any socket is open, so forked
+        # workers do not inherit (and keep alive) client connections
+        await asyncio.wrap_future(self.batcher.scorer.submit([]))
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    def metrics(self):
+        sizes = self.batcher.batch_sizes
+        return {
+            'pending': self.batcher.pending,
+            'batches': self.batcher.batches,
+            'mean_batch_size': sum(sizes) / len(sizes) if sizes else 0.0,
+            'rejected': self.rejected,
+            'latency': {path: rec.summary() for path, rec in self.latency.items()},
+        }
+
+    async def _route(self, method, path, body):
+        if path == '/health':
+            return {'status': 'ok'}
+        if path == '/metrics':
+            return self.metrics()
+        if path not in self.latency:
+            raise HTTPError(404, f"no such endpoint: {path}")
+        if method != 'POST':
+            raise HTTPError(405, f"{path} only accepts POST")
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "body must be a JSON object")
+
+        if path == '/analyze':
+            text = payload.get('text')
+            if not isinstance(text, str):
+                raise HTTPError(400, '"text" must be a string')
+            return await self.batcher.score(text)
+
+        texts = payload.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise HTTPError(400, '"texts" must be a list of strings')
+        if len(texts) > self.max_request_texts:
+            raise HTTPError(413, f"at most {self.max_request_texts} texts per request")
+        return {'results': await self.batcher.score_many(texts)}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                path = target.split('?', 1)[0]
+                status, extra = 200, {}
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                try:
+                    if length < 0:
+                        raise HTTPError(400, "bad Content-Length")
+                    if length > MAX_BODY:
+                        raise HTTPError(413, "request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    response = await self._route(method, path, body)
+                except HTTPError as e:
+                    status, response = e.status, {'error': str(e)}
+                    if e.status == 503:
+                        self.rejected += 1
+                        extra['Retry-After'] = '1'
+                except ValueError as e:
+                    # A request the scorer rejects, e.g. a bad parameter
+                    status, response = 400, {'error': str(e)}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+                if status == 200 and path in self.latency:
+                    self.latency[path].record(time.perf_counter() - start)
+
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                data = json.dumps(response, ensure_ascii=False).encode('utf-8')
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                        'Content-Type: application/json; charset=utf-8',
+                        f"Content-Length: {len(data)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m sentiment_engine.server',
+        description='Serve the sentiment engine over HTTP with request micro-batching.'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help='scoring processes (default: CPU count)')
+    parser.add_argument('--max-batch-size', type=int, default=64, help='reviews per micro-batch (default: 64)')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help='longest wait for a micro-batch to fill (default: 5)')
+    parser.add_argument('--max-pending', type=int, default=10_000,
+                        help='queued reviews before requests are rejected with 503 (default: 10000)')
+    parser.add_argument('--max-request-texts', type=int, default=1000,
+                        help='largest /analyze/batch request (default: 1000)')
+    parser.add_argument('--baseline', choices=BASELINE_MODES, default='blend')
+    parser.add_argument('--no-subjectivity', dest='subjectivity', action='store_false')
+    parser.add_argument('--fuzzy', action='store_true')
+    parser.add_argument('--negation-window', type=negation_window_arg, default=NEGATION_WINDOW, metavar='N',
+                        help='tokens a negation reaches, N or BEFORE,AFTER (default: 3)')
+    parser.add_argument('--lexicon', help='compiled lexicon file')
+    parser.add_argument('--watch-lexicon', action='store_true',
+                        help='reload the --lexicon file in every worker whenever it changes')
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help='seconds between checks of the lexicon file (default: 2)')
+    return parser
+
+
+async def serve(args):
+    with ParallelScorer(args.workers, args.max_batch_size, args.baseline, args.subjectivity,
+                        args.fuzzy, lexicon_path=args.lexicon,
+                        negation_window=args.negation_window) as scorer:
+        server = ScoringServer(scorer, args.max_batch_size, args.max_wait_ms, args.max_pending,
+                               args.max_request_texts)
+        host, port = await server.start(args.host, args.port)
+        print(f"Serving on http://{host}:{port} with {scorer.workers} workers", flush=True)
+        watcher = None
+        if args.watch_lexicon:
+            watcher = LexiconWatcher(args.lexicon, args.reload_interval,
+                                     on_reload=lambda snapshot: scorer.set_lexicon(args.lexicon)).start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            if watcher:
+                watcher.stop()
+            await server.stop()
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.watch_lexicon and not args.lexicon:
+        parser.error("--watch-lexicon needs --lexicon")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
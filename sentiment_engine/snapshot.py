@@ -0,0 +1,193 @@
+"""Copy-on-write lexicon snapshots
+
+Scorers never read the editable dictionaries in lexicons.py while they
+score a review. They take the current LexiconSnapshot once per review or
+batch: a private copy of every lexicon plus the indexes built from it.
+Taking it is a global read and a version check, with no lock, and
+nothing can change a snapshot while it is in use.
+
+After an in-place lexicon edit, the next get_snapshot() call builds a new
+snapshot. publish() swaps in a whole new set of lexicons at once
+(install() and the LexiconWatcher in reload.py use it): reviews and
+batches that already hold the old snapshot finish on it, and later ones
+get the new one. The dictionaries in lexicons.py are left as they are;
+editing one in place goes back to them.
+
+Every snapshot has a ``tag``, a short hash of its contents. Results carry
+it as ``lexicon_version``. The same lexicons give the same tag in every
+process and after a restart, and compiling them into a LexiconTable
+does not change it.
+"""
+
+import hashlib
+import json
+import threading
+
+from . import lexicons
+from .lexicons import (
+    HINGLISH_POSITIVE, HINGLISH_NEGATIVE, GENZ_SLANG_POSITIVE, GENZ_SLANG_NEGATIVE,
+    HINDI_INTENSIFIERS, EMOTION_KEYWORDS, NEGATION_WORDS, PHRASES, lexicon_version
+)
+from .phrases import PhraseMatcher, phrase_key
+
+# Sentiment lexicons in the scorer's priority order
+SENTIMENT_NAMES = ('hinglish_positive', 'hinglish_negative', 'genz_positive', 'genz_negative')
+
+
+def bundled_sources():
+    """The lexicons currently defined in lexicons.py, keyed by source name"""
+    return {
+        'hinglish_positive': HINGLISH_POSITIVE,
+        'hinglish_negative': HINGLISH_NEGATIVE,
+        'genz_positive': GENZ_SLANG_POSITIVE,
+        'genz_negative': GENZ_SLANG_NEGATIVE,
+        'phrases': PHRASES,
+        'intensifiers': HINDI_INTENSIFIERS,
+        'negations': NEGATION_WORDS,
+        'emotions': EMOTION_KEYWORDS,
+    }
+
+
+def build_emotion_index(emotion_keywords):
+    """Invert emotion -> keywords into token -> ((emotion, weight), ...)
+
+    Keywords may be a list (every word weighs 1) or a dict of word -> weight.
+    """
+    index = {}
+    for emotion, keywords in emotion_keywords.items():
+        weighted = keywords.items() if isinstance(keywords, dict) else ((w, 1) for w in keywords)
+        for word, weight in weighted:
+            index.setdefault(word, {})[emotion] = weight
+    return {word: tuple(hits.items()) for word, hits in index.items()}
+
+
+def _copy(value):
+    """Plain, untracked copy of a lexicon source"""
+    if isinstance(value, dict):
+        return {key: _copy(v) for key, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+# The lexicons as shipped, before any in-place edit
+_DEFAULTS = {name: _copy(value) for name, value in bundled_sources().items()}
+
+
+def default_sources():
+    """Copy of the lexicons as defined in lexicons.py when it was imported"""
+    return {name: _copy(value) for name, value in _DEFAULTS.items()}
+
+
+def normalize_sources(sources):
+    """Sources in the form LexiconTable.to_sources gives them back
+
+    Words are lowercased, a word in several sentiment lexicons only stays
+    in the one with priority, phrases are keyed by phrase_key, every score
+    and weight is a float, negations are a sorted list and every emotion
+    is a {word: weight} dict without zero weights.
+    """
+    phrases = {phrase_key(p): float(v) for p, v in sources['phrases'].items()}
+    normalized = {name: {} for name in SENTIMENT_NAMES}
+    seen = set()
+    for name in SENTIMENT_NAMES:
+        for word, value in sources[name].items():
+            word = word.lower()
+            if word not in seen:
+                seen.add(word)
+                if word not in phrases:
+                    normalized[name][word] = float(value)
+    normalized['phrases'] = phrases
+    normalized['intensifiers'] = {w.lower(): float(v) for w, v in sources['intensifiers'].items()}
+    normalized['negations'] = sorted({w.lower() for w in sources['negations']})
+    normalized['emotions'] = {}
+    for emotion, keywords in sources['emotions'].items():
+        weighted = keywords.items() if isinstance(keywords, dict) else ((w, 1) for w in keywords)
+        weights = {word.lower(): float(weight) for word, weight in weighted}
+        normalized['emotions'][emotion] = {word: weight for word, weight in weights.items() if weight}
+    return normalized
+
+
+def content_tag(sources):
+    """Short hash of lexicon sources that does not depend on their format or order
+
+    The sources are normalized first, so the bundled lexicons and a table
+    compiled from them get the same tag.
+    """
+    data = json.dumps(normalize_sources(sources), sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=6).hexdigest()
+
+
+class LexiconSnapshot:
+    """Frozen copy of every lexicon with the indexes the scorers need
+
+    ``version`` is the lexicon_version() it was taken at and ``tag`` the
+    hash of its contents. ``table``, the compiled LexiconTable for
+    analyze_batch, is built the first time it is used.
+    """
+
+    def __init__(self, sources, version, table=None):
+        self.sources = {name: _copy(value) for name, value in sources.items()}
+        # A list of negations (e.g. from LexiconTable.to_sources) is still a set
+        self.sources['negations'] = frozenset(self.sources['negations'])
+        self.version = version
+        self.tag = content_tag(self.sources)
+        self.hinglish_positive = self.sources['hinglish_positive']
+        self.hinglish_negative = self.sources['hinglish_negative']
+        self.genz_positive = self.sources['genz_positive']
+        self.genz_negative = self.sources['genz_negative']
+        self.intensifiers = self.sources['intensifiers']
+        self.negations = self.sources['negations']
+        self.emotion_names = tuple(self.sources['emotions'])
+        self.emotion_index = build_emotion_index(self.sources['emotions'])
+        phrases = self.sources['phrases']
+        self.phrases = PhraseMatcher(phrases) if phrases else None
+        self._table = table
+
+    @property
+    def table(self):
+        if self._table is None:
+            # NumPy is only loaded once something scores in batches
+            from .compiled import LexiconTable
+            self._table = LexiconTable.from_sources(self.sources)
+        return self._table
+
+    def __repr__(self):
+        return f"LexiconSnapshot({self.tag})"
+
+
+_snapshot = None
+# Only taken to build or publish a snapshot, never by a scorer whose
+# snapshot is current
+_lock = threading.Lock()
+
+
+def get_snapshot():
+    """Return the current lexicon snapshot, taking a new one after lexicon edits"""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != lexicon_version():
+        with _lock:
+            snapshot = _snapshot
+            if snapshot is None or snapshot.version != lexicon_version():
+                snapshot = _snapshot = LexiconSnapshot(bundled_sources(), lexicon_version())
+    return snapshot
+
+
+def publish(sources, table=None):
+    """Replace every lexicon at once and return the new snapshot
+
+    The dictionaries in lexicons.py are not touched: the lexicon version
+    is bumped instead, so result caches and other version-keyed state
+    start over. ``table`` is a LexiconTable already compiled from the
+    same sources.
+    """
+    global _snapshot
+    snapshot = LexiconSnapshot(sources, None, table)
+    with _lock:
+        lexicons._changed()
+        snapshot.version = lexicon_version()
+        _snapshot = snapshot
+    return snapshot
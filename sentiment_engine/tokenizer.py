@@ -0,0 +1,47 @@
+"""Single-pass text cleaning and tokenization
+
+URLs and unsupported punctuation are removed by one precompiled pattern,
+then the text is lowercased and split on whitespace. Word characters are
+matched with Unicode semantics, so Devanagari, accented Latin and other
+scripts survive cleaning exactly as before.
+"""
+
+import re
+
+# URLs first so a URL is dropped as a whole, then any character that is
+# not a word character, whitespace or basic sentence punctuation
+_CLEAN_RE = re.compile(r'http\S+|www\S+|https\S+|[^\w\s!?.,\-]')
+# Punctuation cleaning keeps, stripped from token edges for lookups ("notch.")
+EDGE_PUNCT = '.,!?-'
+
+
+def clean_text(text):
+    """Clean and preprocess text while preserving Hinglish"""
+    return _CLEAN_RE.sub('', text).strip()
+
+
+def tokenize(text):
+    """Clean text and return its lowercased tokens"""
+    return _CLEAN_RE.sub('', text).lower().split()
+
+
+def clean_chunk(chunk):
+    """Token of one whitespace-free chunk of text, '' when nothing survives cleaning
+
+    Cleaning never removes or adds whitespace, so tokenize(text) is the
+    non-empty clean_chunk of every chunk of text.split().
+    """
+    return _CLEAN_RE.sub('', chunk).lower()
+
+
+def clean_and_tokenize(text):
+    """Return the cleaned text together with its tokens"""
+    cleaned = clean_text(text)
+    return cleaned, cleaned.lower().split()
+
+
+def tokenize_batch(texts):
+    """Clean and tokenize a batch, returning (cleaned_texts, token_lists)"""
+    sub = _CLEAN_RE.sub
+    cleaned = [sub('', t).strip() for t in texts]
+    return cleaned, [c.lower().split() for c in cleaned]